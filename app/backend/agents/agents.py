@@ -1,14 +1,13 @@
 """Agent classes for agentic pipeline"""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from services.llm_service import LLMService
 from agents.tools import (
     PDFLoaderTool, TextSplitterTool, EmbedderTool, 
-    VectorDBTool, ContextCompressorTool, GroundingCheckerTool,
-    CompanyProfileParserTool
+    VectorDBTool, ContextCompressorTool, GroundingCheckerTool
 )
-from utils.parser import BalanceSheetParser
-from utils.company_profile_parser import CompanyProfileParser
+from utils.document_parser import DocumentParser, ParsedDocument
 from config import Config
+from itertools import groupby
 import json
 
 
@@ -18,29 +17,39 @@ class LoaderAgent:
     def __init__(self, llm_service=None):
         self.pdf_loader = PDFLoaderTool()
         self.text_splitter = TextSplitterTool(
-            chunk_size=800,
-            chunk_overlap=100
+            chunk_size=Config.CHUNK_TOKENS,
+            chunk_overlap=Config.CHUNK_OVERLAP_TOKENS
         )
         self.embedder = EmbedderTool()
         self.vector_db = None
-        self.balance_sheet_parser = BalanceSheetParser()
-        self.company_profile_parser = CompanyProfileParserTool(llm_service=llm_service)
         self.llm_service = llm_service
     
     def process(self, balance_sheet_content: str, company_profile_content: str = None,
-                db_name: str = "rag_db", vector_db: VectorDBTool = None) -> Dict[str, Any]:
+                db_name: str = "rag_db", vector_db: VectorDBTool = None,
+                progress_callback: Optional[Callable[[str], None]] = None,
+                parsed_document: ParsedDocument = None) -> Dict[str, Any]:
         """
         Process balance sheet and company profile through ingestion pipeline
         
+        Chunks are keyed by content hash, so processing an updated version into the
+        same collection only embeds new chunks and deletes the ones that are gone.
+        
         Args:
             balance_sheet_content: Balance sheet text content
             company_profile_content: Company profile text content (optional)
             db_name: Name of vector database collection
             vector_db: Optional pre-initialized vector DB instance
+            progress_callback: Optional callable notified with each stage name
+                (parsing, profile_extraction, chunking, embedding, storing)
+            parsed_document: Optional document already parsed for this upload
             
         Returns:
             Dictionary with processing results
         """
+        def report(stage: str):
+            if progress_callback:
+                progress_callback(stage)
+        
         # Use provided vector DB or create new one
         self.vector_db = vector_db if vector_db else VectorDBTool(db_name=db_name)
         
@@ -48,58 +57,80 @@ class LoaderAgent:
         all_embeddings = []
         all_metadatas = []
         
-        # Process balance sheet
-        balance_entries = self.balance_sheet_parser.parse(balance_sheet_content)
-        for entry in balance_entries:
-            content = '\n'.join(entry.get('content', []))
-            chunks = self.text_splitter.split(
-                content,
+        # Parse balance sheet and company profile once (reuse an earlier parse if given)
+        if parsed_document is None:
+            parsed_document = DocumentParser.parse(
+                balance_sheet_content, company_profile_content,
+                llm_service=self.llm_service, progress_callback=progress_callback
+            )
+        else:
+            report('parsing')
+        balance_entries = parsed_document.line_items
+        company_sections = parsed_document.company_sections
+        
+        report('chunking')
+        # Rows are packed into dense chunks per balance sheet section, each chunk
+        # headed by the section and the periods of the table
+        periods = parsed_document.table.periods
+        for section, entries in groupby(balance_entries, key=lambda entry: entry.get('section')):
+            title = f"Balance Sheet - {section.capitalize()}" if section else 'Balance Sheet'
+            header = f"{title} ({', '.join(periods)})" if periods else title
+            chunks = self.text_splitter.split_rows(
+                header,
+                ['\n'.join(entry.get('content', [])) for entry in entries],
                 metadata={
-                    'section': entry.get('title', 'Balance Sheet Entry'),
+                    'section': title,
                     'type': 'balance_sheet',
                     'source': 'balance_sheet'
                 }
             )
             all_chunks.extend(chunks)
         
-        # Process company profile with enhanced parser
-        company_data = {}
-        if company_profile_content:
-            parsed_result = self.company_profile_parser.parse(company_profile_content)
-            company_data = parsed_result.get('company_data', {})
-            company_sections = parsed_result.get('sections', [])
-            
-            for section in company_sections:
-                content = section.get('content', '')
-                if content:
-                    chunks = self.text_splitter.split(
-                        content,
-                        metadata={
-                            'section': section.get('title', 'Company Section'),
-                            'category': section.get('category', 'general'),
-                            'type': 'company_profile',
-                            'source': 'company_profile'
-                        }
-                    )
-                    all_chunks.extend(chunks)
+        for section in company_sections:
+            content = section.get('content', '')
+            if content:
+                chunks = self.text_splitter.split(
+                    content,
+                    metadata={
+                        'section': section.get('title', 'Company Section'),
+                        'category': section.get('category', 'general'),
+                        'type': 'company_profile',
+                        'source': 'company_profile'
+                    }
+                )
+                all_chunks.extend(chunks)
         
-        # Create embeddings for all chunks
-        texts = [chunk['text'] for chunk in all_chunks]
+        # Diff against the collection by content hash: only new chunks are embedded
+        # and stored, chunks of removed or changed content are deleted
+        chunks_by_id = {}
+        for chunk in all_chunks:
+            chunks_by_id.setdefault(VectorDBTool.chunk_id(chunk), chunk)
+        stored_ids = set(self.vector_db.ids())
+        new_ids = [chunk_id for chunk_id in chunks_by_id if chunk_id not in stored_ids]
+        removed_ids = [chunk_id for chunk_id in stored_ids if chunk_id not in chunks_by_id]
+        new_chunks = [chunks_by_id[chunk_id] for chunk_id in new_ids]
+        
+        # Create embeddings for new chunks
+        report('embedding')
+        texts = [chunk['text'] for chunk in new_chunks]
         all_embeddings = self.embedder.embed_batch(texts)
         
         # Prepare metadatas
-        all_metadatas = [chunk['metadata'] for chunk in all_chunks]
+        all_metadatas = [chunk['metadata'] for chunk in new_chunks]
         
         # Store in vector DB
-        self.vector_db.store(all_chunks, all_embeddings, all_metadatas)
-        
-        company_sections_count = len(company_sections) if company_profile_content and 'company_sections' in locals() else 0
+        report('storing')
+        self.vector_db.store(new_chunks, all_embeddings, all_metadatas, ids=new_ids)
+        self.vector_db.delete(removed_ids)
         
         return {
-            'chunks_count': len(all_chunks),
+            'chunks_count': len(chunks_by_id),
+            'embedded_chunks': len(new_ids),
+            'deleted_chunks': len(removed_ids),
             'balance_sheet_entries': len(balance_entries),
-            'company_profile_sections': company_sections_count,
-            'company_data': company_data,
+            'company_profile_sections': len(company_sections),
+            'company_data': parsed_document.company_data,
+            'parsed_document': parsed_document,
             'db_name': db_name
         }
 
@@ -1,17 +1,30 @@
 """Agentic pipeline orchestrator"""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from agents.agents import (
     LoaderAgent, QueryRouterAgent, QueryRewriterAgent, RetrieverAgent,
     ContextCompressorAgent, AnswerAgent, GroundingCheckerAgent, SummarizerAgent
 )
-from agents.tools import EmbedderTool, VectorDBTool, WebSearchTool, DocumentAnalysisTool
+from agents.tools import (
+    EmbedderTool, VectorDBTool, WebSearchTool, DocumentAnalysisTool,
+    BalanceSheetLookupTool, CompanyProfileLookupTool
+)
 from services.llm_service import LLMService
+from utils.document_parser import DocumentParser, ParsedDocument
+from utils.ratio_engine import RatioEngine
 from config import Config
+import re
 
 
 class AgenticPipeline:
     """Orchestrates the agentic pipeline for RAG and PPT generation"""
     
+    # Questions that get the computed ratio report added to their context
+    FINANCIAL_QUERY_PATTERN = re.compile(
+        r'ratio|liquidity|leverage|solvency|working capital|debt|equity|growth|grow|cagr|'
+        r'trend|year[\s-]*over[\s-]*year|yoy|increase|decrease|change|compare|total|current',
+        re.IGNORECASE
+    )
+    
     def __init__(self, db_name: str = "rag_db", enable_web_search: bool = True):
         self.db_name = db_name
         self.llm_service = LLMService()
@@ -41,14 +54,21 @@ class AgenticPipeline:
         self.original_company_profile = None
         self.retriever_agent = None
         self.company_data = None  # Store parsed company data
+        self.parsed_document = None  # Shared parse of the ingested upload
+        self.balance_sheet_lookup = None  # Structured answers from the parsed table
+        self.company_lookup = None  # Structured answers from company_data
     
-    def ingest(self, balance_sheet_content: str, company_profile_content: str = None) -> Dict[str, Any]:
+    def ingest(self, balance_sheet_content: str, company_profile_content: str = None,
+               progress_callback: Optional[Callable[[str], None]] = None,
+               parsed_document: ParsedDocument = None) -> Dict[str, Any]:
         """
         Ingest balance sheet and company profile data
         
         Args:
             balance_sheet_content: Balance sheet text content
             company_profile_content: Company profile text content (optional)
+            progress_callback: Optional callable notified with each ingestion stage name
+            parsed_document: Optional document already parsed for this upload
             
         Returns:
             Dictionary with ingestion results
@@ -60,11 +80,13 @@ class AgenticPipeline:
         result = self.loader_agent.process(
             balance_sheet_content,
             company_profile_content,
-            vector_db=self.vector_db  # Pass the same instance!
+            vector_db=self.vector_db,  # Pass the same instance!
+            progress_callback=progress_callback,
+            parsed_document=parsed_document
         )
         
-        # Store company data for PPT generation
-        self.company_data = result.get('company_data', {})
+        # Store parsed document and company data for PPT generation
+        self._set_parsed_document(result['parsed_document'])
         
         # Store original documents for full document analysis fallback
         self.original_balance_sheet = balance_sheet_content
@@ -75,6 +97,44 @@ class AgenticPipeline:
         
         return result
     
+    def restore(self, balance_sheet_content: str, company_profile_content: str = None,
+                parsed_document: ParsedDocument = None) -> bool:
+        """
+        Reattach a pipeline to the collection of an earlier ingestion
+        
+        Persistent collections are reused as-is; an empty collection (e.g. the
+        in-memory fallback after a restart or cache eviction) is rebuilt by ingesting
+        again, which re-chunks the documents but reads embeddings from the cache.
+        
+        Args:
+            balance_sheet_content: Balance sheet text content
+            company_profile_content: Company profile text content (optional)
+            parsed_document: Document parsed during the earlier ingestion
+            
+        Returns:
+            True if the documents had to be re-ingested
+        """
+        self.vector_db = VectorDBTool(db_name=self.db_name)
+        if self.vector_db.count() == 0:
+            self.ingest(balance_sheet_content, company_profile_content, parsed_document=parsed_document)
+            return True
+        
+        if parsed_document is None:
+            parsed_document = DocumentParser.parse(balance_sheet_content, company_profile_content, self.llm_service)
+        self._set_parsed_document(parsed_document)
+        self.original_balance_sheet = balance_sheet_content
+        self.original_company_profile = company_profile_content
+        self.retriever_agent = RetrieverAgent(self.vector_db, self.embedder)
+        return False
+    
+    def _set_parsed_document(self, parsed_document: ParsedDocument):
+        """Attach the session's parsed document and the lookups built on it"""
+        self.parsed_document = parsed_document
+        self.company_data = parsed_document.company_data
+        if Config.ENABLE_STRUCTURED_LOOKUP:
+            self.balance_sheet_lookup = BalanceSheetLookupTool(parsed_document.table, parsed_document.ratios)
+            self.company_lookup = CompanyProfileLookupTool(parsed_document.company_data)
+    
     def query(self, user_query: str, chat_history: List[Dict] = None, 
               k: int = 4) -> Dict[str, Any]:
         """
@@ -91,6 +151,18 @@ class AgenticPipeline:
         if not self.retriever_agent:
             raise ValueError("Pipeline not initialized. Please run ingest() first.")
         
+        # Step 0: Answer single-figure questions straight from the parsed table
+        if self.balance_sheet_lookup:
+            match = self.balance_sheet_lookup.lookup(user_query)
+            if match:
+                return self._structured_answer(match, 'structured_lookup')
+        
+        # Entity questions ("who are the clients?") are answered from company_data
+        if self.company_lookup:
+            match = self.company_lookup.lookup(user_query)
+            if match:
+                return self._structured_answer(match, 'company_profile_lookup')
+        
         # Step 1: Route query
         route_info = self.query_router.route(user_query)
         query_type = route_info.get('type', 'factual')
@@ -131,7 +203,9 @@ class AgenticPipeline:
             except Exception as e:
                 print(f"Web search failed: {e}")
         
-        if not retrieved_docs and not web_context:
+        ratio_context = self._ratio_context(user_query)
+        
+        if not retrieved_docs and not web_context and not ratio_context:
             return {
                 'answer': "I couldn't find relevant information to answer your question in the uploaded documents or through web search. Please try re-uploading your files or rephrasing your question.",
                 'context': [],
@@ -149,6 +223,10 @@ class AgenticPipeline:
             # Step 4a: Compress context
             context_text = self.context_compressor.compress(retrieved_docs, effective_query)
             
+            # Computed figures take precedence over numbers the LLM would derive itself
+            if ratio_context:
+                context_text += f"\n\n[Computed Financial Ratios]\n{ratio_context}"
+            
             # Add web context if available
             if web_context:
                 context_text += f"\n\n[Additional Information from Web Search]\n{web_context}"
@@ -206,6 +284,31 @@ class AgenticPipeline:
             'doc_analysis_used': doc_analysis_used
         }
     
+    def _structured_answer(self, match: Dict[str, Any], fast_path: str) -> Dict[str, Any]:
+        """Build a query result from a structured lookup match (no LLM calls)"""
+        return {
+            'answer': match['answer'],
+            'context': [],
+            'compressed_context': match['source'],
+            'route_info': {'type': 'factual', 'fast_path': fast_path},
+            'grounding_check': {
+                'is_grounded': True,
+                'corrected_answer': match['answer'],
+                'issues': [],
+                'citations': [match['source']]
+            },
+            'citations': [match['citation']],
+            'query_used': None,
+            'web_search_used': False,
+            'doc_analysis_used': False
+        }
+    
+    def _ratio_context(self, query: str) -> str:
+        """Return the session's computed ratio report for financial questions ('' otherwise)"""
+        if not self.parsed_document or not self.FINANCIAL_QUERY_PATTERN.search(query):
+            return ''
+        return RatioEngine.format_summary(self.parsed_document.ratios)
+    
     def _assess_answer_quality(self, answer: str, retrieved_docs: List[Dict], query: str) -> Dict[str, Any]:
         """
         Assess if the answer is sufficient or if we need full document analysis
@@ -5,6 +5,7 @@ from agents.ppt_tools import (
     DataVisualizationTool, SlideTemplateSelector
 )
 from services.llm_service import LLMService
+from utils.balance_sheet_table import BalanceSheetTable
 from config import Config
 import json
 
@@ -22,7 +23,8 @@ class SlideContentAgent:
     def generate_slide_content(self, slide_type: str, balance_data: Dict, 
                                company_data: Dict, metrics: Dict,
                                enhanced_context: str = None,
-                               company_profile_text: str = None) -> Dict[str, Any]:
+                               company_profile_text: str = None,
+                               ratios: Dict = None) -> Dict[str, Any]:
         """
         Generate content for a specific slide type using tools and LLM
         
@@ -32,7 +34,9 @@ class SlideContentAgent:
             company_data: Parsed company profile data
             metrics: Calculated financial metrics
             enhanced_context: Optional enhanced context from agentic pipeline
-            company_profile_text: Raw company profile/brochure text for LLM fallback
+            company_profile_text: Raw company profile/brochure text (company_data is
+                already filled from it; the context fallback is used without one)
+            ratios: RatioEngine report for the session (all periods)
             
         Returns:
             Structured slide content
@@ -44,7 +48,7 @@ class SlideContentAgent:
         if slide_type == 'title':
             return self._generate_title_slide(company_data, template)
         elif slide_type == 'executive':
-            return self._generate_executive_summary(balance_data, metrics, enhanced_context, template)
+            return self._generate_executive_summary(balance_data, metrics, enhanced_context, template, ratios)
         elif slide_type == 'financials':
             return self._generate_financial_overview(metrics, enhanced_context, template)
         elif slide_type == 'assets':
@@ -52,9 +56,9 @@ class SlideContentAgent:
         elif slide_type == 'liabilities':
             return self._generate_liabilities_slide(balance_data, metrics, enhanced_context, template)
         elif slide_type == 'ratios':
-            return self._generate_ratios_slide(metrics, enhanced_context, template)
+            return self._generate_ratios_slide(metrics, enhanced_context, template, ratios)
         elif slide_type == 'trends':
-            return self._generate_trends_slide(balance_data, metrics, enhanced_context, template)
+            return self._generate_trends_slide(balance_data, metrics, enhanced_context, template, ratios)
         elif slide_type == 'company':
             return self._generate_company_profile_slide(company_data, enhanced_context, template)
         elif slide_type == 'products_services':
@@ -68,7 +72,7 @@ class SlideContentAgent:
         elif slide_type == 'vision_mission':
             return self._generate_vision_mission_slide(company_data, enhanced_context, template, company_profile_text)
         elif slide_type == 'conclusion':
-            return self._generate_conclusion_slide(balance_data, metrics, enhanced_context, template)
+            return self._generate_conclusion_slide(balance_data, metrics, enhanced_context, template, ratios)
         else:
             return {'error': f'Unknown slide type: {slide_type}'}
     
@@ -84,10 +88,10 @@ class SlideContentAgent:
         }
     
     def _generate_executive_summary(self, balance_data: Dict, metrics: Dict, 
-                                     context: str, template: Dict) -> Dict[str, Any]:
+                                     context: str, template: Dict, ratios: Dict = None) -> Dict[str, Any]:
         """Generate executive summary slide using tools and LLM"""
         # Use analyzer tool to get insights
-        analysis = self.analyzer.analyze_balance_sheet(balance_data, metrics)
+        analysis = self.analyzer.analyze_balance_sheet(balance_data, metrics, ratios)
         
         # Structure content using tool
         base_content = self.structurer.structure_executive_summary(analysis, context or '')
@@ -162,27 +166,33 @@ class SlideContentAgent:
         base_content['type'] = 'liabilities'
         return base_content
     
-    def _generate_ratios_slide(self, metrics: Dict, context: str, template: Dict) -> Dict[str, Any]:
+    def _generate_ratios_slide(self, metrics: Dict, context: str, template: Dict,
+                               ratio_report: Dict = None) -> Dict[str, Any]:
         """Generate financial ratios slide"""
-        ratios = [
-            {
-                'name': 'Current Ratio',
-                'value': f"{metrics.get('current_ratio', 0):.2f}",
-                'interpretation': self._interpret_current_ratio(metrics.get('current_ratio', 0)),
-                'benchmark': '> 1.5 (Good)'
-            },
-            {
-                'name': 'Debt-to-Equity',
-                'value': f"{metrics.get('debt_to_equity', 0):.2f}",
-                'interpretation': self._interpret_debt_to_equity(metrics.get('debt_to_equity', 0)),
-                'benchmark': '< 1.0 (Conservative)'
-            }
-        ]
+        # Values come from the ratio engine; the LLM may only reword interpretations
+        ratios = self.analyzer.ratio_slide_rows(ratio_report) if ratio_report else []
+        if not ratios:
+            ratios = [
+                {
+                    'name': 'Current Ratio',
+                    'value': f"{metrics.get('current_ratio', 0):.2f}",
+                    'interpretation': self._interpret_current_ratio(metrics.get('current_ratio', 0)),
+                    'benchmark': '> 1.5 (Good)'
+                },
+                {
+                    'name': 'Debt-to-Equity',
+                    'value': f"{metrics.get('debt_to_equity', 0):.2f}",
+                    'interpretation': self._interpret_debt_to_equity(metrics.get('debt_to_equity', 0)),
+                    'benchmark': '< 1.0 (Conservative)'
+                }
+            ]
         
         # Enhance with LLM if context available
         if context:
             enhanced = self._enhance_ratios_with_llm(ratios, context)
-            ratios = enhanced.get('ratios', ratios)
+            for ratio, enhanced_ratio in zip(ratios, enhanced.get('ratios', [])):
+                if isinstance(enhanced_ratio, dict) and enhanced_ratio.get('name') == ratio['name']:
+                    ratio['interpretation'] = enhanced_ratio.get('interpretation') or ratio['interpretation']
         
         return {
             'type': 'ratios',
@@ -193,12 +203,13 @@ class SlideContentAgent:
         }
     
     def _generate_trends_slide(self, balance_data: Dict, metrics: Dict, 
-                                context: str, template: Dict) -> Dict[str, Any]:
+                                context: str, template: Dict, ratios: Dict = None) -> Dict[str, Any]:
         """Generate trends and insights slide"""
         # Get analysis insights
-        analysis = self.analyzer.analyze_balance_sheet(balance_data, metrics)
+        analysis = self.analyzer.analyze_balance_sheet(balance_data, metrics, ratios)
         
-        insights = analysis.get('strengths', []) + analysis.get('concerns', [])
+        # Computed period-over-period changes lead, followed by the point-in-time assessment
+        insights = analysis.get('trends', [])[:2] + analysis.get('strengths', []) + analysis.get('concerns', [])
         
         # Generate recommendations based on analysis
         recommendations = self._generate_recommendations(analysis, context)
@@ -236,22 +247,8 @@ class SlideContentAgent:
                     result.append(item.strip())
             return result
         
-        # If data is sparse, use LLM with full brochure text to generate comprehensive content
-        if (not products or len(products) < 2) and brochure_text:
-            enhanced_data = self._generate_slide_content_from_brochure(
-                brochure_text,
-                "products_services",
-                "Generate comprehensive content for a Products & Services slide. Extract all products, services, product categories, and certifications. Return as JSON with 'products', 'categories', and 'certifications' arrays of strings. Be thorough and extract everything relevant."
-            )
-            if enhanced_data.get('products'):
-                products.extend(_ensure_strings(enhanced_data['products']))
-            if enhanced_data.get('categories'):
-                categories.extend(_ensure_strings(enhanced_data['categories']))
-            if enhanced_data.get('certifications'):
-                certifications.extend(_ensure_strings(enhanced_data['certifications']))
-        
-        # Fallback to context if brochure_text not available
-        elif (not products or len(products) < 2) and context:
+        # Without a brochure (already extracted into company_data), fall back to context
+        if (not products or len(products) < 2) and context and not brochure_text:
             enhanced_data = self._extract_with_llm(
                 context, 
                 "Extract all products, services, and product categories mentioned. Return as JSON with 'products' and 'categories' arrays of strings."
@@ -287,22 +284,8 @@ class SlideContentAgent:
                     result.append(item.strip())
             return result
         
-        # If data is sparse, use LLM with full brochure text
-        if (not markets or len(markets) < 2) and brochure_text:
-            enhanced_data = self._generate_slide_content_from_brochure(
-                brochure_text,
-                "markets_locations",
-                "Generate comprehensive content for a Markets & Locations slide. Extract all markets served, industries, geographic locations, offices, and manufacturing details. Return as JSON with 'markets' and 'locations' as arrays of strings, and 'manufacturing' as a string. Be thorough."
-            )
-            if enhanced_data.get('markets'):
-                markets.extend(_ensure_strings(enhanced_data['markets']))
-            if enhanced_data.get('locations'):
-                locations.extend(_ensure_strings(enhanced_data['locations']))
-            if enhanced_data.get('manufacturing') and not manufacturing:
-                manufacturing = enhanced_data['manufacturing'] if isinstance(enhanced_data['manufacturing'], str) else str(enhanced_data['manufacturing'])
-        
-        # Fallback to context
-        elif (not markets or len(markets) < 2) and context:
+        # Without a brochure (already extracted into company_data), fall back to context
+        if (not markets or len(markets) < 2) and context and not brochure_text:
             enhanced_data = self._extract_with_llm(
                 context,
                 "Extract all markets, industries, and geographic locations mentioned. Return as JSON with 'markets' and 'locations' arrays of strings."
@@ -345,20 +328,8 @@ class SlideContentAgent:
                     result.append(item.strip())
             return result
         
-        # If data is sparse, use LLM with full brochure text
-        if (not leadership or len(leadership) < 2 or not ceo_message) and brochure_text:
-            enhanced_data = self._generate_slide_content_from_brochure(
-                brochure_text,
-                "leadership",
-                "Generate comprehensive content for a Leadership & Team slide. Extract all leadership team members with their roles (format: 'Name - Role'), executives, management, and the CEO's message. Return as JSON with 'leadership' as an array of strings and 'ceo_message' as a string. Be thorough and extract all leadership information."
-            )
-            if enhanced_data.get('leadership'):
-                leadership.extend(_ensure_strings(enhanced_data['leadership']))
-            if enhanced_data.get('ceo_message') and not ceo_message:
-                ceo_message = enhanced_data['ceo_message'] if isinstance(enhanced_data['ceo_message'], str) else str(enhanced_data['ceo_message'])
-        
-        # Fallback to context
-        elif (not leadership or len(leadership) < 2) and context:
+        # Without a brochure (already extracted into company_data), fall back to context
+        if (not leadership or len(leadership) < 2) and context and not brochure_text:
             enhanced_data = self._extract_with_llm(
                 context,
                 "Extract all leadership team members, executives, and management names with their roles. Return as JSON with 'leadership' array of strings like 'Name - Role'."
@@ -395,20 +366,8 @@ class SlideContentAgent:
                     result.append(item.strip())
             return result
         
-        # If data is sparse, use LLM with full brochure text
-        if (not projects or len(projects) < 2 or not clients or len(clients) < 2) and brochure_text:
-            enhanced_data = self._generate_slide_content_from_brochure(
-                brochure_text,
-                "major_projects",
-                "Generate comprehensive content for a Major Projects & Clients slide. Extract all major projects, notable work, case studies, client names, customer names, and partners mentioned. Return as JSON with 'projects' and 'clients' as arrays of strings. Be thorough and extract everything relevant."
-            )
-            if enhanced_data.get('projects'):
-                projects.extend(_ensure_strings(enhanced_data['projects']))
-            if enhanced_data.get('clients'):
-                clients.extend(_ensure_strings(enhanced_data['clients']))
-        
-        # Fallback to context
-        elif (not projects or len(projects) < 2) and context:
+        # Without a brochure (already extracted into company_data), fall back to context
+        if (not projects or len(projects) < 2) and context and not brochure_text:
             enhanced_data = self._extract_with_llm(
                 context,
                 "Extract all major projects, notable work, and case studies mentioned. Return as JSON with 'projects' array of strings."
@@ -451,24 +410,8 @@ class SlideContentAgent:
                     result.append(item.strip())
             return result
         
-        # If data is sparse, use LLM with full brochure text
-        if (not vision and not mission and (not values or len(values) < 2)) and brochure_text:
-            enhanced_data = self._generate_slide_content_from_brochure(
-                brochure_text,
-                "vision_mission",
-                "Generate comprehensive content for a Vision, Mission & Values slide. Extract the company's vision statement, mission statement, core values, and unique selling points (USPs). Return as JSON with 'vision' (string), 'mission' (string), 'values' (array of strings), and 'usps' (array of strings) fields. Be thorough and extract all relevant information."
-            )
-            if enhanced_data.get('vision') and not vision:
-                vision = enhanced_data['vision'] if isinstance(enhanced_data['vision'], str) else str(enhanced_data['vision'])
-            if enhanced_data.get('mission') and not mission:
-                mission = enhanced_data['mission'] if isinstance(enhanced_data['mission'], str) else str(enhanced_data['mission'])
-            if enhanced_data.get('values'):
-                values.extend(_ensure_strings(enhanced_data['values']))
-            if enhanced_data.get('usps'):
-                usps.extend(_ensure_strings(enhanced_data['usps']))
-        
-        # Fallback to context
-        elif (not vision and not mission) and context:
+        # Without a brochure (already extracted into company_data), fall back to context
+        if (not vision and not mission) and context and not brochure_text:
             enhanced_data = self._extract_with_llm(
                 context,
                 "Extract the company vision statement and mission statement. Return as JSON with 'vision' and 'mission' strings."
@@ -490,9 +433,9 @@ class SlideContentAgent:
         }
     
     def _generate_conclusion_slide(self, balance_data: Dict, metrics: Dict, 
-                                    context: str, template: Dict) -> Dict[str, Any]:
+                                    context: str, template: Dict, ratios: Dict = None) -> Dict[str, Any]:
         """Generate conclusion slide"""
-        analysis = self.analyzer.analyze_balance_sheet(balance_data, metrics)
+        analysis = self.analyzer.analyze_balance_sheet(balance_data, metrics, ratios)
         
         # Generate summary
         summary = f"Financial analysis reveals {analysis.get('overall_health', 'moderate')} financial health with {len(analysis.get('strengths', []))} key strengths."
@@ -561,61 +504,6 @@ Return ONLY valid JSON, no explanation:"""
             print(f"LLM extraction failed: {e}")
             return {}
     
-    def _generate_slide_content_from_brochure(self, brochure_text: str, slide_type: str, instruction: str) -> Dict[str, Any]:
-        """
-        Generate comprehensive slide content from full brochure text using LLM
-        This is similar to DocumentAnalysisTool but specialized for PPT slides
-        
-        Args:
-            brochure_text: Full company brochure/profile text
-            slide_type: Type of slide being generated
-            instruction: Specific instruction for what to extract/generate
-            
-        Returns:
-            Generated content as dictionary
-        """
-        try:
-            # Use a larger chunk of text for comprehensive extraction (up to 8000 chars)
-            text_chunk = brochure_text[:8000] if len(brochure_text) > 8000 else brochure_text
-            
-            prompt = f"""You are creating content for a PowerPoint slide about a company.
-
-Slide Type: {slide_type}
-
-{instruction}
-
-Company Brochure/Profile Text:
-{text_chunk}
-
-Analyze the entire document and extract/generate comprehensive, meaningful content for this slide. 
-Be thorough and extract ALL relevant information. If information is not explicitly stated, infer reasonable content based on the context.
-Return ONLY valid JSON with the requested fields."""
-            
-            response = self.llm_service.client.chat.completions.create(
-                model=Config.MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at analyzing company documents and generating comprehensive, meaningful content for business presentations. Extract and generate all relevant information. Return ONLY valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.2,
-                max_tokens=2000
-            )
-            
-            content = response.choices[0].message.content.strip()
-            content = content.replace('```json', '').replace('```', '').strip()
-            
-            import json
-            return json.loads(content)
-        except Exception as e:
-            print(f"Warning: LLM slide content generation failed for {slide_type}: {e}")
-            return {}
-    
     def _enhance_with_llm(self, slide_type: str, base_content: Dict, context: str) -> Dict[str, Any]:
         """Use LLM to enhance content with context"""
         prompt = f"""Based on the following context and base content, enhance the highlights for a {slide_type} slide.
@@ -660,6 +548,7 @@ Context:
 Ratios:
 {json.dumps(ratios, indent=2)}
 
+Keep every name and value exactly as given; only rewrite the interpretations.
 Return ONLY a JSON object with enhanced ratios:
 {{
     "ratios": [
@@ -742,41 +631,61 @@ Return ONLY a JSON object with enhanced ratios:
 class DataExtractionAgent:
     """Agent for extracting specific data for slides"""
     
+    # Ratio report metrics shown as key figures, per slide type
+    KEY_FIGURE_METRICS = {
+        'financials': ['total_assets', 'total_liabilities', 'total_equity', 'working_capital'],
+        'assets': ['total_assets', 'current_assets', 'non_current_assets', 'cash', 'inventory'],
+        'liabilities': ['total_liabilities', 'current_liabilities', 'long_term_liabilities', 'total_equity']
+    }
+    MAX_LINE_ITEM_FIGURES = 3  # Largest line items of the slide's section
+    
     def __init__(self, llm_service: LLMService):
         self.llm_service = llm_service
     
-    def extract_key_figures(self, context: str, slide_type: str) -> Dict[str, Any]:
-        """Extract key figures from context for specific slide type"""
-        prompt = f"""Extract key financial figures from the context for a {slide_type} slide.
-
-Context:
-{context}
-
-Return ONLY a JSON object with relevant figures:
-{{
-    "figures": [
-        {{"label": "figure name", "value": "numeric value with units"}},
-        ...
-    ]
-}}"""
+    def extract_key_figures(self, slide_type: str, balance_data: Dict, ratios: Dict = None) -> Dict[str, Any]:
+        """
+        Extract key figures for a financials, assets or liabilities slide from the parsed statements
         
-        try:
-            response = self.llm_service.client.chat.completions.create(
-                model=Config.SUMMARY_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a data extraction expert. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                max_tokens=300
-            )
+        Figures are the slide's totals from the RatioEngine report for the current
+        period (with the previous period's value where there is one), followed by
+        the largest line items of the slide's section. No LLM call is made.
+        
+        Args:
+            slide_type: Type of slide
+            balance_data: Parsed balance sheet data (current period)
+            ratios: RatioEngine report for the session
             
-            content = response.choices[0].message.content.strip()
-            content = content.replace('```json', '').replace('```', '').strip()
-            return json.loads(content)
-        except Exception as e:
-            print(f"Data extraction failed: {e}")
-            return {'figures': []}
+        Returns:
+            Dictionary with 'figures' as a list of label/value dictionaries
+        """
+        ratios = ratios or {}
+        periods = ratios.get('periods', [])
+        current = ratios.get('current_period')
+        index = periods.index(current) if current in periods else None
+        
+        figures = []
+        for metric in self.KEY_FIGURE_METRICS.get(slide_type, []):
+            value = ratios.get('latest', {}).get(metric)
+            if value is None:
+                continue
+            text = f"${value:,.2f}"
+            previous = ratios['values'][metric][index - 1] if index else None
+            if previous is not None:
+                text += f" ({periods[index - 1]}: ${previous:,.2f})"
+            figures.append({'label': metric.replace('_', ' ').title(), 'value': text})
+        
+        if slide_type in ('assets', 'liabilities'):
+            items = [
+                (label, value) for label, value in (balance_data or {}).get(slide_type, {}).items()
+                if not BalanceSheetTable.TOTAL_PATTERN.match(str(label).strip())
+            ]
+            items.sort(key=lambda item: abs(item[1]), reverse=True)
+            figures.extend(
+                {'label': label, 'value': f"${value:,.2f}"}
+                for label, value in items[:self.MAX_LINE_ITEM_FIGURES]
+            )
+        
+        return {'figures': figures}
 
 
 class QualityAssuranceAgent:
@@ -1,18 +1,29 @@
 """Agentic pipeline for PPT generation"""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from agents.ppt_agents import (
     SlideContentAgent, DataExtractionAgent, QualityAssuranceAgent
 )
 from agents.pipeline import AgenticPipeline
 from services.llm_service import LLMService
-from utils.financial_parser import FinancialDataParser
+from services.map_reduce_extractor import MapReduceExtractor
+from utils.document_parser import DocumentParser, ParsedDocument
+from utils.enhanced_company_parser import EnhancedCompanyParser
 from config import Config
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
 import json
 
 
 class PPTAgenticPipeline:
     """Orchestrates agentic pipeline for PPT generation"""
     
+    # Slide types SlideContentAgent can generate
+    SLIDE_TYPES = [
+        'title', 'executive', 'financials', 'assets', 'liabilities', 'ratios', 'trends',
+        'company', 'products_services', 'markets_locations', 'leadership', 'major_projects',
+        'vision_mission', 'conclusion'
+    ]
+    
     def __init__(self, rag_pipeline: Optional[AgenticPipeline] = None):
         """
         Initialize PPT pipeline
@@ -22,7 +33,6 @@ class PPTAgenticPipeline:
         """
         self.llm_service = LLMService()
         self.rag_pipeline = rag_pipeline
-        self.parser = FinancialDataParser()
         
         # Initialize agents
         self.content_agent = SlideContentAgent(self.llm_service)
@@ -31,10 +41,18 @@ class PPTAgenticPipeline:
     
     def generate_presentation(self, balance_sheet_text: str, company_profile_text: str,
                             selected_slides: List[str], template: str = 'professional',
-                            theme: str = 'blue', use_enhanced_context: bool = True) -> Dict[str, Any]:
+                            theme: str = 'blue', use_enhanced_context: bool = True,
+                            parsed_document: ParsedDocument = None,
+                            slide_cache: Dict[str, Dict] = None, input_hash: str = None,
+                            regenerate: List[str] = (), prefetched: Dict[str, Any] = None,
+                            progress_callback: Optional[Callable[[str], None]] = None,
+                            slide_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         Generate presentation using agentic pipeline
         
+        Slides found in slide_cache are reused as they are; when every selected
+        slide is cached, no parsing, context retrieval or LLM call takes place.
+        
         Args:
             balance_sheet_text: Raw balance sheet content
             company_profile_text: Raw company profile content
@@ -42,79 +60,173 @@ class PPTAgenticPipeline:
             template: Presentation template
             theme: Color theme
             use_enhanced_context: Whether to use RAG pipeline for context
+            parsed_document: Optional document already parsed for this session
+            slide_cache: Previously generated slides by slide_cache_key()
+            input_hash: Hash of the inputs the slides derive from (slides are only
+                cached when given)
+            regenerate: Slide types to generate afresh even if cached
+            prefetched: Optional result of prefetch() for the same inputs (its
+                enriched company data and slide contexts are used as they are)
+            progress_callback: Optional callable notified with 'context' and 'slides'
+                when those stages start (skipped when every slide is cached)
+            slide_callback: Optional callable receiving each slide as soon as it is
+                ready (cached slides first; called from worker threads)
             
         Returns:
-            Dictionary with generated slides and metadata
+            Dictionary with generated slides, metadata and the new 'slide_cache' entries
         """
-        # Parse financial data
-        balance_data = self.parser.parse_balance_sheet(balance_sheet_text)
+        slide_cache = slide_cache if slide_cache is not None and input_hash else {}
+        keys = {
+            slide_type: self.slide_cache_key(slide_type, input_hash, template)
+            for slide_type in selected_slides
+        }
+        missing = [
+            slide_type for slide_type in dict.fromkeys(selected_slides)
+            if slide_type in regenerate or keys[slide_type] not in slide_cache
+        ]
         
-        # Use enhanced parser for company profile if we have RAG pipeline with company data
-        if self.rag_pipeline and hasattr(self.rag_pipeline, 'company_data') and self.rag_pipeline.company_data:
-            company_data = self.rag_pipeline.company_data
-        else:
-            # Fallback to basic parsing
-            from utils.enhanced_company_parser import EnhancedCompanyParser
-            company_data = EnhancedCompanyParser.parse_brochure(company_profile_text, self.llm_service)
+        if slide_callback:
+            for slide_type in dict.fromkeys(selected_slides):
+                if slide_type not in missing:
+                    slide_callback(copy.deepcopy(slide_cache[keys[slide_type]]))
         
-        # ENSURE company_data has all fields - enhance with LLM if sparse
-        if company_profile_text:
-            company_data = self._ensure_comprehensive_company_data(company_data, company_profile_text)
+        built = {}
+        context_map = {}
+        if missing:
+            built, context_map = self._build_slides(
+                balance_sheet_text, company_profile_text, missing, template,
+                use_enhanced_context, parsed_document, prefetched or {}, progress_callback, slide_callback
+            )
         
-        metrics = self.parser.extract_financial_metrics(balance_data)
+        # Cached slides are copied so that callers never modify the cache
+        slides = [
+            built[slide_type] if slide_type in built else copy.deepcopy(slide_cache[keys[slide_type]])
+            for slide_type in selected_slides
+        ]
         
-        # Generate slides with agentic approach
-        slides = []
-        context_map = {}
+        # Calculate overall presentation quality
+        avg_quality = sum(s.get('quality_score', 0) for s in slides) / len(slides) if slides else 0
+        
+        return {
+            'slides': slides,
+            # Failed slides are not cached, so the next request retries them
+            'slide_cache': {
+                keys[slide_type]: copy.deepcopy(slide) for slide_type, slide in built.items()
+                if input_hash and 'error' not in slide['content']
+            },
+            'metadata': {
+                'template': template,
+                'theme': theme,
+                'slide_count': len(slides),
+                'avg_quality_score': avg_quality,
+                'used_enhanced_context': bool(context_map),
+                'context_slides': list(context_map.keys()),
+                'generated_slides': missing,
+                'cached_slides': [slide_type for slide_type in dict.fromkeys(selected_slides) if slide_type not in built]
+            }
+        }
+    
+    @staticmethod
+    def slide_cache_key(slide_type: str, input_hash: str, template: str) -> str:
+        """Return the slide cache key of a slide type for the given inputs and template"""
+        return f"{slide_type}:{template}:{input_hash}"
+    
+    def _build_slides(self, balance_sheet_text: str, company_profile_text: str,
+                      slide_types: List[str], template: str, use_enhanced_context: bool,
+                      parsed_document: ParsedDocument = None, prefetched: Dict[str, Any] = None,
+                      progress_callback: Optional[Callable[[str], None]] = None,
+                      slide_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Generate and validate slides concurrently
+        
+        Each slide is passed to slide_callback as soon as it completes.
+        
+        Returns:
+            Tuple of ({slide type: slide}, context map used)
+        """
+        if progress_callback:
+            progress_callback('context')
+        
+        # Financial and company data come from the shared parse of the upload
+        document = self._get_parsed_document(balance_sheet_text, company_profile_text, parsed_document)
+        balance_data = document.balance_data
+        prefetched = prefetched or {}
+        
+        if prefetched.get('company_data') is not None:
+            company_data = copy.deepcopy(prefetched['company_data'])
+        else:
+            # Copy so that enrichment below never modifies the cached parse
+            company_data = copy.deepcopy(document.company_data)
+            
+            # ENSURE company_data has all fields - enhance with LLM if sparse
+            if company_profile_text:
+                company_data = self._ensure_comprehensive_company_data(company_data, company_profile_text)
+        
+        metrics = document.metrics
+        
+        # Generate slides with agentic approach (prefetched contexts are reused)
+        context_map = {
+            slide_type: context for slide_type, context in (prefetched.get('context_map') or {}).items()
+            if slide_type in slide_types
+        }
         
         # Get enhanced context from RAG pipeline if available
-        if use_enhanced_context and self.rag_pipeline:
+        missing_context = [slide_type for slide_type in slide_types if slide_type not in context_map]
+        if use_enhanced_context and self.rag_pipeline and missing_context and 'context_map' not in prefetched:
             try:
-                context_map = self.rag_pipeline.get_context_for_ppt(selected_slides)
+                context_map.update(self.rag_pipeline.get_context_for_ppt(missing_context))
             except Exception as e:
                 print(f"Warning: Could not get enhanced context: {e}")
         
-        # Generate each slide
-        for slide_type in selected_slides:
-            slide_content = self._generate_slide_with_agents(
-                slide_type=slide_type,
-                balance_data=balance_data,
-                company_data=company_data,
-                metrics=metrics,
-                context_map=context_map,
-                template=template,
-                company_profile_text=company_profile_text
-            )
+        def build_slide(slide_type: str) -> Dict[str, Any]:
+            try:
+                slide_content = self._generate_slide_with_agents(
+                    slide_type=slide_type,
+                    balance_data=balance_data,
+                    company_data=company_data,
+                    metrics=metrics,
+                    context_map=context_map,
+                    template=template,
+                    company_profile_text=company_profile_text,
+                    ratios=document.ratios
+                )
+            except Exception as e:
+                # A failing slide must not take the rest of the deck down
+                print(f"Warning: Could not generate {slide_type} slide: {e}")
+                slide_content = {'error': f'Could not generate {slide_type} slide: {e}'}
             
             # Validate slide quality
             validation = self.qa_agent.validate_slide_content(slide_content)
             slide_content['validation'] = validation
             
-            slides.append({
+            slide = {
                 'type': slide_type,
                 'content': slide_content,
                 'quality_score': validation.get('quality_score', 0)
-            })
-        
-        # Calculate overall presentation quality
-        avg_quality = sum(s.get('quality_score', 0) for s in slides) / len(slides) if slides else 0
-        
-        return {
-            'slides': slides,
-            'metadata': {
-                'template': template,
-                'theme': theme,
-                'slide_count': len(slides),
-                'avg_quality_score': avg_quality,
-                'used_enhanced_context': bool(context_map),
-                'context_slides': list(context_map.keys())
             }
-        }
+            if slide_callback:
+                slide_callback(slide)
+            return slide
+        
+        if progress_callback:
+            progress_callback('slides')
+        
+        # Slides are independent: generate them concurrently (reported as they complete)
+        workers = min(Config.SLIDE_WORKERS, len(slide_types))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='slide') as executor:
+                futures = {executor.submit(build_slide, slide_type): slide_type for slide_type in slide_types}
+                slides = {futures[future]: future.result() for future in as_completed(futures)}
+        else:
+            slides = {slide_type: build_slide(slide_type) for slide_type in slide_types}
+        
+        return slides, context_map
     
     def _generate_slide_with_agents(self, slide_type: str, balance_data: Dict,
                                     company_data: Dict, metrics: Dict,
                                     context_map: Dict, template: str,
-                                    company_profile_text: str = None) -> Dict[str, Any]:
+                                    company_profile_text: str = None,
+                                    ratios: Dict = None) -> Dict[str, Any]:
         """
         Generate single slide using agents and tools
         
@@ -126,6 +238,7 @@ class PPTAgenticPipeline:
             context_map: Map of enhanced contexts by slide type
             template: Template name
             company_profile_text: Raw company profile/brochure text for LLM fallback
+            ratios: RatioEngine report for the session
             
         Returns:
             Generated slide content
@@ -142,14 +255,13 @@ class PPTAgenticPipeline:
             company_data=company_data,
             metrics=metrics,
             enhanced_context=enhanced_context,
-            company_profile_text=company_profile_text
+            company_profile_text=company_profile_text,
+            ratios=ratios
         )
         
-        # Extract additional data if needed
-        if enhanced_context and slide_type in ['financials', 'assets', 'liabilities']:
-            extracted_data = self.extraction_agent.extract_key_figures(
-                enhanced_context, slide_type
-            )
+        # Key figures come from the parsed statements (no LLM call)
+        if slide_type in ['financials', 'assets', 'liabilities']:
+            extracted_data = self.extraction_agent.extract_key_figures(slide_type, balance_data, ratios)
             slide_content['extracted_figures'] = extracted_data.get('figures', [])
         
         return slide_content
@@ -185,22 +297,74 @@ class PPTAgenticPipeline:
         
         return sorted_slides
     
-    def get_slide_recommendations(self, balance_sheet_text: str, company_profile_text: str) -> List[str]:
+    def _get_parsed_document(self, balance_sheet_text: str, company_profile_text: str,
+                             parsed_document: ParsedDocument = None) -> ParsedDocument:
+        """Return the given parse, the RAG pipeline's parse, or parse the upload now"""
+        if parsed_document is not None:
+            return parsed_document
+        if self.rag_pipeline and getattr(self.rag_pipeline, 'parsed_document', None):
+            return self.rag_pipeline.parsed_document
+        return DocumentParser.parse(balance_sheet_text, company_profile_text, llm_service=self.llm_service)
+    
+    def prefetch(self, balance_sheet_text: str, company_profile_text: str,
+                 parsed_document: ParsedDocument = None,
+                 progress_callback: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Compute the slide-independent inputs of deck generation ahead of time
+        
+        Args:
+            balance_sheet_text: Raw balance sheet text
+            company_profile_text: Raw company profile text
+            parsed_document: Optional document already parsed for this session
+            progress_callback: Optional callable notified with 'recommendations',
+                'context' and 'company_data' as each starts
+            
+        Returns:
+            Dictionary with 'recommendations', 'context_map' (retrieved and
+            compressed context of every slide type, when a RAG pipeline is
+            available) and 'company_data' (enriched), to pass to generate_presentation
+        """
+        document = self._get_parsed_document(balance_sheet_text, company_profile_text, parsed_document)
+        
+        if progress_callback:
+            progress_callback('recommendations')
+        prefetched = {
+            'recommendations': self.get_slide_recommendations(balance_sheet_text, company_profile_text, document)
+        }
+        
+        if progress_callback:
+            progress_callback('context')
+        if self.rag_pipeline:
+            prefetched['context_map'] = self.rag_pipeline.get_context_for_ppt(self.SLIDE_TYPES)
+        
+        if progress_callback:
+            progress_callback('company_data')
+        company_data = copy.deepcopy(document.company_data)
+        if company_profile_text:
+            company_data = self._ensure_comprehensive_company_data(company_data, company_profile_text)
+        prefetched['company_data'] = company_data
+        
+        return prefetched
+    
+    def get_slide_recommendations(self, balance_sheet_text: str, company_profile_text: str,
+                                  parsed_document: ParsedDocument = None) -> List[str]:
         """
         Recommend slides based on available data
         
         Args:
             balance_sheet_text: Raw balance sheet text
             company_profile_text: Raw company profile text
+            parsed_document: Optional document already parsed for this session
             
         Returns:
             List of recommended slide types
         """
         recommendations = ['title', 'executive', 'conclusion']
         
-        # Parse balance sheet data first
-        balance_data = self.parser.parse_balance_sheet(balance_sheet_text)
-        metrics = self.parser.extract_financial_metrics(balance_data)
+        # Use the shared parse of the upload
+        document = self._get_parsed_document(balance_sheet_text, company_profile_text, parsed_document)
+        balance_data = document.balance_data
+        metrics = document.metrics
         
         # Recommend based on data availability
         if balance_data and balance_data.get('assets'):
@@ -218,12 +382,7 @@ class PPTAgenticPipeline:
         
         # Check company profile data
         if company_profile_text:
-            # Use enhanced parser if RAG pipeline available
-            if self.rag_pipeline and hasattr(self.rag_pipeline, 'company_data') and self.rag_pipeline.company_data:
-                company_data = self.rag_pipeline.company_data
-            else:
-                from utils.enhanced_company_parser import EnhancedCompanyParser
-                company_data = EnhancedCompanyParser.parse_brochure(company_profile_text, self.llm_service)
+            company_data = document.company_data
             
             if company_data.get('vision') or company_data.get('mission'):
                 if 'vision_mission' not in recommendations:
@@ -251,6 +410,9 @@ class PPTAgenticPipeline:
         """
         Ensure company_data has all necessary fields by extracting from brochure text if sparse
         
+        Uses EnhancedCompanyParser's extraction (one schema, one cache entry per
+        brochure), so the company slide builders only read company_data.
+        
         Args:
             company_data: Existing parsed company data
             brochure_text: Raw brochure text
@@ -279,65 +441,20 @@ class PPTAgenticPipeline:
         if not company_data.get('vision') and not company_data.get('mission'):
             needs_enhancement = True
         
-        # Use LLM to extract comprehensive data if needed
+        # Fill sparse fields from the brochure's LLM extraction: the same cached
+        # result the document parse used, so this normally costs no LLM call
         if needs_enhancement and brochure_text:
             try:
-                prompt = f"""Extract comprehensive company information from this brochure text.
-Extract ALL available information including products, services, markets, locations, leadership, projects, clients, vision, mission, values.
-
-Brochure Text:
-{brochure_text[:6000]}
-
-Return a JSON object with these fields (extract everything you can find):
-{{
-    "products_services": ["product 1", "product 2", ...],
-    "product_categories": ["category 1", ...],
-    "markets": ["market 1", "market 2", ...],
-    "locations": ["location 1", ...],
-    "leadership": ["Name - Role", ...],
-    "major_projects": ["project 1", ...],
-    "clients": ["client 1", ...],
-    "vision": "vision statement",
-    "mission": "mission statement",
-    "values": ["value 1", ...],
-    "usps": ["USP 1", ...],
-    "ceo_message": "CEO message text",
-    "manufacturing": "manufacturing details",
-    "certifications": ["cert 1", ...]
-}}
-
-Extract ALL information that exists in the text. Be comprehensive."""
-
-                response = self.llm_service.client.chat.completions.create(
-                    model=Config.MODEL,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert at extracting comprehensive company information from brochures. Extract ALL available information. Return ONLY valid JSON."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    temperature=0.1,
-                    max_tokens=2000
-                )
-                
-                content = response.choices[0].message.content.strip()
-                content = content.replace('```json', '').replace('```', '').strip()
-                
-                import json
-                enhanced_data = json.loads(content)
+                enhanced_data = EnhancedCompanyParser._extract_with_llm(brochure_text, self.llm_service)
                 
                 # Merge with existing data (enhanced data takes precedence if existing is sparse)
                 for key, value in enhanced_data.items():
                     if key in company_data:
                         if isinstance(value, list) and value:
-                            # Merge lists, remove duplicates
+                            # Merge lists, remove duplicates (existing items first)
                             existing = company_data.get(key, [])
                             if isinstance(existing, list):
-                                combined = list(set(existing + value))
+                                combined = MapReduceExtractor.dedupe(existing + value)
                                 company_data[key] = combined if combined else value
                             else:
                                 company_data[key] = value
@@ -355,22 +472,76 @@ Extract ALL information that exists in the text. Be comprehensive."""
         
         return company_data
     
-    def generate_executive_brief(self, slides: List[Dict]) -> str:
+    def generate_executive_brief(self, slides: List[Dict], parsed_document: ParsedDocument = None) -> str:
         """
-        Generate executive brief from slides
+        Generate executive brief from slides and the parsed statements
+        
+        The brief is filled in from a fixed template (no LLM call): headline
+        balance sheet totals, the overall health assessment with its leading
+        strength or concern, and the latest trend.
         
         Args:
-            slides: Generated slides
+            slides: Generated slides (their figures come from the same parsed document)
+            parsed_document: Parsed document of the session (defaults to the RAG pipeline's)
             
         Returns:
             Executive brief text
         """
-        prompt = f"""Based on the following slide contents, generate a concise executive brief (3-4 sentences) summarizing the key findings.
+        if parsed_document is None and self.rag_pipeline:
+            parsed_document = getattr(self.rag_pipeline, 'parsed_document', None)
+        document = parsed_document or ParsedDocument()
+        metrics = document.metrics or {}
+        
+        company = document.company_data.get('company_name') or 'The company'
+        
+        sentences = []
+        if metrics.get('total_assets'):
+            period = document.ratios.get('current_period')
+            sentences.append(
+                f"{company} reports total assets of ${metrics['total_assets']:,.2f}, total liabilities of "
+                f"${metrics.get('total_liabilities', 0):,.2f} and equity of ${metrics.get('total_equity', 0):,.2f}"
+                f"{f' for {period}' if period else ''}."
+            )
+        
+        analysis = self.content_agent.analyzer.analyze_balance_sheet(document.balance_data, metrics, document.ratios)
+        strengths = analysis.get('strengths', [])
+        concerns = analysis.get('concerns', [])
+        sentences.append(
+            f"Overall financial health is {analysis.get('overall_health', 'Moderate').lower()}, with "
+            f"{len(strengths)} key strength{'s' if len(strengths) != 1 else ''} and "
+            f"{len(concerns)} area{'s' if len(concerns) != 1 else ''} of concern."
+        )
+        if strengths:
+            sentences.append(f"Leading strength: {strengths[0]}.")
+        if concerns:
+            sentences.append(f"Main concern: {concerns[0]}.")
+        if analysis.get('trends'):
+            sentences.append(f"{analysis['trends'][0]}.")
+        
+        return ' '.join(sentences)
+    
+    def polish_executive_brief(self, brief: str, slides: List[Dict]) -> Tuple[str, bool]:
+        """
+        Rewrite the template executive brief as fluent prose with the LLM
+        
+        Args:
+            brief: Brief from generate_executive_brief
+            slides: Generated slides
+            
+        Returns:
+            Tuple of (brief, polished): the polished brief and True, or the template
+            brief and False if the LLM call failed or returned nothing
+        """
+        prompt = f"""Rewrite the following executive brief as a concise, professional executive brief (3-4 sentences).
+Keep every figure exactly as given and do not add facts that are not in the brief or the slides.
+
+Brief:
+{brief}
 
 Slides:
 {self._format_slides_for_llm(slides)}
 
-Provide a professional executive brief:"""
+Provide the rewritten executive brief:"""
         
         try:
             response = self.llm_service.client.chat.completions.create(
@@ -388,9 +559,11 @@ Provide a professional executive brief:"""
                 temperature=0.5,
                 max_tokens=300
             )
-            return response.choices[0].message.content.strip()
+            polished = (response.choices[0].message.content or '').strip()
+            return (polished, True) if polished else (brief, False)
         except Exception as e:
-            return f"Executive brief generation failed: {str(e)}"
+            print(f"Warning: Executive brief polish failed: {e}")
+            return brief, False
     
     def _format_slides_for_llm(self, slides: List[Dict]) -> str:
         """Format slides for LLM processing"""
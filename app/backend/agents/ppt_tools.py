@@ -3,19 +3,66 @@ from typing import Dict, Any, List, Optional
 import json
 import re
 from config import Config
+from utils.ratio_engine import RatioEngine
 
 
 class FinancialAnalyzerTool:
     """Tool for analyzing financial data and extracting insights"""
     
+    # (upper bound, interpretation) checked in order; the last entry catches everything above
+    RATIO_INTERPRETATIONS = {
+        'current_ratio': [(1, "Potential liquidity concerns"), (1.5, "Adequate liquidity"),
+                          (2, "Good short-term financial health"), (None, "Excellent liquidity position")],
+        'quick_ratio': [(0.5, "Relies on inventory to meet short-term obligations"), (1, "Acceptable quick liquidity"),
+                        (None, "Covers current liabilities without selling inventory")],
+        'cash_ratio': [(0.2, "Thin cash buffer"), (0.5, "Moderate cash buffer"), (None, "Strong cash position")],
+        'debt_to_equity': [(0.5, "Conservative capital structure"), (1, "Balanced leverage"),
+                           (2, "Moderate leverage"), (None, "High leverage - monitor closely")],
+        'debt_to_assets': [(0.3, "Assets largely funded by equity"), (0.6, "Balanced funding mix"),
+                           (None, "Assets largely funded by liabilities")],
+        'equity_multiplier': [(1.5, "Low financial leverage"), (2.5, "Moderate financial leverage"),
+                              (None, "High financial leverage")]
+    }
+    
+    @staticmethod
+    def interpret_ratio(key: str, value: float) -> str:
+        """Return a short interpretation of a ratio value"""
+        for upper, text in FinancialAnalyzerTool.RATIO_INTERPRETATIONS.get(key, []):
+            if upper is None or value <= upper:
+                return text
+        return ''
+    
     @staticmethod
-    def analyze_balance_sheet(balance_data: Dict, metrics: Dict) -> Dict[str, Any]:
+    def ratio_slide_rows(ratios: Dict) -> List[Dict[str, str]]:
+        """
+        Build ratio rows for the current period from a RatioEngine report
+        
+        Args:
+            ratios: RatioEngine report for the session
+            
+        Returns:
+            List of rows with name, value, interpretation and benchmark
+        """
+        latest = ratios.get('latest', {})
+        return [
+            {
+                'name': row['name'],
+                'value': row['value'],
+                'interpretation': FinancialAnalyzerTool.interpret_ratio(row['key'], latest[row['key']]),
+                'benchmark': row['benchmark']
+            }
+            for row in RatioEngine.ratio_rows(ratios)
+        ]
+    
+    @staticmethod
+    def analyze_balance_sheet(balance_data: Dict, metrics: Dict, ratios: Dict = None) -> Dict[str, Any]:
         """
         Analyze balance sheet and extract key insights
         
         Args:
             balance_data: Parsed balance sheet data
             metrics: Calculated financial metrics
+            ratios: Optional RatioEngine report; adds quick ratio checks and period-over-period trends
             
         Returns:
             Dictionary with analysis results
@@ -60,6 +107,18 @@ class FinancialAnalyzerTool:
             elif current_ratio < 1:
                 insights['concerns'].append(f"Potential liquidity issues (Current Ratio: {current_ratio:.2f})")
         
+        # Analyze quick ratio (liquidity without inventory)
+        quick_ratio = metrics.get('quick_ratio', 0)
+        if quick_ratio > 0:
+            insights['key_metrics']['quick_ratio'] = quick_ratio
+            
+            if quick_ratio < 1 <= current_ratio:
+                insights['concerns'].append(f"Liquidity depends on inventory (Quick Ratio: {quick_ratio:.2f})")
+        
+        # Period-over-period trends
+        if ratios:
+            insights['trends'] = RatioEngine.growth_insights(ratios)
+        
         # Overall health assessment
         strength_count = len(insights['strengths'])
         concern_count = len(insights['concerns'])
@@ -2,7 +2,12 @@
 from typing import List, Dict, Any, Optional
 from utils.pdf_extractor import PDFExtractor
 from services.embedding_service import EmbeddingService
+from services.vector_store import CompactVectorStore
+from services.extraction_cache import get_backend
 from config import Config
+import difflib
+import hashlib
+import numpy as np
 import os
 import json
 import re
@@ -20,12 +25,12 @@ try:
 except ImportError:
     HAS_GOOGLE_SEARCH = False
 
-# Try to import langchain, fallback to simple splitter
+# Try to import tiktoken for exact token counts, fallback to an estimate
 try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    HAS_LANGCHAIN = True
+    import tiktoken
+    HAS_TIKTOKEN = True
 except ImportError:
-    HAS_LANGCHAIN = False
+    HAS_TIKTOKEN = False
 
 
 class PDFLoaderTool:
@@ -71,97 +76,175 @@ class PDFLoaderTool:
 
 
 class TextSplitterTool:
-    """Tool for splitting text into chunks"""
-    
-    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 100):
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
-        if HAS_LANGCHAIN:
-            self.splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                length_function=len,
-                separators=["\n\n", "\n", ". ", " ", ""]
-            )
-        else:
-            self.splitter = None
+    """
+    Tool for splitting text into chunks of about chunk_size tokens
+    
+    Text is split on paragraphs, then lines, then sentences (keeping their
+    punctuation) and only then on words, and the pieces are packed into chunks
+    close to the target size. Consecutive chunks share up to chunk_overlap tokens
+    of whole pieces. Table rows are packed whole under their section header.
+    """
+    
+    PARAGRAPH_PATTERN = re.compile(r'\n\s*\n')
+    SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+    TOKEN_ESTIMATE_PATTERN = re.compile(r'\w+|[^\w\s]')
+    
+    _encoding = None
+    
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+        """
+        Initialize splitter
+        
+        Args:
+            chunk_size: Target chunk size in tokens (defaults to Config.CHUNK_TOKENS)
+            chunk_overlap: Tokens shared by consecutive chunks (defaults to Config.CHUNK_OVERLAP_TOKENS)
+        """
+        self.chunk_size = chunk_size or Config.CHUNK_TOKENS
+        self.chunk_overlap = Config.CHUNK_OVERLAP_TOKENS if chunk_overlap is None else chunk_overlap
+    
+    @classmethod
+    def count_tokens(cls, text: str) -> int:
+        """
+        Count the tokens of text for the embedding model
+        
+        Uses tiktoken when installed; otherwise estimates from words and
+        punctuation (at least one token per four characters).
+        """
+        if HAS_TIKTOKEN:
+            if cls._encoding is None:
+                try:
+                    cls._encoding = tiktoken.encoding_for_model(Config.EMBEDDING_MODEL)
+                except KeyError:
+                    cls._encoding = tiktoken.get_encoding('cl100k_base')
+            return len(cls._encoding.encode(text, disallowed_special=()))
+        return max(len(cls.TOKEN_ESTIMATE_PATTERN.findall(text)), -(-len(text) // 4))
     
-    def split(self, text: str, metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+    def split(self, text: str, metadata: Optional[Dict] = None) -> List['Chunk']:
         """
         Split text into chunks
         
         Args:
             text: Text to split
-            metadata: Optional metadata to attach to chunks
+            metadata: Optional metadata shared by the chunks
             
         Returns:
-            List of chunk dictionaries with text and metadata
+            List of Chunk records with text, metadata and index
         """
-        if self.splitter:
-            chunks = self.splitter.split_text(text)
-        else:
-            # Fallback simple splitter
-            chunks = self._simple_split(text)
-        
-        result = []
-        for i, chunk in enumerate(chunks):
-            chunk_meta = metadata.copy() if metadata else {}
-            chunk_meta.update({
-                'chunk_index': i,
-                'total_chunks': len(chunks),
-                'chunk_size': len(chunk)
-            })
-            result.append({
-                'text': chunk,
-                'metadata': chunk_meta
-            })
-        
-        return result
-    
-    def _simple_split(self, text: str) -> List[str]:
-        """Simple text splitter fallback"""
-        # Split by paragraphs first
-        paragraphs = re.split(r'\n\n+', text)
-        chunks = []
-        current_chunk = ""
+        pieces = []
+        for paragraph in self.PARAGRAPH_PATTERN.split(text):
+            pieces.extend(self._pieces(paragraph.strip(), 0))
+        return self._to_chunks(self._pack(pieces, '\n'), metadata)
+    
+    def split_rows(self, header: str, rows: List[str], metadata: Optional[Dict] = None) -> List['Chunk']:
+        """
+        Pack table rows into chunks that each start with the section header
         
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-            
-            # If adding this paragraph would exceed chunk size, save current chunk
-            if current_chunk and len(current_chunk) + len(para) > self.chunk_size:
-                chunks.append(current_chunk)
-                # Start new chunk with overlap
-                if self.chunk_overlap > 0 and current_chunk:
-                    overlap_text = current_chunk[-self.chunk_overlap:]
-                    current_chunk = overlap_text + "\n\n" + para
-                else:
-                    current_chunk = para
-            else:
-                if current_chunk:
-                    current_chunk += "\n\n" + para
-                else:
-                    current_chunk = para
+        Rows are never split unless a single row exceeds the chunk size.
+        
+        Args:
+            header: Section header repeated at the top of every chunk
+            rows: Row texts in table order
+            metadata: Optional metadata shared by the chunks
             
-            # If single paragraph is too long, split by sentences
-            if len(current_chunk) > self.chunk_size:
-                sentences = re.split(r'[.!?]+\s+', current_chunk)
-                temp_chunk = ""
-                for sentence in sentences:
-                    if len(temp_chunk) + len(sentence) > self.chunk_size:
-                        if temp_chunk:
-                            chunks.append(temp_chunk)
-                        temp_chunk = sentence
-                    else:
-                        temp_chunk += ". " + sentence if temp_chunk else sentence
-                current_chunk = temp_chunk
-        
-        if current_chunk:
-            chunks.append(current_chunk)
+        Returns:
+            List of Chunk records with text, metadata and index
+        """
+        budget = max(self.chunk_size - self.count_tokens(header), 1)
+        splitter = TextSplitterTool(budget, min(self.chunk_overlap, budget // 2))
+        pieces = []
+        for row in rows:
+            row = row.strip()
+            if row:
+                pieces.extend(splitter._pieces(row, 0))
+        chunks = [f"{header}\n{chunk}" for chunk in splitter._pack(pieces, '\n')]
+        return self._to_chunks(chunks, metadata)
+    
+    def _pieces(self, text: str, level: int) -> List[tuple]:
+        """Split text into (text, tokens) pieces that fit the chunk size, coarsest boundaries first"""
+        if not text:
+            return []
+        tokens = self.count_tokens(text)
+        if tokens <= self.chunk_size:
+            return [(text, tokens)]
+        
+        if level == 0:
+            parts = text.split('\n')
+        elif level == 1:
+            parts = self.SENTENCE_PATTERN.split(text)
+        else:
+            # Oversized sentence: pack words
+            words = text.split()
+            if len(words) <= 1:
+                return [(text, tokens)]
+            parts = self._pack([(word, self.count_tokens(word)) for word in words], ' ', overlap=False)
+            return [(part, self.count_tokens(part)) for part in parts]
         
+        if len(parts) == 1:
+            return self._pieces(text, level + 1)
+        pieces = []
+        for part in parts:
+            pieces.extend(self._pieces(part.strip(), level + 1))
+        return pieces
+    
+    def _pack(self, pieces: List[tuple], separator: str, overlap: bool = True) -> List[str]:
+        """Join consecutive pieces into chunks of at most chunk_size tokens with trailing-piece overlap"""
+        chunks = []
+        current = []
+        size = 0
+        for piece in pieces:
+            if current and size + piece[1] > self.chunk_size:
+                chunks.append(separator.join(text for text, _ in current))
+                # Carry whole trailing pieces that fit in the overlap budget
+                carried = []
+                carried_size = 0
+                if overlap:
+                    for previous in reversed(current):
+                        if carried_size + previous[1] > self.chunk_overlap or \
+                                carried_size + previous[1] + piece[1] > self.chunk_size:
+                            break
+                        carried.insert(0, previous)
+                        carried_size += previous[1]
+                current, size = carried, carried_size
+            current.append(piece)
+            size += piece[1]
+        if current:
+            chunks.append(separator.join(text for text, _ in current))
         return chunks
+    
+    @staticmethod
+    def _to_chunks(chunks: List[str], metadata: Optional[Dict]) -> List['Chunk']:
+        # All chunks of one split share a single metadata dict
+        metadata = dict(metadata) if metadata else {}
+        return [Chunk(chunk, metadata, i) for i, chunk in enumerate(chunks)]
+
+
+class Chunk:
+    """
+    One chunk of split text
+    
+    A slotted record instead of a dict per chunk: chunks from the same split
+    share one metadata dict, and the position is an attribute rather than
+    extra metadata keys. Supports chunk['text'] / chunk.get('metadata') access.
+    """
+    
+    __slots__ = ('text', 'metadata', 'index')
+    
+    def __init__(self, text: str, metadata: Dict[str, Any], index: int = 0):
+        self.text = text
+        self.metadata = metadata
+        self.index = index
+    
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+    
+    def __repr__(self) -> str:
+        return f"Chunk(index={self.index}, text={self.text[:40]!r})"
 
 
 class EmbedderTool:
@@ -187,13 +270,35 @@ class EmbedderTool:
         """
         Create embeddings for multiple texts
         
+        Embeddings are persisted by model and text hash, so re-ingesting a session
+        whose in-memory collection is gone (restart, pipeline cache eviction) does
+        not call the embedding API again for unchanged chunks.
+        
         Args:
             texts: List of texts to embed
             
         Returns:
             List of embedding vectors
         """
-        return [self.embedding_service.create_embedding(text) for text in texts]
+        if not Config.ENABLE_EMBEDDING_CACHE:
+            return [self.embedding_service.create_embedding(text) for text in texts]
+        
+        backend = get_backend()
+        keys = [f"embedding:{self.model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}" for text in texts]
+        cached = backend.mget(keys)
+        
+        # Embed each missing text once and store them all in one write
+        missing = {key: text for key, text, value in zip(keys, texts, cached) if value is None}
+        created = {key: self.embedding_service.create_embedding(text) for key, text in missing.items()}
+        if created:
+            backend.set_many(
+                {key: np.asarray(embedding, dtype=np.float32).tobytes() for key, embedding in created.items()},
+                ex=Config.EXTRACTION_CACHE_TTL
+            )
+        return [
+            np.frombuffer(value, dtype=np.float32).tolist() if value is not None else created[key]
+            for key, value in zip(keys, cached)
+        ]
 
 
 class VectorDBTool:
@@ -217,46 +322,62 @@ class VectorDBTool:
                 name=db_name,
                 metadata={"hnsw:space": "cosine"}
             )
-            self._in_memory_store = []  # Not used when ChromaDB is available
+            self._in_memory_store = None  # Not used when ChromaDB is available
             self.use_chromadb = True
         except ImportError:
             # Fallback to in-memory storage if ChromaDB not available
             print("Warning: ChromaDB not installed, using in-memory storage")
             self.collection = None
-            self._in_memory_store = []
+            self._in_memory_store = CompactVectorStore()
             self.use_chromadb = False
     
+    @staticmethod
+    def chunk_id(document: Dict[str, Any]) -> str:
+        """
+        Return the content-addressed ID of a chunk
+        
+        The ID hashes the chunk text with its source and section, so an unchanged
+        chunk keeps its ID (and embedding) when an updated document is re-ingested.
+        """
+        metadata = document.get('metadata', {})
+        key = '\x1f'.join([
+            str(metadata.get('source', '')),
+            str(metadata.get('section', '')),
+            document.get('text', '')
+        ])
+        return 'chunk_' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+    
     def store(self, documents: List[Dict[str, Any]], embeddings: List[List[float]], 
-              metadatas: List[Dict] = None) -> bool:
+              metadatas: List[Dict] = None, ids: List[str] = None) -> bool:
         """
-        Store documents with embeddings in vector DB
+        Store documents with embeddings in vector DB (documents with an existing ID are replaced)
         
         Args:
             documents: List of document dictionaries with 'text' and 'metadata'
             embeddings: List of embedding vectors
             metadatas: Optional list of metadata dictionaries
+            ids: Optional document IDs (defaults to chunk_id() of each document)
             
         Returns:
             True if successful
         """
+        if metadatas is None:
+            metadatas = [doc.get('metadata', {}) for doc in documents]
+        if ids is None:
+            ids = [self.chunk_id(doc) for doc in documents]
+        
         if not self.use_chromadb or self.collection is None:
             # In-memory fallback
-            for doc, emb, meta in zip(documents, embeddings, metadatas or [{}] * len(documents)):
-                self._in_memory_store.append({
-                    'text': doc.get('text', ''),
-                    'embedding': emb,
-                    'metadata': meta
-                })
+            self._in_memory_store.upsert(ids, [doc.get('text', '') for doc in documents], embeddings, metadatas)
             return True
         
-        texts = [doc.get('text', '') for doc in documents]
-        ids = [f"doc_{i}" for i in range(len(texts))]
+        if not documents:
+            return True
         
-        if metadatas is None:
-            metadatas = [doc.get('metadata', {}) for doc in documents]
+        texts = [doc.get('text', '') for doc in documents]
         
         try:
-            self.collection.add(
+            self.collection.upsert(
                 embeddings=embeddings,
                 documents=texts,
                 metadatas=metadatas,
@@ -266,6 +387,39 @@ class VectorDBTool:
         except Exception as e:
             raise Exception(f"Error storing in vector DB: {str(e)}")
     
+    def ids(self) -> List[str]:
+        """Return the IDs of all stored documents"""
+        if not self.use_chromadb or self.collection is None:
+            return self._in_memory_store.ids()
+        return self.collection.get(include=[])['ids']
+    
+    def delete(self, ids: List[str]) -> int:
+        """
+        Delete documents by ID
+        
+        Args:
+            ids: Document IDs to delete (unknown IDs are ignored)
+            
+        Returns:
+            Number of IDs requested for deletion
+        """
+        if not ids:
+            return 0
+        if not self.use_chromadb or self.collection is None:
+            self._in_memory_store.delete(ids)
+            return len(ids)
+        try:
+            self.collection.delete(ids=list(ids))
+            return len(ids)
+        except Exception as e:
+            raise Exception(f"Error deleting from vector DB: {str(e)}")
+    
+    def count(self) -> int:
+        """Return the number of stored documents"""
+        if not self.use_chromadb or self.collection is None:
+            return len(self._in_memory_store)
+        return self.collection.count()
+    
     def search(self, query_embedding: List[float], k: int = 4, 
                filter_metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """
@@ -281,20 +435,7 @@ class VectorDBTool:
         """
         if not self.use_chromadb or self.collection is None:
             # In-memory fallback
-            from services.embedding_service import EmbeddingService
-            emb_service = EmbeddingService()
-            results = []
-            for item in self._in_memory_store:
-                similarity = emb_service.cosine_similarity(
-                    query_embedding, item['embedding']
-                )
-                results.append({
-                    'text': item['text'],
-                    'metadata': item['metadata'],
-                    'score': similarity
-                })
-            results.sort(key=lambda x: x['score'], reverse=True)
-            return results[:k]
+            return self._in_memory_store.search(query_embedding, k, filter_metadata)
         
         try:
             where = filter_metadata if filter_metadata else None
@@ -457,6 +598,348 @@ Return a JSON object with:
             }
 
 
+class BalanceSheetLookupTool:
+    """Tool for answering factual balance sheet questions directly from the parsed table"""
+    
+    # "What were ...", "How much ...", "Show me ..." - single-figure questions
+    QUESTION_PATTERN = re.compile(
+        r"^\s*(what|what's|how much|show|tell me|give me|find)\b|\b(value|amount|figure) of\b",
+        re.IGNORECASE
+    )
+    # Explanations, comparisons and judgements need the full pipeline
+    OPEN_ENDED_PATTERN = re.compile(
+        r'\b(why|explain|how has|how did|how does|compare[ds]?|comparison|trends?|changed?|changes|'
+        r'differ|difference|versus|vs|analy[sz]e|analysis|should|could|would|impact|reasons?|'
+        r'good|bad|healthy|between)\b',
+        re.IGNORECASE
+    )
+    PREVIOUS_PATTERN = re.compile(r'\b(previous|prior|preceding)\s+(year|period)\b', re.IGNORECASE)
+    YEAR_PATTERN = re.compile(r'(?<!\d)(?:19|20)\d{2}(?!\d)')
+    
+    STOPWORDS = {
+        'what', 'whats', 'is', 'was', 'were', 'are', 'the', 'a', 'an', 'of', 'in', 'for', 'on', 'at',
+        'as', 'to', 'by', 'our', 'their', 'its', 'it', 'company', 'companys', 's', 'how', 'much',
+        'show', 'me', 'tell', 'give', 'find', 'please', 'value', 'amount', 'figure', 'balance',
+        'sheet', 'reported', 'fy', 'year', 'period', 'end', 'ending', 'ended', 'did', 'do', 'does',
+        'we', 'have', 'has', 'had', 'previous', 'prior', 'preceding', 'latest', 'this', 'that',
+        'there', 'stand', 'stood', 'level', 'position'
+    }
+    # Candidate words a question may leave out ("debt to equity" for "Debt-to-Equity ratio")
+    OPTIONAL_TOKENS = {'ratio'}
+    
+    def __init__(self, table, ratios: Dict[str, Any] = None, min_similarity: float = None):
+        """
+        Initialize lookup tool
+        
+        Args:
+            table: BalanceSheetTable of the session
+            ratios: RatioEngine report of the session (totals and ratios are looked up too)
+            min_similarity: Minimum similarity for a misspelled word to match (defaults to Config)
+        """
+        from utils.ratio_engine import RatioEngine
+        
+        self.table = table
+        self.ratios = ratios or {}
+        self.min_similarity = min_similarity or Config.STRUCTURED_LOOKUP_MIN_SIMILARITY
+        
+        # (tokens, label, kind, key) - table rows first so that document figures win ties
+        self._candidates = []
+        for i, label in enumerate(table.frame['line_item']):
+            self._candidates.append((self._tokens(label), label, 'row', i))
+        
+        ratio_names = {key: name for key, name, _ in RatioEngine.RATIO_DEFINITIONS}
+        for metric in self.ratios.get('values', {}):
+            label = ratio_names.get(metric, metric.replace('_', ' ').capitalize())
+            if metric in ratio_names and 'ratio' not in label.lower():
+                label += ' ratio'
+            self._candidates.append((self._tokens(label), label, 'ratio' if metric in ratio_names else 'metric', metric))
+    
+    @classmethod
+    def _tokens(cls, text: str) -> frozenset:
+        """Normalized content words: lowercase, singular, without stopwords and years"""
+        text = cls.YEAR_PATTERN.sub(' ', text.lower().replace('&', ' and ').replace("'", ''))
+        words = re.findall(r'[a-z0-9]+', text)
+        tokens = set()
+        for word in words:
+            if word in cls.STOPWORDS or word.isdigit():
+                continue
+            if len(word) > 4 and word.endswith('ies'):
+                word = word[:-3] + 'y'
+            elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+                word = word[:-1]
+            tokens.add(word)
+        tokens.discard('and')
+        return frozenset(tokens)
+    
+    def _similar(self, word: str, words: frozenset) -> bool:
+        if word in words:
+            return True
+        if len(word) < 4:
+            return False
+        return any(
+            len(other) >= 4 and difflib.SequenceMatcher(None, word, other).ratio() >= self.min_similarity
+            for other in words
+        )
+    
+    def _covers(self, candidate: frozenset, query: frozenset) -> bool:
+        """Every query word is in the candidate and every required candidate word is in the query"""
+        return (all(self._similar(word, candidate) for word in query) and
+                all(self._similar(word, query) for word in candidate - self.OPTIONAL_TOKENS))
+    
+    def _resolve_period(self, query: str) -> Optional[str]:
+        """Return the period a question refers to (current period if none is named)"""
+        periods = self.table.periods
+        years = set(self.YEAR_PATTERN.findall(query))
+        if len(years) > 1:
+            return None
+        if years:
+            year = years.pop()
+            for period in periods:
+                match = self.table.YEAR_PATTERN.match(period)
+                if match and match.group(1) == year:
+                    return period
+            return None
+        
+        chronological = self.ratios.get('periods') or periods
+        if self.PREVIOUS_PATTERN.search(query):
+            return chronological[-2] if len(chronological) > 1 else None
+        
+        query_lower = query.lower()
+        named = [period for period in periods if not period.startswith('Period ') and period.lower() in query_lower]
+        if len(named) == 1:
+            return named[0]
+        return self.table.current_period
+    
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Answer a single-figure question from the table
+        
+        Args:
+            query: User question
+        
+        Returns:
+            Dictionary with answer, line_item, period, value and citation, or None
+            when there is no confident structured match
+        """
+        if not len(self.table) or not self.QUESTION_PATTERN.search(query) or self.OPEN_ENDED_PATTERN.search(query):
+            return None
+        
+        query_tokens = self._tokens(query)
+        period = self._resolve_period(query)
+        if not query_tokens or period is None:
+            return None
+        
+        matches = [candidate for candidate in self._candidates if self._covers(candidate[0], query_tokens)]
+        if not matches:
+            return None
+        
+        # Prefer document rows; identical labels with different values are ambiguous
+        rows = [match for match in matches if match[2] == 'row']
+        if rows:
+            values = {self._value(match, period) for match in rows}
+            values.discard(None)
+            if len(values) != 1:
+                return None
+            _, label, kind, key = rows[0]
+            value = values.pop()
+        else:
+            _, label, kind, key = matches[0]
+            value = self._value(matches[0], period)
+            if value is None:
+                return None
+        
+        formatted = self._format(value, kind)
+        if kind == 'row':
+            citation = f"Balance sheet: {label} ({period})"
+            source = f"{label} ({period}): {formatted}"
+        else:
+            citation = f"Computed from balance sheet totals ({period})"
+            source = f"{label} computed for {period}: {formatted}"
+        
+        return {
+            'answer': f"{label} for {period} was {formatted}.",
+            'line_item': label,
+            'period': period,
+            'value': value,
+            'kind': kind,
+            'citation': citation,
+            'source': source
+        }
+    
+    def _value(self, candidate, period: str) -> Optional[float]:
+        _, _, kind, key = candidate
+        if kind == 'row':
+            value = self.table.frame.at[key, period]
+        else:
+            periods = self.ratios.get('periods', [])
+            if period not in periods:
+                return None
+            value = self.ratios['values'][key][periods.index(period)]
+        if value is None or value != value:
+            return None
+        return float(value)
+    
+    @staticmethod
+    def _format(value: float, kind: str) -> str:
+        if kind == 'ratio':
+            return f"{value:.2f}"
+        return f"{value:,.0f}" if value.is_integer() else f"{value:,.2f}"
+
+
+class CompanyProfileLookupTool:
+    """Tool for answering entity questions (clients, leadership, locations, ...) from parsed company data"""
+    
+    # (intent, pattern, fields, label) checked in order; the first matching intent is the candidate
+    INTENTS = [
+        ('ceo_message', re.compile(r"\b(ceo|chairman|md)'?s? message\b|\bmessage from the (ceo|chairman|md)\b", re.I),
+         ['ceo_message'], "CEO's Message"),
+        ('founded', re.compile(r'\b(founded|established|incorporated|inception|how old|year of establishment)\b'
+                               r'|\bwhen (was|did) .*\b(start|begin|began|set up)\b', re.I),
+         ['founded'], 'Founded'),
+        ('clients', re.compile(r'\b(clients?|customers?|clientele|partners?)\b|\bwho (do|does) .*\b(serve|work with|work for)\b', re.I),
+         ['clients', 'clients_text'], 'Clients & Partners'),
+        ('leadership', re.compile(r'\b(leaders?|leadership|management( team)?|ceo|founders?|directors?|'
+                                  r'executives?|board|promoters?|chairman|owners?)\b|\bwho (runs|leads|manages|owns)\b', re.I),
+         ['leadership'], 'Leadership Team'),
+        ('certifications', re.compile(r'\b(certifi\w*|iso|accredit\w*|approvals?|compliance standards?)\b', re.I),
+         ['certifications'], 'Certifications & Standards'),
+        ('locations', re.compile(r'\b(locations?|located|offices?|headquarter\w*|hq|branch(es)?|plants?|facilit(y|ies)|'
+                                 r'presence|based)\b|\bwhere\b', re.I),
+         ['locations'], 'Locations & Presence'),
+        ('mission', re.compile(r'\bmission\b', re.I), ['mission'], 'Mission Statement'),
+        ('vision', re.compile(r'\bvision\b', re.I), ['vision'], 'Vision Statement'),
+        ('values', re.compile(r'\b(core|company|corporate|our|their|its) values\b|\bvalues of the company\b', re.I),
+         ['values'], 'Core Values'),
+        ('usps', re.compile(r'\b(usps?|unique selling|competitive (advantages?|edge)|differentiat\w*|strengths|why choose)\b', re.I),
+         ['usps'], 'Unique Selling Points'),
+        ('major_projects', re.compile(r'\b(projects?|case stud(y|ies)|achievements?|milestones?)\b', re.I),
+         ['major_projects'], 'Major Projects'),
+        ('manufacturing', re.compile(r'\b(manufactur\w*|production capacit(y|ies)|production facilit(y|ies))\b', re.I),
+         ['manufacturing'], 'Manufacturing Capabilities'),
+        ('markets', re.compile(r'\b(markets?|industries|sectors?|segments?|verticals?)\b', re.I),
+         ['markets'], 'Markets & Industries'),
+        ('products_services', re.compile(r'\b(products?|services?|offerings?|portfolio|solutions?)\b'
+                                         r'|\bwhat (do|does) .*\b(make|sell|offer|manufacture)\b', re.I),
+         ['products_services', 'product_categories'], 'Products & Services'),
+        ('industry', re.compile(r'\b(which|what) (industry|sector|business)\b|\bindustry\b', re.I),
+         ['industry'], 'Industry'),
+        ('history', re.compile(r'\b(history|background|journey)\b', re.I), ['history'], 'Company History'),
+        ('about_us', re.compile(r'\babout (the|this|your) company\b|\babout us\b|\bcompany overview\b'
+                                r'|\bwhat (does|do) (the|this) company do\b', re.I),
+         ['about_us'], 'About Us')
+    ]
+    
+    # Entity-list question forms ("who are / list / what are the <entity>") answered from a single field
+    QUESTION_PATTERN = re.compile(
+        r'^\s*(who|what|what\'s|where|when|which|list|name|tell me|show|give me|does|do|is|are)\b',
+        re.IGNORECASE
+    )
+    # Explanations, comparisons, opinions and numbers need the full pipeline
+    OPEN_ENDED_PATTERN = re.compile(
+        r'\b(why|explain|how (has|did|does|do|can|could|would|should)|compare[ds]?|comparison|versus|vs|'
+        r'impact|reasons?|opinion|think|should|recommend|revenue|profit|assets?|liabilit\w*|equity|ratio|'
+        r'debt|cash|how many|how much|percent\w*)\b',
+        re.IGNORECASE
+    )
+    # Words that may surround the entity keyword without changing what is asked
+    FILLER_WORDS = frozenset((
+        'who', 'what', 'whats', 'where', 'when', 'which', 'list', 'name', 'tell', 'me', 'show', 'give',
+        'does', 'do', 'did', 'is', 'are', 'was', 'were', 'has', 'have', 'had', 'can', 'could', 'please',
+        'the', 'a', 'an', 'of', 'for', 'to', 'in', 'on', 'at', 'by', 'with', 'from', 'about', 'and', 'or',
+        'all', 'any', 'some', 'its', 'it', 'their', 'they', 'them', 'your', 'you', 'our', 'us', 'we',
+        'this', 'that', 'these', 'those', 'there', 's', 'company', 'firm', 'organization', 'organisation',
+        'business', 'main', 'key', 'major', 'top', 'current', 'various', 'different', 'other',
+        'offer', 'offers', 'provide', 'provides', 'make', 'makes', 'sell', 'sells', 'serve', 'serves'
+    ))
+    MAX_LIST_ITEMS = 15
+    
+    def __init__(self, company_data: Dict[str, Any]):
+        """
+        Initialize lookup tool
+        
+        Args:
+            company_data: Company data from EnhancedCompanyParser
+        """
+        self.company_data = company_data or {}
+    
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Answer an entity question from a company data field
+        
+        Args:
+            query: User question
+            
+        Returns:
+            Dictionary with answer, intent, citation and source, or None when the
+            question is not a plain entity-list question or the field is empty
+        """
+        if not self.company_data or not self.QUESTION_PATTERN.search(query) or self.OPEN_ENDED_PATTERN.search(query):
+            return None
+        
+        company_name = str(self.company_data.get('company_name') or '').strip()
+        if company_name:
+            query = re.sub(re.escape(company_name), ' ', query, flags=re.IGNORECASE)
+        
+        match = next((entry for entry in self.INTENTS if entry[1].search(query)), None)
+        if match is None:
+            return None
+        intent, pattern, fields, label = match
+        
+        # Anything beyond the entity keyword (a second entity, "strategy", "background", ...)
+        # asks for more than the field holds and goes to the full pipeline
+        remainder = pattern.sub(' ', query)
+        if any(other[1].search(remainder) for other in self.INTENTS if other is not match):
+            return None
+        if any(word not in self.FILLER_WORDS for word in re.findall(r'[a-z]+', remainder.lower())):
+            return None
+        
+        answer = self._answer(intent, fields, label)
+        if not answer:
+            return None
+        return {
+            'answer': answer,
+            'intent': intent,
+            'citation': f"Company profile: {label}",
+            'source': answer
+        }
+    
+    @staticmethod
+    def _as_text(item) -> str:
+        if isinstance(item, dict):
+            return str(item.get('name') or item.get('title') or item.get('product') or
+                       ', '.join(str(value) for value in item.values() if value))
+        return str(item).strip()
+    
+    def _answer(self, intent: str, fields: List[str], label: str) -> Optional[str]:
+        """Fill the answer template for an intent ('' when its fields are empty)"""
+        company = self.company_data.get('company_name') or 'The company'
+        
+        if intent == 'founded':
+            founded = self._as_text(self.company_data.get('founded') or '')
+            return f"{company} was founded in {founded}." if founded else ''
+        if intent == 'industry':
+            industry = self._as_text(self.company_data.get('industry') or '')
+            return f"{company} operates in the {industry} industry." if industry else ''
+        
+        parts = []
+        for field in fields:
+            value = self.company_data.get(field)
+            if isinstance(value, list):
+                items = [text for text in (self._as_text(item) for item in value) if text]
+                items = list(dict.fromkeys(items))
+                if items:
+                    lines = [f"• {item}" for item in items[:self.MAX_LIST_ITEMS]]
+                    if len(items) > self.MAX_LIST_ITEMS:
+                        lines.append(f"• ...and {len(items) - self.MAX_LIST_ITEMS} more")
+                    parts.append('\n'.join(lines))
+            elif value:
+                parts.append(self._as_text(value))
+        
+        if not parts:
+            return ''
+        return f"{label} of {company}:\n" + '\n\n'.join(parts)
+
+
 class CompanyProfileParserTool:
     """Tool for parsing company profile/brochure - Enhanced version"""
     
@@ -466,139 +949,9 @@ class CompanyProfileParserTool:
     
     def parse(self, text: str) -> Dict:
         """Parse company profile/brochure into comprehensive sections"""
-        from utils.enhanced_company_parser import EnhancedCompanyParser
-        
-        # Parse with enhanced parser
-        company_data = EnhancedCompanyParser.parse_brochure(text, self.llm_service)
-        
-        # Create indexable sections for RAG
-        sections = []
-        
-        # Core information
-        if company_data.get('about_us'):
-            sections.append({
-                'title': 'About Us',
-                'content': company_data['about_us'],
-                'category': 'overview'
-            })
-        
-        if company_data.get('ceo_message'):
-            sections.append({
-                'title': "CEO's Message",
-                'content': company_data['ceo_message'],
-                'category': 'leadership'
-            })
-        
-        if company_data.get('history'):
-            sections.append({
-                'title': 'Company History',
-                'content': company_data['history'],
-                'category': 'background'
-            })
-        
-        # Vision, Mission, Values
-        if company_data.get('mission'):
-            sections.append({
-                'title': 'Mission Statement',
-                'content': company_data['mission'],
-                'category': 'values'
-            })
-        
-        if company_data.get('vision'):
-            sections.append({
-                'title': 'Vision Statement',
-                'content': company_data['vision'],
-                'category': 'values'
-            })
-        
-        if company_data.get('values'):
-            sections.append({
-                'title': 'Core Values',
-                'content': '\n'.join(company_data['values']),
-                'category': 'values'
-            })
-        
-        # Products & Services
-        if company_data.get('products_services'):
-            sections.append({
-                'title': 'Products & Services',
-                'content': '\n'.join(company_data['products_services']),
-                'category': 'offerings'
-            })
-        
-        if company_data.get('product_categories'):
-            sections.append({
-                'title': 'Product Categories',
-                'content': '\n'.join(company_data['product_categories']),
-                'category': 'offerings'
-            })
-        
-        # Markets & Operations
-        if company_data.get('markets'):
-            sections.append({
-                'title': 'Markets & Industries',
-                'content': '\n'.join(company_data['markets']),
-                'category': 'markets'
-            })
-        
-        if company_data.get('locations'):
-            sections.append({
-                'title': 'Locations & Presence',
-                'content': '\n'.join(company_data['locations']),
-                'category': 'operations'
-            })
-        
-        if company_data.get('manufacturing'):
-            sections.append({
-                'title': 'Manufacturing Capabilities',
-                'content': company_data['manufacturing'],
-                'category': 'operations'
-            })
-        
-        # Achievements & Credentials
-        if company_data.get('certifications'):
-            sections.append({
-                'title': 'Certifications & Standards',
-                'content': '\n'.join(company_data['certifications']),
-                'category': 'credentials'
-            })
-        
-        if company_data.get('major_projects'):
-            sections.append({
-                'title': 'Major Projects',
-                'content': '\n'.join(company_data['major_projects']),
-                'category': 'achievements'
-            })
-        
-        # Clients & Partners - combine list and text
-        clients_content = []
-        if company_data.get('clients_text'):
-            clients_content.append(company_data['clients_text'])
-        if company_data.get('clients'):
-            clients_list = '\n'.join([f"• {client}" for client in company_data['clients']])
-            clients_content.append(clients_list)
-        
-        if clients_content:
-            sections.append({
-                'title': 'Clients & Partners',
-                'content': '\n\n'.join(clients_content),
-                'category': 'relationships'
-            })
-        
-        # Competitive Advantages
-        if company_data.get('usps'):
-            sections.append({
-                'title': 'Unique Selling Points',
-                'content': '\n'.join(company_data['usps']),
-                'category': 'advantages'
-            })
-        
-        if company_data.get('leadership'):
-            sections.append({
-                'title': 'Leadership Team',
-                'content': '\n'.join(company_data['leadership']),
-                'category': 'leadership'
-            })
+        from utils.document_parser import DocumentParser
+        
+        company_data, sections = DocumentParser.parse_company_profile(text, self.llm_service)
         
         return {
             'company_data': company_data,
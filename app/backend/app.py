@@ -1,26 +1,562 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
-import hashlib
-import io
 import uuid
+import threading
+import time
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from services.rag_processor import FileProcessor as RAGProcessor
-from services.file_processor import FileProcessor as PPTFileProcessor
-from services.slide_generator import SlideGenerator
+from services.file_processor import FileProcessor as PPTFileProcessor, UploadTooLargeError
+from services.job_queue import JobQueue
+from services.session_store import SessionStore, PipelineCache
+from services.extraction_cache import ExtractionCache
 from agents.pipeline import AgenticPipeline
+from services.llm_service import LLMService
+from utils.document_parser import DocumentParser, ParsedDocument
 from config import Config
-from utils.pdf_extractor import PDFExtractor
 
 app = Flask(__name__)
 CORS(app)
 
+# Reject oversized requests before the form is parsed (two files plus form overhead)
+app.config['MAX_CONTENT_LENGTH'] = 2 * Config.MAX_FILE_SIZE + 1024 * 1024
+
 # Ensure output directory exists
 os.makedirs(Config.OUTPUT_DIR, exist_ok=True)
 
-# Store processor instances per session (in production, use Redis/database)
-rag_processors = {}  # Legacy RAG processors (fallback)
-agentic_pipelines = {}  # New agentic pipelines
-presentations = {}
+# Session state lives in the session store (shared by all workers); live
+# pipelines and legacy processors are kept in bounded per-worker LRU caches
+session_store = SessionStore()
+agentic_pipelines = PipelineCache()
+rag_processors = PipelineCache()  # Legacy RAG processors (fallback, built on demand)
+
+
+def create_session(session_id, kind, uploads):
+    """
+    Persist the documents of a new upload and (re)initialize its session state
+    
+    Args:
+        session_id: Session identifier
+        kind: 'rag' or 'ppt'
+        uploads: Dictionary mapping document name to FileProcessor.read_upload() result (or None)
+    """
+    documents = {}
+    for name, upload in uploads.items():
+        if upload:
+            session_store.save_document(upload['hash'], upload['text'])
+            documents[name] = upload['hash']
+    
+    agentic_pipelines.discard(session_id)
+    rag_processors.discard(session_id)
+    session_store.save(session_id, {
+        'kind': kind,
+        'documents': documents,
+        'collection': f"{'rag_db' if kind == 'rag' else 'ppt_rag_db'}_{session_id}",
+        'ingested': False,
+        'legacy': False,
+        'parsed_document': None,
+        'presentation': None,
+        'slide_cache': None,
+        'ppt_prefetch': None,
+        'created_at': time.time()
+    })
+
+
+def get_pipeline(session_id):
+    """
+    Return the live agentic pipeline for a session, rebuilding it after eviction or restart
+    
+    Args:
+        session_id: Session identifier
+        
+    Returns:
+        AgenticPipeline instance, or None if the session has not been ingested
+    """
+    pipeline = agentic_pipelines.get(session_id)
+    if pipeline:
+        return pipeline
+    
+    state = session_store.get(session_id)
+    if not state or not state.get('ingested'):
+        return None
+    
+    def build():
+        pipeline = AgenticPipeline(db_name=state['collection'])
+        balance_sheet, company_profile = session_store.load_documents(state)
+        pipeline.restore(balance_sheet, company_profile, stored_parsed_document(state))
+        return pipeline
+    
+    try:
+        return agentic_pipelines.get_or_build(session_id, build)
+    except Exception as e:
+        print(f"Warning: Could not restore agentic pipeline: {e}")
+        return None
+
+
+def stored_parsed_document(state):
+    """Return the ParsedDocument cached on a session state, or None"""
+    if state and state.get('parsed_document'):
+        return ParsedDocument.from_dict(state['parsed_document'])
+    return None
+
+
+def get_parsed_document(session_id, state=None):
+    """
+    Return the session's ParsedDocument, parsing the upload once and caching it on the session
+    
+    Args:
+        session_id: Session identifier
+        state: Optional session state already loaded by the caller
+        
+    Returns:
+        ParsedDocument instance
+    """
+    state = state or session_store.get(session_id)
+    document = stored_parsed_document(state)
+    if document:
+        return document
+    
+    pipeline = agentic_pipelines.get(session_id)
+    if pipeline and pipeline.parsed_document:
+        document = pipeline.parsed_document
+    else:
+        balance_sheet, company_profile = session_store.load_documents(state)
+        document = DocumentParser.parse(balance_sheet, company_profile, llm_service=LLMService())
+    
+    session_store.update(session_id, parsed_document=document.to_dict())
+    return document
+
+
+def get_legacy_processor(session_id):
+    """
+    Return the legacy RAG processor for a session, building its index on first use
+    
+    Args:
+        session_id: Session identifier
+        
+    Returns:
+        Legacy processor instance, or None if it is unavailable
+    """
+    processor = rag_processors.get(session_id)
+    if processor:
+        return processor
+    
+    state = session_store.get(session_id)
+    if not state or not state.get('legacy'):
+        return None
+    
+    def build():
+        processor = RAGProcessor()
+        processor.process_files(
+            *session_store.load_documents(state),
+            parsed_document=get_parsed_document(session_id, state)
+        )
+        return processor
+    
+    try:
+        return rag_processors.get_or_build(session_id, build)
+    except Exception as e:
+        print(f"Warning: Could not build legacy RAG index: {e}")
+        return None
+
+# ==================== Ingestion Jobs ====================
+INGEST_STAGES = ['parsing', 'profile_extraction', 'chunking', 'embedding', 'storing']
+
+
+def ingest_session(session_id, progress=None):
+    """Ingest a session's stored documents into a fresh agentic pipeline"""
+    state = session_store.get(session_id)
+    if not state:
+        raise ValueError(f"Session not found: {session_id}")
+    
+    balance_sheet, company_profile = session_store.load_documents(state)
+    pipeline = AgenticPipeline(db_name=state['collection'])
+    result = pipeline.ingest(
+        balance_sheet, company_profile, progress_callback=progress,
+        parsed_document=stored_parsed_document(state)
+    )
+    
+    # Store pipeline instance and the state needed to rebuild it elsewhere
+    agentic_pipelines.put(session_id, pipeline)
+    session_store.update(session_id, ingested=True, parsed_document=pipeline.parsed_document.to_dict())
+    return result
+
+
+def run_rag_ingest(payload, progress=None):
+    """
+    Ingest documents for a RAG chat session
+    
+    Args:
+        payload: Dictionary with the session_id of an uploaded session
+        progress: Optional callable notified with each ingestion stage name
+        
+    Returns:
+        Dictionary with ingestion statistics
+    """
+    session_id = payload['session_id']
+    start_time = time.time()
+    
+    # Ingest documents through agentic pipeline
+    result = ingest_session(session_id, progress)
+    
+    # Legacy processor is only a fallback - defer building its index
+    if Config.LEGACY_RAG_MODE != 'disabled':
+        session_store.update(session_id, legacy=True)
+        if Config.LEGACY_RAG_MODE == 'background':
+            threading.Thread(
+                target=get_legacy_processor, args=(session_id,), daemon=True
+            ).start()
+    
+    return {
+        'chunks_count': result.get('chunks_count', 0),
+        'balance_sheet_entries': result.get('balance_sheet_entries', 0),
+        'company_profile_sections': result.get('company_profile_sections', 0),
+        'processing_time': round(time.time() - start_time, 2)
+    }
+
+
+def run_ppt_ingest(payload, progress=None):
+    """Ingest PPT session documents into an agentic pipeline for enhanced context"""
+    start_time = time.time()
+    result = ingest_session(payload['session_id'], progress)
+    
+    # Prepare deck inputs while the user is still choosing slides
+    schedule_prefetch(payload['session_id'])
+    
+    return {
+        'chunks_count': result.get('chunks_count', 0),
+        'processing_time': round(time.time() - start_time, 2)
+    }
+
+
+def run_document_update(payload, progress=None):
+    """
+    Apply a new version of a session's documents, re-ingesting only what changed
+    
+    Only changed documents are re-parsed (unchanged brochure sections come from
+    the extraction cache) and the session's collection is diffed by chunk hash,
+    so only new chunks are embedded and removed ones deleted.
+    
+    Args:
+        payload: Dictionary with the session_id and the new 'documents' ({name: content hash})
+        progress: Optional callable notified with each ingestion stage name
+        
+    Returns:
+        Dictionary with update statistics
+    """
+    session_id = payload['session_id']
+    start_time = time.time()
+    state = session_store.get(session_id)
+    if not state:
+        raise ValueError(f"Session not found: {session_id}")
+    
+    changed = {
+        name: content_hash for name, content_hash in payload['documents'].items()
+        if content_hash != state['documents'].get(name)
+    }
+    documents = {**state['documents'], **changed}
+    balance_sheet, company_profile = session_store.load_documents({**state, 'documents': documents})
+    
+    previous = stored_parsed_document(state)
+    if previous is None:
+        document = DocumentParser.parse(
+            balance_sheet, company_profile, llm_service=LLMService(), progress_callback=progress
+        )
+    else:
+        document = DocumentParser.reparse(
+            previous,
+            balance_sheet if 'balance_sheet' in changed else None,
+            company_profile if 'company_profile' in changed else None,
+            llm_service=LLMService(), progress_callback=progress
+        )
+    
+    # The generated deck and legacy index describe the old version
+    session_store.update(
+        session_id, documents=documents, parsed_document=document.to_dict(), presentation=None, slide_cache=None,
+        ppt_prefetch=None
+    )
+    rag_processors.discard(session_id)
+    result = ingest_session(session_id, progress)
+    if state.get('kind') == 'ppt':
+        schedule_prefetch(session_id)
+    
+    return {
+        'changed_documents': sorted(changed),
+        'chunks_count': result.get('chunks_count', 0),
+        'embedded_chunks': result.get('embedded_chunks', 0),
+        'deleted_chunks': result.get('deleted_chunks', 0),
+        'processing_time': round(time.time() - start_time, 2)
+    }
+
+
+# Jobs that (re)build a session's index; deck jobs do not block queries
+INGEST_JOB_KINDS = ('rag_ingest', 'ppt_ingest', 'document_update')
+
+
+def ingestion_pending(session_id):
+    """Check whether a session still has an ingestion job queued or running"""
+    job = job_queue.latest_for_session(session_id, kind=INGEST_JOB_KINDS)
+    return bool(job) and job['status'] in JobQueue.ACTIVE_STATUSES
+
+
+# ==================== Deck Generation ====================
+DECK_STAGES = ['context', 'slides', 'brief', 'rendering']
+PREFETCH_STAGES = ['recommendations', 'context', 'company_data']
+
+
+def deck_input_hash(state, rag_pipeline):
+    """Hash of what slide content derives from: the session's documents and whether RAG context is available"""
+    return ExtractionCache.content_hash(json.dumps({
+        'documents': state['documents'],
+        'enhanced_context': bool(rag_pipeline)
+    }, sort_keys=True))
+
+
+def schedule_prefetch(session_id):
+    """Queue the prefetch of deck inputs for the current version of a session's documents"""
+    state = session_store.get(session_id)
+    # The documents are part of the payload so that a prefetch still running for
+    # an older version does not absorb this one
+    job_queue.submit('ppt_prefetch', {'session_id': session_id, 'documents': state['documents']}, PREFETCH_STAGES,
+                     session_id=session_id, dedupe=True)
+
+
+def stored_prefetch(state, input_hash):
+    """Return the session's prefetched deck inputs if they were computed for input_hash, else None"""
+    prefetched = state.get('ppt_prefetch')
+    if prefetched and prefetched.get('input_hash') == input_hash:
+        return prefetched
+    return None
+
+
+def generate_deck(session_id, state, selected_slides, template='professional', theme='blue', regenerate=(),
+                  progress=None, on_slide=None):
+    """
+    Generate a session's deck, reusing cached slide content, and store it on the session
+    
+    Slide content is cached per session by (slide type, input hash, template).
+    Only slides missing from the cache or listed in regenerate are generated;
+    the executive brief is reused when no slide changed, so re-rendering with
+    another theme makes no LLM call.
+    
+    Args:
+        session_id: Session identifier
+        state: Session state
+        selected_slides: Slide types in the order selected
+        template: Presentation template
+        theme: Color theme
+        regenerate: Slide types to generate afresh even if cached
+        progress: Optional callable notified with each DECK_STAGES stage name
+        on_slide: Optional callable receiving each slide as soon as it is ready
+        
+    Returns:
+        Stored presentation result
+    """
+    balance_sheet_text, company_profile_text = session_store.load_documents(state)
+    
+    # Get RAG pipeline if available for enhanced context
+    rag_pipeline = get_pipeline(session_id)
+    
+    # Generate presentation with agentic pipeline
+    from agents.ppt_pipeline import PPTAgenticPipeline
+    ppt_pipeline = PPTAgenticPipeline(rag_pipeline=rag_pipeline)
+    
+    # Entries for other inputs describe an older state of the session
+    input_hash = deck_input_hash(state, rag_pipeline)
+    slide_cache = {
+        key: slide for key, slide in (state.get('slide_cache') or {}).items()
+        if key.endswith(f":{input_hash}")
+    }
+    
+    document = get_parsed_document(session_id, state)
+    generated = ppt_pipeline.generate_presentation(
+        balance_sheet_text=balance_sheet_text,
+        company_profile_text=company_profile_text,
+        selected_slides=selected_slides,
+        template=template,
+        theme=theme,
+        use_enhanced_context=bool(rag_pipeline),
+        parsed_document=document,
+        slide_cache=slide_cache,
+        input_hash=input_hash,
+        regenerate=regenerate,
+        prefetched=stored_prefetch(state, input_hash),
+        progress_callback=progress,
+        slide_callback=on_slide
+    )
+    slide_cache.update(generated['slide_cache'])
+    
+    # Optimize slide order
+    slides = ppt_pipeline.optimize_slide_order(generated['slides'])
+    
+    # Generate executive brief from the template; the optional LLM polish runs
+    # while the file is built (unchanged slides keep the previous polished brief)
+    slide_keys = sorted(PPTAgenticPipeline.slide_cache_key(slide_type, input_hash, template) for slide_type in selected_slides)
+    previous = state.get('presentation') or {}
+    if progress:
+        progress('brief')
+    executive_brief = ppt_pipeline.generate_executive_brief(slides, document)
+    polish = Config.EXECUTIVE_BRIEF_LLM_POLISH
+    reuse_brief = (polish and previous.get('brief_polished') and previous.get('slide_keys') == slide_keys
+                   and not generated['metadata']['generated_slides'])
+    brief_polished = bool(reuse_brief)
+    if reuse_brief:
+        executive_brief = previous['executive_brief']
+    
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='brief-polish') as executor:
+        polished = executor.submit(ppt_pipeline.polish_executive_brief, executive_brief, slides) if polish and not reuse_brief else None
+        
+        # Build PowerPoint file
+        if progress:
+            progress('rendering')
+        from services.pptx_builder import PPTXBuilder
+        pptx_builder = PPTXBuilder(theme=theme)
+        output_filename = f"presentation_{uuid.uuid4().hex[:8]}.pptx"
+        output_path = os.path.join(Config.OUTPUT_DIR, output_filename)
+        
+        file_path = pptx_builder.create_presentation(slides, output_path)
+        
+        if polished:
+            # A failed polish keeps the template brief and is retried on the next generation
+            executive_brief, brief_polished = polished.result()
+    
+    result = {
+        'slides': slides,
+        'file_path': file_path,
+        'filename': output_filename,
+        'slide_count': len(slides),
+        'metadata': generated.get('metadata', {}),
+        'executive_brief': executive_brief,
+        'generation_method': 'agentic',
+        'selected_slides': selected_slides,
+        'template': template,
+        'theme': theme,
+        'slide_keys': slide_keys,
+        'brief_polished': brief_polished
+    }
+    
+    # Store result
+    session_store.update(session_id, presentation=result, slide_cache=slide_cache)
+    return result
+
+
+def run_ppt_generate(payload, progress=None):
+    """
+    Generate a session's deck as a background job
+    
+    Args:
+        payload: Dictionary with the session_id and the 'slides', 'template' and 'theme' to generate
+        progress: Optional callable notified with each DECK_STAGES stage name
+        
+    Returns:
+        Dictionary with the generated file and generation statistics
+    """
+    session_id = payload['session_id']
+    start_time = time.time()
+    state = session_store.get(session_id)
+    if not state:
+        raise ValueError(f"Session not found: {session_id}")
+    
+    result = generate_deck(
+        session_id, state, payload['slides'], payload['template'], payload['theme'], progress=progress
+    )
+    return {
+        'filename': result['filename'],
+        'slide_count': result['slide_count'],
+        'download_url': f"/api/ppt/download/{session_id}",
+        'processing_time': round(time.time() - start_time, 2)
+    }
+
+
+def run_ppt_prefetch(payload, progress=None):
+    """
+    Compute a session's slide recommendations, slide contexts and enriched company data ahead of generation
+    
+    Args:
+        payload: Dictionary with the session_id of an ingested PPT session and the
+            documents ({name: content hash}) to prefetch for
+        progress: Optional callable notified with each PREFETCH_STAGES stage name
+        
+    Returns:
+        Dictionary with the recommendations and prefetch statistics
+        (recommendations is None if the documents changed in the meantime)
+    """
+    session_id = payload['session_id']
+    start_time = time.time()
+    state = session_store.get(session_id)
+    if not state:
+        raise ValueError(f"Session not found: {session_id}")
+    
+    def superseded(state):
+        return payload.get('documents', state['documents']) != state['documents']
+    
+    if superseded(state):
+        return {'recommendations': None, 'context_slides': [], 'processing_time': round(time.time() - start_time, 2)}
+    
+    balance_sheet_text, company_profile_text = session_store.load_documents(state)
+    rag_pipeline = get_pipeline(session_id)
+    
+    from agents.ppt_pipeline import PPTAgenticPipeline
+    prefetched = PPTAgenticPipeline(rag_pipeline=rag_pipeline).prefetch(
+        balance_sheet_text, company_profile_text,
+        parsed_document=get_parsed_document(session_id, state),
+        progress_callback=progress
+    )
+    # A document update during the prefetch cleared ppt_prefetch and scheduled its own
+    current = session_store.get(session_id)
+    if not current or superseded(current):
+        return {'recommendations': None, 'context_slides': [], 'processing_time': round(time.time() - start_time, 2)}
+    session_store.update(session_id, ppt_prefetch={'input_hash': deck_input_hash(state, rag_pipeline), **prefetched})
+    
+    return {
+        'recommendations': prefetched['recommendations'],
+        'context_slides': list(prefetched.get('context_map', {})),
+        'processing_time': round(time.time() - start_time, 2)
+    }
+
+
+job_queue = JobQueue()
+job_queue.register('rag_ingest', run_rag_ingest)
+job_queue.register('ppt_ingest', run_ppt_ingest)
+job_queue.register('document_update', run_document_update)
+job_queue.register('ppt_generate', run_ppt_generate, max_workers=Config.DECK_JOB_WORKERS)
+job_queue.register('ppt_prefetch', run_ppt_prefetch, max_workers=Config.DECK_JOB_WORKERS)
+
+# Pick up jobs interrupted by a restart (skip the reloader's watcher process
+# and worker processes that re-import this module as __mp_main__)
+if __name__ == 'app' or (__name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+    job_queue.resume_pending()
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Get status and per-stage progress of a background job"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    job['ready_for_chat'] = (
+        job['kind'] in ('rag_ingest', 'document_update') and job['status'] == JobQueue.COMPLETED
+    )
+    job['ready_for_download'] = job['kind'] == 'ppt_generate' and job['status'] == JobQueue.COMPLETED
+    return jsonify({
+        'success': True,
+        **job
+    })
+
+@app.errorhandler(413)
+def request_too_large(e):
+    """Return a JSON error when the request body exceeds MAX_CONTENT_LENGTH"""
+    return jsonify({
+        'success': False,
+        'error': f'Upload too large. Maximum file size is {Config.MAX_FILE_SIZE // (1024 * 1024)}MB'
+    }), 413
 
 # ==================== Health Check ====================
 @app.route('/api/health', methods=['GET'])
@@ -44,55 +580,48 @@ def rag_upload():
         if ext not in Config.ALLOWED_EXTENSIONS:
             return jsonify({'error': f'Invalid file type. Allowed: {Config.ALLOWED_EXTENSIONS}'}), 400
         
-        # Read file content (handle PDF or text files)
-        if PDFExtractor.is_pdf_file(balance_sheet.filename):
-            balance_sheet.seek(0)  # Reset file pointer
-            balance_sheet_content = PDFExtractor.extract_text(balance_sheet)
-        else:
-            balance_sheet_content = balance_sheet.read().decode('utf-8')
-        
-        company_profile_content = None
-        if company_profile:
-            if PDFExtractor.is_pdf_file(company_profile.filename):
-                company_profile.seek(0)  # Reset file pointer
-                company_profile_content = PDFExtractor.extract_text(company_profile)
-            else:
-                company_profile_content = company_profile.read().decode('utf-8')
-        
-        # Generate session ID
-        session_id = str(hash(balance_sheet_content + (company_profile_content or '')))
-        
-        # Track processing time
-        import time
-        start_time = time.time()
+        # Stream file content (handle PDF or text files) with size limit and hashing
+        balance_sheet_upload = PPTFileProcessor.read_upload(balance_sheet)
+        company_profile_upload = PPTFileProcessor.read_upload(company_profile) if company_profile else None
         
-        # Create agentic pipeline instance
-        pipeline = AgenticPipeline(db_name=f"rag_db_{session_id}")
-        
-        # Ingest documents through agentic pipeline
-        result = pipeline.ingest(balance_sheet_content, company_profile_content)
+        # Generate session ID from the content hashes computed while streaming
+        session_id = PPTFileProcessor.session_id_for(
+            'rag', balance_sheet_upload['hash'],
+            company_profile_upload['hash'] if company_profile_upload else None
+        )
+        create_session(session_id, 'rag', {
+            'balance_sheet': balance_sheet_upload,
+            'company_profile': company_profile_upload
+        })
         
-        # Store pipeline instance
-        agentic_pipelines[session_id] = pipeline
+        payload = {'session_id': session_id}
         
-        # Also keep legacy processor for backward compatibility
-        processor = RAGProcessor()
-        rag_processors[session_id] = processor
-        processor.process_files(balance_sheet_content, company_profile_content)
+        # Ingest in the background and let the client poll /api/jobs/<job_id>
+        if Config.ASYNC_INGESTION:
+            job_id = job_queue.submit('rag_ingest', payload, INGEST_STAGES, session_id=session_id)
+            return jsonify({
+                'success': True,
+                'session_id': session_id,
+                'job_id': job_id,
+                'status': JobQueue.QUEUED,
+                'message': 'Documents queued for ingestion',
+                'ready_for_chat': False
+            }), 202
         
-        processing_time = round(time.time() - start_time, 2)
+        result = run_rag_ingest(payload)
         
         return jsonify({
             'success': True,
             'session_id': session_id,
-            'chunks_count': result.get('chunks_count', 0),
-            'balance_sheet_entries': result.get('balance_sheet_entries', 0),
-            'company_profile_sections': result.get('company_profile_sections', 0),
-            'processing_time': processing_time,
+            **result,
             'message': 'Documents ingested successfully using agentic pipeline',
             'ready_for_chat': True
         })
     
+    except RequestEntityTooLarge as e:
+        return request_too_large(e)
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -112,8 +641,8 @@ def rag_chat():
     
     try:
         # Try agentic pipeline first
-        if session_id in agentic_pipelines:
-            pipeline = agentic_pipelines[session_id]
+        pipeline = get_pipeline(session_id)
+        if pipeline:
             result = pipeline.query(question, chat_history)
             
             return jsonify({
@@ -128,17 +657,28 @@ def rag_chat():
                 'web_search_used': result.get('web_search_used', False),
                 'doc_analysis_used': result.get('doc_analysis_used', False)
             })
-        # Fallback to legacy processor
-        elif session_id in rag_processors:
-        processor = rag_processors[session_id]
-        result = processor.query(question, chat_history)
-        
-        return jsonify({
-            'success': True,
-            'answer': result['answer'],
+        # Ingestion still running in the background
+        elif ingestion_pending(session_id):
+            job = job_queue.latest_for_session(session_id, kind=INGEST_JOB_KINDS)
+            return jsonify({
+                'error': 'Documents are still being processed. Please try again shortly.',
+                'job_id': job['job_id'],
+                'status': job['status'],
+                'ready_for_chat': False
+            }), 409
+        # Fallback to legacy processor (index built on first use)
+        elif session_id in rag_processors or (session_store.get(session_id) or {}).get('legacy'):
+            processor = get_legacy_processor(session_id)
+            if not processor:
+                return jsonify({'error': 'Legacy index could not be built for this session'}), 500
+            result = processor.query(question, chat_history)
+            
+            return jsonify({
+                'success': True,
+                'answer': result['answer'],
                 'context': result['context'],
                 'method': 'legacy'
-        })
+            })
         else:
             return jsonify({'error': 'Invalid session. Please upload files first.'}), 400
     
@@ -147,6 +687,62 @@ def rag_chat():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/documents/update/<session_id>', methods=['POST'])
+def documents_update(session_id):
+    """Upload a new version of a session's documents and re-ingest only what changed"""
+    try:
+        if not session_store.exists(session_id):
+            return jsonify({
+                'success': False,
+                'error': 'Session not found'
+            }), 404
+        
+        uploads = {}
+        for name in ('balance_sheet', 'company_profile'):
+            file = request.files.get(name)
+            if not file:
+                continue
+            ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
+            if ext not in Config.ALLOWED_EXTENSIONS:
+                return jsonify({'error': f'Invalid file type. Allowed: {Config.ALLOWED_EXTENSIONS}'}), 400
+            uploads[name] = PPTFileProcessor.read_upload(file)
+        
+        if not uploads:
+            return jsonify({'error': 'An updated balance sheet or company profile is required'}), 400
+        
+        for upload in uploads.values():
+            session_store.save_document(upload['hash'], upload['text'])
+        payload = {
+            'session_id': session_id,
+            'documents': {name: upload['hash'] for name, upload in uploads.items()}
+        }
+        
+        if Config.ASYNC_INGESTION:
+            job_id = job_queue.submit('document_update', payload, INGEST_STAGES, session_id=session_id)
+            return jsonify({
+                'success': True,
+                'session_id': session_id,
+                'job_id': job_id,
+                'status': JobQueue.QUEUED,
+                'message': 'Updated documents queued for ingestion'
+            }), 202
+        
+        result = run_document_update(payload)
+        
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            **result,
+            'message': 'Documents updated successfully'
+        })
+    
+    except RequestEntityTooLarge as e:
+        return request_too_large(e)
+    except UploadTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ==================== PPT Endpoints ====================
 @app.route('/api/ppt/upload', methods=['POST'])
 def ppt_upload():
@@ -164,49 +760,52 @@ def ppt_upload():
                 'errors': validation['errors']
             }), 400
         
-        # Process files (handle PDF or text files)
-        balance_sheet_text = None
-        company_profile_text = None
+        # Stream files (handle PDF or text files) with size limit and hashing
+        balance_sheet_upload = PPTFileProcessor.read_upload(balance_sheet)
+        company_profile_upload = PPTFileProcessor.read_upload(company_profile)
         
-        # Extract balance sheet content
-        if PDFExtractor.is_pdf_file(balance_sheet.filename):
-            balance_sheet.seek(0)  # Reset file pointer
-            balance_sheet_text = PDFExtractor.extract_text(balance_sheet)
-        else:
-            balance_sheet_text = balance_sheet.read().decode('utf-8')
+        # Generate session ID from the content hashes computed while streaming
+        session_id = PPTFileProcessor.session_id_for(
+            'ppt', balance_sheet_upload['hash'], company_profile_upload['hash']
+        )
         
-        # Extract company profile content
-        if PDFExtractor.is_pdf_file(company_profile.filename):
-            company_profile.seek(0)  # Reset file pointer
-            company_profile_text = PDFExtractor.extract_text(company_profile)
-        else:
-            company_profile_text = company_profile.read().decode('utf-8')
+        # Store documents and session state
+        create_session(session_id, 'ppt', {
+            'balance_sheet': balance_sheet_upload,
+            'company_profile': company_profile_upload
+        })
         
-        # Generate session ID
-        session_id = hashlib.md5(
-            (balance_sheet_text + company_profile_text).encode()
-        ).hexdigest()
+        payload = {'session_id': session_id}
         
         # Also ingest into agentic pipeline for enhanced context
+        if Config.ASYNC_INGESTION:
+            job_id = job_queue.submit('ppt_ingest', payload, INGEST_STAGES, session_id=session_id)
+            return jsonify({
+                'success': True,
+                'session_id': session_id,
+                'job_id': job_id,
+                'status': JobQueue.QUEUED,
+                'message': 'Files uploaded successfully, ingestion queued'
+            }), 202
+        
         try:
-            pipeline = AgenticPipeline(db_name=f"ppt_rag_db_{session_id}")
-            pipeline.ingest(balance_sheet_text, company_profile_text)
-            agentic_pipelines[session_id] = pipeline
+            run_ppt_ingest(payload)
         except Exception as e:
             print(f"Warning: Could not create agentic pipeline: {e}")
         
-        # Store data temporarily
-        presentations[session_id] = {
-            'balance_sheet': balance_sheet_text,
-            'company_profile': company_profile_text
-        }
-        
         return jsonify({
             'success': True,
             'session_id': session_id,
             'message': 'Files uploaded successfully'
         })
     
+    except RequestEntityTooLarge as e:
+        return request_too_large(e)
+    except UploadTooLargeError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 413
     except Exception as e:
         return jsonify({
             'success': False,
@@ -223,7 +822,8 @@ def ppt_generate():
         template = data.get('template', 'professional')
         theme = data.get('theme', 'blue')
         
-        if not session_id or session_id not in presentations:
+        session_state = session_store.get(session_id)
+        if not session_state:
             return jsonify({
                 'success': False,
                 'error': 'Invalid session'
@@ -235,56 +835,144 @@ def ppt_generate():
                 'error': 'No slides selected'
             }), 400
         
-        # Get stored data
-        session_data = presentations[session_id]
-        
-        # Get RAG pipeline if available for enhanced context
-        rag_pipeline = agentic_pipelines.get(session_id)
-        
-        # Generate presentation with agentic pipeline
-        from agents.ppt_pipeline import PPTAgenticPipeline
-        ppt_pipeline = PPTAgenticPipeline(rag_pipeline=rag_pipeline)
-        
-        result = ppt_pipeline.generate_presentation(
-            balance_sheet_text=session_data['balance_sheet'],
-            company_profile_text=session_data['company_profile'],
-            selected_slides=selected_slides,
-            template=template,
-            theme=theme,
-            use_enhanced_context=bool(rag_pipeline)
-        )
-        
-        # Optimize slide order
-        slides = result['slides']
-        slides = ppt_pipeline.optimize_slide_order(slides)
+        # Large decks can be built in the background: poll the job, then download
+        if data.get('async', Config.ASYNC_DECK_GENERATION):
+            payload = {'session_id': session_id, 'slides': selected_slides, 'template': template, 'theme': theme}
+            job_id = job_queue.submit('ppt_generate', payload, DECK_STAGES, session_id=session_id, dedupe=True)
+            return jsonify({
+                'success': True,
+                'session_id': session_id,
+                'job_id': job_id,
+                'status': job_queue.get(job_id)['status'],
+                'message': 'Presentation generation queued'
+            }), 202
         
-        # Generate executive brief
-        executive_brief = ppt_pipeline.generate_executive_brief(slides)
+        result = generate_deck(session_id, session_state, selected_slides, template, theme)
         
-        # Build PowerPoint file
-        from services.pptx_builder import PPTXBuilder
-        pptx_builder = PPTXBuilder(theme=theme)
-        output_filename = f"presentation_{uuid.uuid4().hex[:8]}.pptx"
-        output_path = os.path.join(Config.OUTPUT_DIR, output_filename)
+        return jsonify({
+            'success': True,
+            'slides': result['slides'],
+            'filename': result['filename'],
+            'slide_count': result['slide_count']
+        })
+    
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ppt/generate/stream', methods=['POST'])
+def ppt_generate_stream():
+    """
+    Generate PowerPoint presentation, streaming progress as server-sent events
+    
+    Takes the same JSON body as /api/ppt/generate. Emits 'stage' events
+    ({"stage": ...} for each DECK_STAGES stage), a 'slide' event with each
+    slide's content as soon as it is ready, then 'complete' with the download
+    handle or 'error'.
+    """
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session_id')
+    selected_slides = data.get('slides', [])
+    template = data.get('template', 'professional')
+    theme = data.get('theme', 'blue')
+    
+    session_state = session_store.get(session_id) if session_id else None
+    if not session_state:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid session'
+        }), 400
+    
+    if not selected_slides:
+        return jsonify({
+            'success': False,
+            'error': 'No slides selected'
+        }), 400
+    
+    events = queue.Queue()
+    done = object()
+    
+    def emit(event, payload):
+        # Serialize right away: slides may be modified once handed on
+        events.put(f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n")
+    
+    def run():
+        try:
+            result = generate_deck(
+                session_id, session_state, selected_slides, template, theme,
+                progress=lambda stage: emit('stage', {'stage': stage}),
+                on_slide=lambda slide: emit('slide', slide)
+            )
+            emit('complete', {
+                'success': True,
+                'filename': result['filename'],
+                'slide_count': result['slide_count'],
+                'executive_brief': result['executive_brief'],
+                'download_url': f"/api/ppt/download/{session_id}"
+            })
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            emit('error', {'success': False, 'error': str(e)})
+        finally:
+            events.put(done)
+    
+    # The deck is generated (and stored) even if the client disconnects
+    threading.Thread(target=run, daemon=True).start()
+    
+    def stream():
+        while True:
+            event = events.get()
+            if event is done:
+                return
+            yield event
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop reverse proxies from buffering the stream
+    })
+
+@app.route('/api/ppt/slide/<session_id>/<slide_type>', methods=['POST'])
+def ppt_regenerate_slide(session_id, slide_type):
+    """Regenerate one slide of the current deck and rebuild the deck from cached content"""
+    try:
+        session_state = session_store.get(session_id)
+        if not session_state:
+            return jsonify({
+                'success': False,
+                'error': 'Session not found'
+            }), 404
         
-        file_path = pptx_builder.create_presentation(slides, output_path)
+        presentation = session_state.get('presentation')
+        if not presentation:
+            return jsonify({
+                'success': False,
+                'error': 'Presentation not generated yet'
+            }), 400
         
-        result = {
-            'slides': slides,
-            'file_path': file_path,
-            'filename': output_filename,
-            'slide_count': len(slides),
-            'metadata': result.get('metadata', {}),
-            'executive_brief': executive_brief,
-            'generation_method': 'agentic'
-        }
+        selected_slides = presentation.get('selected_slides') or [slide['type'] for slide in presentation['slides']]
+        if slide_type not in selected_slides:
+            return jsonify({
+                'success': False,
+                'error': f'Slide not in presentation: {slide_type}'
+            }), 400
         
-        # Store result
-        presentations[session_id]['result'] = result
+        # Template and theme default to the current deck's
+        data = request.get_json(silent=True) or {}
+        result = generate_deck(
+            session_id, session_state, selected_slides,
+            template=data.get('template', presentation.get('template', 'professional')),
+            theme=data.get('theme', presentation.get('theme', 'blue')),
+            regenerate=[slide_type]
+        )
         
         return jsonify({
             'success': True,
-            'slides': result['slides'],
+            'slide': next(slide for slide in result['slides'] if slide['type'] == slide_type),
             'filename': result['filename'],
             'slide_count': result['slide_count']
         })
@@ -301,13 +989,25 @@ def ppt_generate():
 def ppt_download(session_id):
     """Download generated presentation"""
     try:
-        if session_id not in presentations:
+        session_state = session_store.get(session_id)
+        if not session_state:
             return jsonify({
                 'success': False,
                 'error': 'Presentation not found'
             }), 404
         
-        result = presentations[session_id].get('result')
+        # A deck still being built in the background is not ready yet
+        job = job_queue.latest_for_session(session_id, kind='ppt_generate')
+        if job and job['status'] in JobQueue.ACTIVE_STATUSES:
+            return jsonify({
+                'success': False,
+                'job_id': job['job_id'],
+                'status': job['status'],
+                'progress': job['progress'],
+                'error': 'Presentation is still being generated'
+            }), 202
+        
+        result = session_state.get('presentation')
         if not result:
             return jsonify({
                 'success': False,
@@ -339,22 +1039,32 @@ def ppt_download(session_id):
 def ppt_recommendations(session_id):
     """Get AI-powered slide recommendations"""
     try:
-        if session_id not in presentations:
+        session_state = session_store.get(session_id)
+        if not session_state:
             return jsonify({
                 'success': False,
                 'error': 'Session not found'
             }), 404
         
-        session_data = presentations[session_id]
+        # Recommendations only depend on the documents: use the prefetch if it covers the current version
+        rag_pipeline = get_pipeline(session_id)
+        prefetched = stored_prefetch(session_state, deck_input_hash(session_state, rag_pipeline))
+        if prefetched:
+            return jsonify({
+                'success': True,
+                'recommendations': prefetched['recommendations']
+            })
+        
+        balance_sheet_text, company_profile_text = session_store.load_documents(session_state)
         
         # Use agentic pipeline for recommendations
         from agents.ppt_pipeline import PPTAgenticPipeline
-        rag_pipeline = agentic_pipelines.get(session_id)
         ppt_pipeline = PPTAgenticPipeline(rag_pipeline=rag_pipeline)
         
         recommendations = ppt_pipeline.get_slide_recommendations(
-            session_data['balance_sheet'],
-            session_data['company_profile']
+            balance_sheet_text,
+            company_profile_text,
+            parsed_document=get_parsed_document(session_id, session_state)
         )
         
         return jsonify({
@@ -374,13 +1084,14 @@ def ppt_recommendations(session_id):
 def ppt_preview(session_id):
     """Get slide preview data"""
     try:
-        if session_id not in presentations:
+        session_state = session_store.get(session_id)
+        if not session_state:
             return jsonify({
                 'success': False,
                 'error': 'Session not found'
             }), 404
         
-        result = presentations[session_id].get('result')
+        result = session_state.get('presentation')
         if not result:
             return jsonify({
                 'success': False,
@@ -6,6 +6,8 @@ load_dotenv()
 class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # Bytes read per streaming step
+    UPLOAD_SPOOL_SIZE = 1024 * 1024  # Uploads larger than this spool to disk
     ALLOWED_EXTENSIONS = {'txt', 'csv', 'text', 'xlsx', 'pdf'}
     
     # LLM Configuration
@@ -19,14 +21,68 @@ class Config:
     # RAG Configuration
     TOP_K_RESULTS = 3
     SIMILARITY_THRESHOLD = 0.7
+    APPLY_SIMILARITY_THRESHOLD = os.getenv('APPLY_SIMILARITY_THRESHOLD', 'false').lower() == 'true'
+    CHUNK_TOKENS = int(os.getenv('CHUNK_TOKENS', '256'))  # Target chunk size for the vector index
+    CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', '32'))
+    
+    # Factual figure questions are answered from the parsed balance sheet table
+    ENABLE_STRUCTURED_LOOKUP = os.getenv('ENABLE_STRUCTURED_LOOKUP', 'true').lower() == 'true'
+    STRUCTURED_LOOKUP_MIN_SIMILARITY = 0.85  # Word similarity accepted as a misspelling
+    
+    # Legacy RAG fallback index: 'lazy' (built on first fallback query),
+    # 'background' (built after the upload response) or 'disabled'
+    LEGACY_RAG_MODE = os.getenv('LEGACY_RAG_MODE', 'lazy').lower()
+    
+    # Background jobs: uploads return a job ID and ingest on a local worker pool
+    ASYNC_INGESTION = os.getenv('ASYNC_INGESTION', 'true').lower() == 'true'
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+    ASYNC_DECK_GENERATION = os.getenv('ASYNC_DECK_GENERATION', 'false').lower() == 'true'  # Per-request 'async' overrides
+    DECK_JOB_WORKERS = int(os.getenv('DECK_JOB_WORKERS', '2'))  # Concurrent background deck builds
+    # Worker processes refresh the heartbeat of their active jobs; jobs whose heartbeat is
+    # older than JOB_STALE_SECONDS belong to a dead process and are taken over
+    JOB_HEARTBEAT_SECONDS = float(os.getenv('JOB_HEARTBEAT_SECONDS', '10'))
+    JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', '60'))
+    
+    # PDF extraction: page ranges of large PDFs are extracted in worker processes
+    PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', str(min(4, os.cpu_count() or 1))))
+    PDF_PARALLEL_MIN_PAGES = 20
+    PDF_PAGES_PER_TASK = 8
+    PDF_BOILERPLATE_MIN_SHARE = 0.5  # Lines repeated on this share of pages are headers/footers
+    PDF_BOILERPLATE_SAMPLE_PAGES = 40  # Leading pages headers/footers are detected on; later pages stream
     
     # Presentation Configuration
     SLIDE_WIDTH = 10  # inches
     SLIDE_HEIGHT = 7.5  # inches
+    SLIDE_WORKERS = int(os.getenv('SLIDE_WORKERS', '6'))  # Slides generated concurrently per deck
+    # The executive brief is a template over the parsed figures; optionally reworded by the LLM
+    EXECUTIVE_BRIEF_LLM_POLISH = os.getenv('EXECUTIVE_BRIEF_LLM_POLISH', 'false').lower() == 'true'
     
     # Template Paths
     TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
     OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
+    DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(__file__), 'data'))
+    JOB_DB_PATH = os.path.join(DATA_DIR, 'jobs.sqlite3')
+    
+    # Session Store Configuration
+    SESSION_STORE_URL = os.getenv('SESSION_STORE_URL', '')  # redis://... to share sessions via Redis
+    SESSION_DB_PATH = os.path.join(DATA_DIR, 'sessions.sqlite3')
+    SESSION_TTL = int(os.getenv('SESSION_TTL', str(7 * 24 * 3600)))  # seconds
+    # Live pipelines kept per worker; an evicted pipeline is rebuilt from the stored documents,
+    # which re-chunks them in memory but takes embeddings from the embedding cache
+    PIPELINE_CACHE_SIZE = int(os.getenv('PIPELINE_CACHE_SIZE', '8'))
+    
+    # LLM extraction results are cached on disk by document content hash
+    ENABLE_EXTRACTION_CACHE = os.getenv('ENABLE_EXTRACTION_CACHE', 'true').lower() == 'true'
+    EXTRACTION_CACHE_PATH = os.path.join(DATA_DIR, 'extraction_cache.sqlite3')
+    EXTRACTION_CACHE_TTL = int(os.getenv('EXTRACTION_CACHE_TTL', str(30 * 24 * 3600)))  # seconds
+    # Chunk embeddings are kept in the same database (and expire with it), keyed by embedding model and text hash
+    ENABLE_EMBEDDING_CACHE = os.getenv('ENABLE_EMBEDDING_CACHE', 'true').lower() == 'true'
+    
+    # Long brochures are extracted section by section with concurrent LLM calls
+    EXTRACTION_CHUNK_CHARS = int(os.getenv('EXTRACTION_CHUNK_CHARS', '6000'))
+    EXTRACTION_MAX_CHUNKS = int(os.getenv('EXTRACTION_MAX_CHUNKS', '24'))  # Chunks grow beyond this
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '8'))
+    EXTRACTION_CHUNK_MAX_TOKENS = 1000  # Output budget per chunk
     
     # Slide Types
     AVAILABLE_SLIDES = [
@@ -0,0 +1,101 @@
+"""Disk-persisted cache of LLM extraction results keyed by content hash"""
+from typing import Dict, Any, Optional, Callable
+from config import Config
+from services.session_store import SQLiteKeyValueStore
+import hashlib
+import json
+import threading
+import weakref
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> SQLiteKeyValueStore:
+    """Return the process-wide cache database (created on first use)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SQLiteKeyValueStore(Config.EXTRACTION_CACHE_PATH)
+        return _backend
+
+
+class ExtractionCache:
+    """
+    Cache for results of LLM extraction over a document
+    
+    Entries are keyed by namespace, model and a SHA-256 of the document text, so
+    a document is only sent to the LLM once per kind of extraction. Concurrent
+    requests for the same document wait for the first extraction instead of
+    calling the LLM again.
+    """
+    
+    # Locks of keys being computed; an entry disappears once no caller holds its lock
+    _key_locks = weakref.WeakValueDictionary()
+    _key_locks_lock = threading.Lock()
+    
+    def __init__(self, namespace: str, backend=None):
+        """
+        Initialize extraction cache
+        
+        Args:
+            namespace: Kind of extraction (e.g. 'company_profile')
+            backend: Object with Redis-style get/set (defaults to the shared SQLite cache)
+        """
+        self.namespace = namespace
+        self.enabled = Config.ENABLE_EXTRACTION_CACHE
+        self.backend = backend or (get_backend() if self.enabled else None)
+    
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Return the SHA-256 hex digest of a document's text"""
+        return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+    
+    def _key(self, text: str) -> str:
+        return f"{self.namespace}:{Config.MODEL}:{self.content_hash(text)}"
+    
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a document, or None"""
+        if not self.enabled:
+            return None
+        value = self.backend.get(self._key(text))
+        if value is None:
+            return None
+        return json.loads(value.decode('utf-8') if isinstance(value, bytes) else value)
+    
+    def set(self, text: str, result: Dict[str, Any]):
+        """Store the result for a document"""
+        if self.enabled:
+            self.backend.set(self._key(text), json.dumps(result, default=str), ex=Config.EXTRACTION_CACHE_TTL)
+    
+    def get_or_compute(self, text: str, compute: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result for a document, computing and storing it on a miss
+        
+        Args:
+            text: Document text
+            compute: Callable performing the extraction; a None result is not cached
+        
+        Returns:
+            Extraction result (a fresh copy that callers may modify)
+        """
+        if not self.enabled:
+            return compute()
+        
+        key = self._key(text)
+        with self._key_locks_lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = threading.Lock()
+        
+        with key_lock:
+            cached = self.get(text)
+            if cached is not None:
+                return cached
+            
+            result = compute()
+            if result is not None:
+                self.set(text, result)
+                # Hand out a copy so later mutations never leak into the cache
+                result = json.loads(json.dumps(result, default=str))
+            return result
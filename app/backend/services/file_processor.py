@@ -1,9 +1,90 @@
 from typing import Dict, Tuple
 from utils.pdf_extractor import PDFExtractor
+from config import Config
+import codecs
+import hashlib
+import tempfile
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an uploaded file exceeds Config.MAX_FILE_SIZE"""
+
 
 class FileProcessor:
     """Process uploaded files"""
     
+    @staticmethod
+    def read_upload(file, max_size: int = None) -> Dict:
+        """
+        Stream an uploaded file through a spooled temp file and extract its text
+        
+        The size limit is enforced and the content hash computed while streaming,
+        and text files are decoded chunk by chunk, so the raw upload is never held
+        in memory as a whole. The extracted text is returned whole: it is stored
+        under its hash and parsed as one document by the ingest job.
+        
+        Args:
+            file: Flask file object
+            max_size: Maximum size in bytes (defaults to Config.MAX_FILE_SIZE)
+            
+        Returns:
+            Dictionary with extracted 'text', content 'hash' (hex MD5) and 'size' in bytes
+        """
+        max_size = max_size or Config.MAX_FILE_SIZE
+        hasher = hashlib.md5()
+        size = 0
+        
+        with tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_SIZE) as spool:
+            stream = getattr(file, 'stream', file)
+            while True:
+                chunk = stream.read(Config.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(
+                        f"{file.filename} exceeds the maximum file size of {max_size // (1024 * 1024)}MB"
+                    )
+                hasher.update(chunk)
+                spool.write(chunk)
+            
+            spool.seek(0)
+            if PDFExtractor.is_pdf_file(file.filename):
+                text = PDFExtractor.extract_text(spool)
+            else:
+                text = FileProcessor._decode_stream(spool)
+        
+        return {
+            'text': text,
+            'hash': hasher.hexdigest(),
+            'size': size
+        }
+    
+    @staticmethod
+    def _decode_stream(stream) -> str:
+        """Decode a UTF-8 byte stream chunk by chunk"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        try:
+            while True:
+                chunk = stream.read(Config.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b'', final=True))
+        except UnicodeDecodeError:
+            raise ValueError("Text files must be UTF-8 encoded")
+        return ''.join(parts)
+    
+    @staticmethod
+    def session_id_for(namespace: str, *content_hashes: str) -> str:
+        """Derive a stable session ID from a namespace ('rag', 'ppt') and the content hashes of the uploaded files"""
+        hasher = hashlib.md5()
+        for content_hash in (namespace, *content_hashes):
+            hasher.update((content_hash or '').encode())
+            hasher.update(b'|')
+        return hasher.hexdigest()
+    
     @staticmethod
     def process_files(balance_sheet_file, company_profile_file) -> Tuple[str, str]:
         """
@@ -17,24 +98,13 @@ class FileProcessor:
             Tuple of (balance_sheet_text, company_profile_text)
         """
         try:
-            # Extract balance sheet content
-            if PDFExtractor.is_pdf_file(balance_sheet_file.filename):
-                balance_sheet_file.seek(0)  # Reset file pointer
-                balance_sheet_text = PDFExtractor.extract_text(balance_sheet_file)
-            else:
-                balance_sheet_text = balance_sheet_file.read().decode('utf-8')
-            
-            # Extract company profile content
-            if PDFExtractor.is_pdf_file(company_profile_file.filename):
-                company_profile_file.seek(0)  # Reset file pointer
-                company_profile_text = PDFExtractor.extract_text(company_profile_file)
-            else:
-                company_profile_text = company_profile_file.read().decode('utf-8')
+            balance_sheet_text = FileProcessor.read_upload(balance_sheet_file)['text']
+            company_profile_text = FileProcessor.read_upload(company_profile_file)['text']
             
             return balance_sheet_text, company_profile_text
         
-        except UnicodeDecodeError:
-            raise ValueError("Text files must be UTF-8 encoded")
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Error reading files: {str(e)}")
     
@@ -0,0 +1,310 @@
+"""Background job queue with an SQLite-backed job table"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable, Optional
+from config import Config
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+
+class JobQueue:
+    """Run long-running work (document ingestion, deck builds) on a local thread pool"""
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+    
+    def __init__(self, db_path: str = None, max_workers: int = None,
+                 heartbeat_seconds: float = None, stale_seconds: float = None):
+        """
+        Initialize job queue
+        
+        Args:
+            db_path: Path of the SQLite job table (defaults to Config.JOB_DB_PATH)
+            max_workers: Number of worker threads (defaults to Config.JOB_WORKERS)
+            heartbeat_seconds: Interval between heartbeats of this queue's active jobs
+                (defaults to Config.JOB_HEARTBEAT_SECONDS)
+            stale_seconds: Heartbeat age after which another process may take a job
+                over (defaults to Config.JOB_STALE_SECONDS)
+        """
+        self.db_path = db_path or Config.JOB_DB_PATH
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.heartbeat_seconds = heartbeat_seconds or Config.JOB_HEARTBEAT_SECONDS
+        self.stale_seconds = stale_seconds or Config.JOB_STALE_SECONDS
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.JOB_WORKERS,
+            thread_name_prefix='job-worker'
+        )
+        self.handlers = {}
+        self.executors = {}  # Dedicated pools of kinds with their own concurrency cap
+        self._lock = threading.Lock()
+        self._reclaim = False  # Set once resume_pending has run; the heartbeat then keeps reclaiming
+        self._stopped = threading.Event()
+        self._init_db()
+        threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True).start()
+    
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection that commits on success and always closes"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _init_db(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    session_id TEXT,
+                    status TEXT NOT NULL,
+                    stages TEXT NOT NULL,
+                    current_stage TEXT,
+                    payload TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT,
+                    heartbeat_at REAL
+                )
+            """)
+            # Job tables created before ownership was tracked
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_session ON jobs (session_id, created_at)")
+    
+    def register(self, kind: str, handler: Callable[[Dict[str, Any], Callable[[str], None]], Dict[str, Any]],
+                 max_workers: int = None):
+        """
+        Register the handler that runs jobs of a given kind
+        
+        Args:
+            kind: Job kind (e.g. 'rag_ingest')
+            handler: Callable taking (payload, progress) and returning a JSON-serializable
+                result; progress(stage) marks the named stage as started
+            max_workers: Optional cap on concurrent jobs of this kind; such jobs run
+                on their own pool and never occupy the shared workers
+        """
+        self.handlers[kind] = handler
+        if max_workers:
+            self.executors[kind] = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f'job-{kind}'
+            )
+    
+    def submit(self, kind: str, payload: Dict[str, Any], stages: List[str],
+               session_id: str = None, dedupe: bool = False) -> str:
+        """
+        Persist a job and schedule it on the worker pool
+        
+        Args:
+            kind: Registered job kind
+            payload: JSON-serializable job input
+            stages: Ordered stage names reported by the handler
+            session_id: Optional session the job belongs to
+            dedupe: Return the queued or running job of this kind with an identical
+                payload, if any, instead of submitting another
+        
+        Returns:
+            Job ID
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        payload_json = json.dumps(payload, sort_keys=True)
+        with self._lock, self._connect() as conn:
+            if dedupe:
+                existing = conn.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND payload = ? AND status IN (?, ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (kind, payload_json, *self.ACTIVE_STATUSES)
+                ).fetchone()
+                if existing:
+                    return existing['id']
+            
+            conn.execute(
+                "INSERT INTO jobs (id, kind, session_id, status, stages, payload, created_at, updated_at, "
+                "owner, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, session_id, self.QUEUED,
+                 json.dumps({stage: 'pending' for stage in stages}),
+                 payload_json, now, now, self.owner, now)
+            )
+        
+        self.executors.get(kind, self.executor).submit(self._run, job_id)
+        return job_id
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the public view of a job, or None if it does not exist"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+    
+    def latest_for_session(self, session_id: str, kind=None) -> Optional[Dict[str, Any]]:
+        """Return the most recent job for a session (optionally of one kind or a tuple of kinds)"""
+        query = "SELECT * FROM jobs WHERE session_id = ?"
+        params = [session_id]
+        if kind:
+            kinds = (kind,) if isinstance(kind, str) else tuple(kind)
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        query += " ORDER BY created_at DESC LIMIT 1"
+        
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+        return self._to_dict(row) if row else None
+    
+    def resume_pending(self) -> int:
+        """
+        Take over queued or running jobs whose owning process has stopped heartbeating
+        
+        Jobs of live processes - including other workers sharing the job table - are
+        left alone. After the first call the heartbeat thread keeps reclaiming jobs
+        of processes that die later.
+        
+        Returns:
+            Number of jobs re-scheduled
+        """
+        self._reclaim = True
+        stale_before = time.time() - self.stale_seconds
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, kind FROM jobs WHERE status IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?) "
+                "ORDER BY created_at",
+                (*self.ACTIVE_STATUSES, stale_before)
+            ).fetchall()
+        
+        resumed = 0
+        for row in rows:
+            # Claim the job so that only one worker process resumes it
+            now = time.time()
+            with self._lock, self._connect() as conn:
+                claimed = conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, heartbeat_at = ?, updated_at = ? "
+                    "WHERE id = ? AND status IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                    (self.QUEUED, self.owner, now, now, row['id'], *self.ACTIVE_STATUSES, stale_before)
+                ).rowcount
+            if not claimed:
+                continue
+            if row['kind'] not in self.handlers:
+                self._finish(row['id'], self.FAILED, error='No handler registered after restart')
+                continue
+            self.executors.get(row['kind'], self.executor).submit(self._run, row['id'])
+            resumed += 1
+        return resumed
+    
+    def close(self):
+        """Stop the heartbeat thread (active jobs become reclaimable once stale)"""
+        self._stopped.set()
+    
+    def _heartbeat_loop(self):
+        """Refresh the heartbeat of this queue's active jobs and reclaim orphaned ones"""
+        while not self._stopped.wait(self.heartbeat_seconds):
+            try:
+                with self._lock, self._connect() as conn:
+                    conn.execute(
+                        "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                        (time.time(), self.owner, *self.ACTIVE_STATUSES)
+                    )
+                if self._reclaim:
+                    self.resume_pending()
+            except sqlite3.Error as e:
+                print(f"Warning: Job heartbeat failed: {e}")
+    
+    def _run(self, job_id: str):
+        """Execute a job on a worker thread and record its outcome"""
+        # Start only a queued job this queue still owns; another process may have taken it over
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            started = conn.execute(
+                "UPDATE jobs SET status = ?, heartbeat_at = ?, updated_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                (self.RUNNING, now, now, job_id, self.owner, self.QUEUED)
+            ).rowcount
+            row = conn.execute("SELECT kind, payload, stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if not started or not row:
+            return
+        
+        stages = json.loads(row['stages'])
+        # Stages of an interrupted run start over
+        stages = {name: 'pending' for name in stages}
+        self._update(job_id, stages=stages, current_stage=None)
+        
+        def progress(stage: str):
+            # Everything before the new stage is complete
+            for name in stages:
+                if name == stage:
+                    break
+                stages[name] = 'completed'
+            stages[stage] = 'running'
+            self._update(job_id, stages=stages, current_stage=stage)
+        
+        try:
+            handler = self.handlers[row['kind']]
+            result = handler(json.loads(row['payload'] or '{}'), progress)
+            for name in stages:
+                stages[name] = 'completed'
+            self._finish(job_id, self.COMPLETED, result=result, stages=stages)
+        except Exception as e:
+            traceback.print_exc()
+            for name, state in stages.items():
+                if state == 'running':
+                    stages[name] = 'failed'
+            self._finish(job_id, self.FAILED, error=str(e), stages=stages)
+    
+    def _update(self, job_id: str, **fields):
+        fields['updated_at'] = time.time()
+        if 'stages' in fields:
+            fields['stages'] = json.dumps(fields['stages'])
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        # A job taken over by another process no longer accepts this queue's updates
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ? AND owner = ?", (*fields.values(), job_id, self.owner))
+    
+    def _finish(self, job_id: str, status: str, result: Dict[str, Any] = None,
+                error: str = None, stages: Dict[str, str] = None):
+        # Drop the payload once the job is done - it can hold whole documents
+        fields = {
+            'status': status,
+            'result': json.dumps(result) if result is not None else None,
+            'error': error,
+            'payload': None,
+            'current_stage': None
+        }
+        if stages is not None:
+            fields['stages'] = stages
+        self._update(job_id, **fields)
+    
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        stages = json.loads(row['stages'])
+        done = sum(1 for state in stages.values() if state == 'completed')
+        return {
+            'job_id': row['id'],
+            'kind': row['kind'],
+            'session_id': row['session_id'],
+            'status': row['status'],
+            'current_stage': row['current_stage'],
+            'stages': [{'name': name, 'status': state} for name, state in stages.items()],
+            'progress': round(done / len(stages), 2) if stages else 0.0,
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
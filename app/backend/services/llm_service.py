@@ -123,8 +123,11 @@ Guidelines:
     # ==================== PPT Methods ====================
     
     def generate_slide_content(self, slide_type: str, balance_data: Dict, 
-                              company_data: Dict, metrics: Dict) -> Dict:
+                              company_data: Dict, metrics: Dict, ratios: Dict = None) -> Dict:
         """Generate content for a specific slide type"""
+        # Ratio and trend figures are computed, not generated
+        if slide_type in ('ratios', 'trends') and ratios and ratios.get('latest'):
+            return self._computed_slide_content(slide_type, balance_data, metrics, ratios)
         
         prompts = {
             'title': self._title_prompt(company_data),
@@ -172,6 +175,27 @@ Guidelines:
             print(f"Error generating content: {e}")
             return {'error': str(e)}
     
+    def _computed_slide_content(self, slide_type: str, balance_data: Dict,
+                                metrics: Dict, ratios: Dict) -> Dict:
+        """Build ratios/trends slide content from the RatioEngine report"""
+        from agents.ppt_tools import FinancialAnalyzerTool
+        
+        if slide_type == 'ratios':
+            return {
+                'title': 'Financial Ratios',
+                'ratios': FinancialAnalyzerTool.ratio_slide_rows(ratios)
+            }
+        
+        analysis = FinancialAnalyzerTool.analyze_balance_sheet(balance_data, metrics, ratios)
+        recommendations = [f"Address: {concern}" for concern in analysis['concerns'][:2]]
+        if not recommendations:
+            recommendations.append("Continue current financial management strategy")
+        return {
+            'title': 'Trends & Insights',
+            'insights': (analysis['trends'][:2] + analysis['strengths'] + analysis['concerns'])[:4],
+            'recommendations': recommendations
+        }
+    
     def _title_prompt(self, company_data: Dict) -> str:
         return f"""Create a title slide for a financial presentation.
 
@@ -0,0 +1,191 @@
+"""Map-reduce LLM extraction of structured fields over a whole document"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Iterable, Tuple
+from config import Config
+from services.extraction_cache import ExtractionCache
+import math
+import re
+
+
+class MapReduceExtractor:
+    """
+    Extract fields from every section of a long document instead of its first few pages
+    
+    The document is split into section-aligned chunks, each chunk is sent to the
+    LLM concurrently with a small output budget (map), and the per-chunk results
+    are merged in document order (reduce). Latency is bounded by the slowest
+    chunk rather than by document length.
+    
+    Results are cached per chunk and per document; a document is only cached once
+    every chunk succeeded, so a retry only re-sends the chunks that failed.
+    """
+    
+    DEDUPE_PATTERN = re.compile(r'\W+')
+    
+    def __init__(self, namespace: str, extract_chunk: Callable[[str], Dict[str, Any]],
+                 text_fields: Iterable[str] = (), chunk_chars: int = None, max_workers: int = None):
+        """
+        Initialize extractor
+        
+        Args:
+            namespace: Extraction cache namespace (chunks are cached under '<namespace>_chunk')
+            extract_chunk: Callable returning the fields found in one chunk ({} on failure)
+            text_fields: String fields whose distinct values from all chunks are joined
+                (other string fields keep the first value in document order)
+            chunk_chars: Target chunk size in characters (defaults to Config.EXTRACTION_CHUNK_CHARS)
+            max_workers: Concurrent LLM calls (defaults to Config.EXTRACTION_WORKERS)
+        """
+        self.namespace = namespace
+        self.extract_chunk = extract_chunk
+        self.text_fields = set(text_fields)
+        self.chunk_chars = chunk_chars or Config.EXTRACTION_CHUNK_CHARS
+        self.max_workers = max_workers or Config.EXTRACTION_WORKERS
+    
+    def extract(self, text: str) -> Dict[str, Any]:
+        """
+        Extract and merge fields from the whole document
+        
+        Args:
+            text: Document text
+        
+        Returns:
+            Merged fields ({} if every chunk failed)
+        """
+        if not text:
+            return {}
+        
+        partial = {}
+        
+        def compute():
+            results, complete = self._map(self.split(text))
+            partial.update(self.merge(results, self.text_fields))
+            return partial if complete and partial else None
+        
+        return ExtractionCache(self.namespace).get_or_compute(text, compute) or partial
+    
+    def _map(self, chunks: List[str]) -> Tuple[List[Dict[str, Any]], bool]:
+        """Extract every chunk concurrently; returns results in chunk order and whether all succeeded"""
+        cache = ExtractionCache(f'{self.namespace}_chunk')
+        
+        def extract_one(chunk: str) -> Dict[str, Any]:
+            return cache.get_or_compute(chunk, lambda: self.extract_chunk(chunk) or None) or {}
+        
+        if len(chunks) == 1:
+            results = [extract_one(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)),
+                                    thread_name_prefix='extract-chunk') as executor:
+                results = list(executor.map(extract_one, chunks))
+        
+        failed = sum(1 for result in results if not result)
+        if failed:
+            print(f"Warning: {failed} of {len(chunks)} chunks failed extraction for {self.namespace}")
+        return results, not failed
+    
+    def split(self, text: str) -> List[str]:
+        """
+        Split a document into chunks of whole sections
+        
+        Sections (see EnhancedCompanyParser._identify_sections_dynamic) are packed
+        in order up to the chunk size; a section longer than that is split on line
+        boundaries. The chunk size grows for very long documents so that at most
+        Config.EXTRACTION_MAX_CHUNKS chunks are sent.
+        """
+        from utils.enhanced_company_parser import EnhancedCompanyParser
+        
+        limit = max(self.chunk_chars, math.ceil(len(text) / Config.EXTRACTION_MAX_CHUNKS))
+        chunks = []
+        current = []
+        size = 0
+        
+        for section in EnhancedCompanyParser._identify_sections_dynamic(text):
+            for piece in self._split_section(f"{section['title']}\n{section['content']}", limit):
+                if current and size + len(piece) > limit:
+                    chunks.append(''.join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece)
+        
+        if current:
+            chunks.append(''.join(current))
+        return chunks or [text[:limit]]
+    
+    @staticmethod
+    def _split_section(section: str, limit: int) -> List[str]:
+        """Split an oversized section on line boundaries (lines longer than limit are cut)"""
+        if len(section) <= limit:
+            return [section]
+        
+        pieces = []
+        current = []
+        size = 0
+        for line in section.splitlines(keepends=True):
+            for start in range(0, len(line), limit):
+                part = line[start:start + limit]
+                if current and size + len(part) > limit:
+                    pieces.append(''.join(current))
+                    current, size = [], 0
+                current.append(part)
+                size += len(part)
+        if current:
+            pieces.append(''.join(current))
+        return pieces
+    
+    @staticmethod
+    def merge(results: List[Dict[str, Any]], text_fields: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Merge per-chunk results deterministically in document order
+        
+        Lists are concatenated and de-duplicated (case, spacing and punctuation
+        insensitive, first spelling kept); dictionaries are merged key by key; text
+        fields join their distinct values; any other field keeps its first
+        non-empty value.
+        
+        Args:
+            results: Per-chunk field dictionaries in document order
+            text_fields: String fields whose distinct values are joined
+        
+        Returns:
+            Merged field dictionary (empty values omitted)
+        """
+        text_fields = set(text_fields)
+        merged = {}
+        for result in results:
+            if not isinstance(result, dict):
+                continue
+            for key, value in result.items():
+                if value in (None, '', [], {}):
+                    continue
+                existing = merged.get(key)
+                if existing is None:
+                    merged[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(existing, list):
+                    existing.extend(value if isinstance(value, list) else [value])
+                elif isinstance(existing, dict) and isinstance(value, dict):
+                    merged[key] = {**value, **existing}
+                elif key in text_fields and isinstance(existing, str) and isinstance(value, str):
+                    if MapReduceExtractor._dedupe_key(value) not in MapReduceExtractor._dedupe_key(existing):
+                        merged[key] = f"{existing}\n\n{value.strip()}"
+        
+        for key, value in merged.items():
+            if isinstance(value, list):
+                merged[key] = MapReduceExtractor.dedupe(value)
+            elif isinstance(value, str):
+                merged[key] = value.strip()
+        return merged
+    
+    @staticmethod
+    def dedupe(items: List[Any]) -> List[Any]:
+        """Remove empty and duplicate items, keeping the first occurrence in order"""
+        seen = set()
+        unique = []
+        for item in items:
+            key = MapReduceExtractor._dedupe_key(item)
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(item)
+        return unique
+    
+    @staticmethod
+    def _dedupe_key(item: Any) -> str:
+        return MapReduceExtractor.DEDUPE_PATTERN.sub(' ', str(item)).strip().casefold()
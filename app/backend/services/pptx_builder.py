@@ -498,7 +498,7 @@ class PPTXBuilder:
         
         # Key Facts
         if content.get('key_facts'):
-                p = tf.add_paragraph()
+            p = tf.add_paragraph()
             p.text = "Key Facts"
             p.font.size = Pt(22)
             p.font.bold = True
@@ -654,7 +654,7 @@ class PPTXBuilder:
             for location in content['locations']:
                 p = tf.add_paragraph()
                 p.text = f"• {location}"
-            p.font.size = Pt(14)
+                p.font.size = Pt(14)
                 p.font.color.rgb = RGBColor(200, 200, 200)
                 p.space_after = Pt(6)
         
@@ -714,7 +714,7 @@ class PPTXBuilder:
             p.font.color.rgb = RGBColor(255, 255, 255)
             p.space_after = Pt(12)
             
-                p = tf.add_paragraph()
+            p = tf.add_paragraph()
             p.text = content['ceo_message_summary']
             p.font.size = Pt(14)
             p.font.color.rgb = RGBColor(200, 200, 200)
@@ -795,9 +795,9 @@ class PPTXBuilder:
             p.space_after = Pt(12)
             
             clients_text = " | ".join(content['clients'][:8])
-                p = tf.add_paragraph()
+            p = tf.add_paragraph()
             p.text = clients_text
-                p.font.size = Pt(14)
+            p.font.size = Pt(14)
             p.font.color.rgb = RGBColor(200, 200, 200)
     
     def _add_vision_mission_slide(self, content: Dict):
@@ -884,7 +884,7 @@ class PPTXBuilder:
             p.text = "Unique Selling Points:"
             p.font.size = Pt(18)
             p.font.bold = True
-                p.font.color.rgb = RGBColor(255, 255, 255)
+            p.font.color.rgb = RGBColor(255, 255, 255)
             p.space_before = Pt(12)
             p.space_after = Pt(8)
 
@@ -1,6 +1,5 @@
 from typing import Dict
-from utils.parser import BalanceSheetParser
-from utils.company_profile_parser import CompanyProfileParser
+from utils.document_parser import DocumentParser, ParsedDocument
 from .llm_service import LLMService
 from .embedding_service import EmbeddingService
 from .rag_service import RAGService
@@ -9,31 +8,29 @@ class FileProcessor:
     """Main file processing pipeline"""
     
     def __init__(self):
-        self.parser = BalanceSheetParser()
-        self.company_profile_parser = CompanyProfileParser()
         self.llm_service = LLMService()
         self.embedding_service = EmbeddingService()
         self.rag_service = RAGService(self.embedding_service)
     
-    def process_files(self, balance_sheet_content: str, company_profile_content: str = None) -> Dict:
+    def process_files(self, balance_sheet_content: str, company_profile_content: str = None,
+                      parsed_document: ParsedDocument = None) -> Dict:
         """
         Process balance sheet and company profile files through complete pipeline
         
         Args:
             balance_sheet_content: Raw balance sheet content
             company_profile_content: Raw company profile content (optional)
+            parsed_document: Optional document already parsed for this upload
             
         Returns:
             Dictionary with processing results
         """
-        # Step 1: Parse balance sheet into individual entries
-        entries = self.parser.parse(balance_sheet_content)
-        
-        # Step 2: Parse company profile into meaningful sections (if provided)
-        if company_profile_content:
-            company_sections = self.company_profile_parser.parse(company_profile_content)
-            # Add company profile sections to entries
-            entries.extend(company_sections)
+        # Steps 1-2: Balance sheet entries and company profile sections from the shared parse
+        if parsed_document is None:
+            parsed_document = DocumentParser.parse(
+                balance_sheet_content, company_profile_content, llm_service=self.llm_service
+            )
+        entries = parsed_document.legacy_entries()
         
         if not entries:
             raise ValueError("No entries found in the file. Please check the file format.")
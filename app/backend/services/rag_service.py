@@ -1,4 +1,5 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import numpy as np
 from .embedding_service import EmbeddingService
 from config import Config
 
@@ -8,18 +9,35 @@ class RAGService:
     def __init__(self, embedding_service: EmbeddingService):
         self.embedding_service = embedding_service
         self.knowledge_base = []
+        self._embedding_matrix = None  # Row-normalized float32 embeddings
     
     def index_documents(self, embedded_summaries: List[Dict]):
         """Store embedded summaries in the knowledge base"""
         self.knowledge_base = embedded_summaries
+        self._embedding_matrix = self._build_embedding_matrix(embedded_summaries)
     
-    def retrieve_relevant_context(self, query: str, top_k: int = None) -> List[Dict]:
+    @staticmethod
+    def _build_embedding_matrix(embedded_summaries: List[Dict]) -> Optional[np.ndarray]:
+        """Stack embeddings into one matrix with unit-length rows (zero rows stay zero)"""
+        if not embedded_summaries:
+            return None
+        
+        # Normalize in float64 so scores match EmbeddingService.cosine_similarity
+        matrix = np.asarray([item['embedding'] for item in embedded_summaries], dtype=np.float64)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+    
+    def retrieve_relevant_context(self, query: str, top_k: int = None,
+                                  similarity_threshold: float = None) -> List[Dict]:
         """
         Retrieve most relevant context for a query
         
         Args:
             query: User's question
             top_k: Number of results to return
+            similarity_threshold: Minimum similarity to keep a result (defaults to
+                Config.SIMILARITY_THRESHOLD when Config.APPLY_SIMILARITY_THRESHOLD is set)
             
         Returns:
             List of relevant context items with similarity scores
@@ -30,17 +48,37 @@ class RAGService:
         if top_k is None:
             top_k = Config.TOP_K_RESULTS
         
+        if similarity_threshold is None and Config.APPLY_SIMILARITY_THRESHOLD:
+            similarity_threshold = Config.SIMILARITY_THRESHOLD
+        
         # Create embedding for query
         query_embedding = self.embedding_service.create_embedding(query)
         
-        # Calculate similarities
+        # Calculate all similarities with a single matrix-vector product
+        query_vector = np.asarray(query_embedding, dtype=np.float64)
+        query_norm = np.linalg.norm(query_vector)
+        if query_norm == 0:
+            similarities = np.zeros(len(self.knowledge_base), dtype=np.float32)
+        else:
+            similarities = self._embedding_matrix @ (query_vector / query_norm).astype(np.float32)
+        
+        # Select top k without sorting the whole knowledge base
+        top_k = min(top_k, len(similarities))
+        if top_k <= 0:
+            return []
+        if top_k < len(similarities):
+            top_indices = np.argpartition(-similarities, top_k - 1)[:top_k]
+        else:
+            top_indices = np.arange(len(similarities))
+        top_indices = top_indices[np.argsort(-similarities[top_indices], kind='stable')]
+        
         results = []
-        for item in self.knowledge_base:
-            similarity = self.embedding_service.cosine_similarity(
-                query_embedding, 
-                item['embedding']
-            )
+        for index in top_indices:
+            similarity = float(similarities[index])
+            if similarity_threshold is not None and similarity < similarity_threshold:
+                break
             
+            item = self.knowledge_base[index]
             results.append({
                 'section': item['section'],
                 'summary': item['summary'],
@@ -48,9 +86,7 @@ class RAGService:
                 'similarity': similarity
             })
         
-        # Sort by similarity and return top k
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:top_k]
+        return results
     
     def format_context(self, retrieved_items: List[Dict]) -> str:
         """Format retrieved items into a context string"""
@@ -67,4 +103,4 @@ class RAGService:
                 f"Relevance: {item['similarity']:.2f}"
             )
         
-        return "\n\n".join(context_parts)
\ No newline at end of file
+        return "\n\n".join(context_parts)
@@ -0,0 +1,348 @@
+"""Persistent session state with a bounded in-memory cache of live pipelines"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from config import Config
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+
+class SQLiteKeyValueStore:
+    """Local stand-in for Redis exposing the subset of its API the session store uses"""
+    
+    PURGE_INTERVAL = 60  # Seconds between purges of expired keys
+    MAX_BATCH_KEYS = 500  # Keys per statement in batched reads (below SQLite's variable limit)
+    
+    def __init__(self, db_path: str = None):
+        """
+        Initialize key-value store
+        
+        Args:
+            db_path: Path of the SQLite database (defaults to Config.SESSION_DB_PATH)
+        """
+        self.db_path = db_path or Config.SESSION_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS kv (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_kv_expires ON kv (expires_at)")
+    
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection that commits on success and always closes"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored under key, or None if it is missing or expired"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+    
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Return the values stored under keys, in order (None for missing or expired keys)"""
+        found = {}
+        now = time.time()
+        with self._connect() as conn:
+            for start in range(0, len(keys), self.MAX_BATCH_KEYS):
+                batch = keys[start:start + self.MAX_BATCH_KEYS]
+                found.update(conn.execute(
+                    f"SELECT key, value FROM kv WHERE key IN ({', '.join('?' * len(batch))}) "
+                    "AND (expires_at IS NULL OR expires_at > ?)",
+                    (*batch, now)
+                ).fetchall())
+        return [found.get(key) for key in keys]
+    
+    def set(self, key: str, value, ex: int = None) -> bool:
+        """Store value under key, expiring after ex seconds if given"""
+        return self.set_many({key: value}, ex=ex)
+    
+    def set_many(self, mapping: Dict[str, Any], ex: int = None) -> bool:
+        """Store several values in one transaction, expiring after ex seconds if given"""
+        expires_at = time.time() + ex if ex else None
+        rows = [
+            (key, value.encode('utf-8') if isinstance(value, str) else value, expires_at)
+            for key, value in mapping.items()
+        ]
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)", rows)
+            # Expired keys are purged on a write at most once per PURGE_INTERVAL
+            if time.time() >= self._next_purge:
+                conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+                self._next_purge = time.time() + self.PURGE_INTERVAL
+        return True
+    
+    def delete(self, *keys: str) -> int:
+        """Delete keys and return how many existed"""
+        if not keys:
+            return 0
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                f"DELETE FROM kv WHERE key IN ({', '.join('?' * len(keys))})", keys
+            ).rowcount
+    
+    def exists(self, key: str) -> int:
+        """Return 1 if key exists (and has not expired), else 0"""
+        return int(self.get(key) is not None)
+    
+    def expire(self, key: str, seconds: int) -> bool:
+        """Set the time to live of an existing key"""
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                "UPDATE kv SET expires_at = ? WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (time.time() + seconds, key, time.time())
+            ).rowcount > 0
+    
+    def modify(self, key: str, func: Callable[[Optional[bytes]], Any], ex: int = None):
+        """
+        Atomically replace the value under key with func(current value)
+        
+        The read and the write run in one BEGIN IMMEDIATE transaction, so concurrent
+        modifications from other processes sharing the database are serialized.
+        
+        Args:
+            key: Key to modify
+            func: Callable receiving the current value (None if missing or expired)
+                and returning the new value
+            ex: Optional expiry of the new value in seconds
+        
+        Returns:
+            The new value as returned by func
+        """
+        with self._lock:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute(
+                        "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                        (key, time.time())
+                    ).fetchone()
+                    value = func(row[0] if row else None)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, value.encode('utf-8') if isinstance(value, str) else value,
+                         time.time() + ex if ex else None)
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+        return value
+
+
+def create_backend():
+    """Create the key-value backend: Redis when SESSION_STORE_URL points to it, SQLite otherwise"""
+    url = Config.SESSION_STORE_URL
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        if HAS_REDIS:
+            return redis.Redis.from_url(url)
+        print("Warning: redis not installed, falling back to SQLite session store")
+    return SQLiteKeyValueStore()
+
+
+class SessionStore:
+    """
+    Serialized per-session state shared by all workers
+    
+    A session record holds the hashes of its documents, its vector DB collection
+    name, parsed company data and generated presentation metadata. Document text
+    is stored once per content hash so that sessions can be rebuilt in any worker.
+    """
+    
+    SESSION_PREFIX = 'session:'
+    DOCUMENT_PREFIX = 'document:'
+    
+    def __init__(self, backend=None, ttl: int = None):
+        """
+        Initialize session store
+        
+        Args:
+            backend: Object with Redis-style get/set/delete/exists (defaults to create_backend())
+            ttl: Seconds a session is kept after its last update (defaults to Config.SESSION_TTL)
+        """
+        self.backend = backend or create_backend()
+        self.ttl = ttl or Config.SESSION_TTL
+    
+    @staticmethod
+    def _decode(value) -> Optional[str]:
+        if value is None:
+            return None
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+    
+    def save_document(self, content_hash: str, text: str):
+        """Store document text under its content hash"""
+        self.backend.set(self.DOCUMENT_PREFIX + content_hash, text, ex=self.ttl)
+    
+    def load_document(self, content_hash: Optional[str]) -> Optional[str]:
+        """Return the document text stored under a content hash"""
+        if not content_hash:
+            return None
+        return self._decode(self.backend.get(self.DOCUMENT_PREFIX + content_hash))
+    
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session state, or None if the session does not exist"""
+        if not session_id:
+            return None
+        value = self._decode(self.backend.get(self.SESSION_PREFIX + session_id))
+        return json.loads(value) if value else None
+    
+    def save(self, session_id: str, state: Dict[str, Any]):
+        """Replace the session state"""
+        state = {**state, 'session_id': session_id, 'updated_at': time.time()}
+        self.backend.set(self.SESSION_PREFIX + session_id, json.dumps(state, default=str), ex=self.ttl)
+        self._touch_documents(state)
+    
+    def update(self, session_id: str, **fields) -> Dict[str, Any]:
+        """
+        Merge fields into the session state and return the new state
+        
+        The merge is atomic across processes: a BEGIN IMMEDIATE transaction on the
+        SQLite store, WATCH/MULTI (retried on conflict) on Redis.
+        """
+        def merge(value) -> str:
+            value = self._decode(value)
+            state.clear()
+            state.update(json.loads(value) if value else {})
+            state.update(fields, session_id=session_id, updated_at=time.time())
+            return json.dumps(state, default=str)
+        
+        state = {}
+        key = self.SESSION_PREFIX + session_id
+        if isinstance(self.backend, SQLiteKeyValueStore):
+            self.backend.modify(key, merge, ex=self.ttl)
+        else:
+            def transaction(pipe):
+                value = merge(pipe.get(key))
+                pipe.multi()
+                pipe.set(key, value, ex=self.ttl)
+            self.backend.transaction(transaction, key)
+        self._touch_documents(state)
+        return state
+    
+    def _touch_documents(self, state: Dict[str, Any]):
+        """Extend the documents of a session to the session's time to live"""
+        for content_hash in (state.get('documents') or {}).values():
+            if content_hash:
+                self.backend.expire(self.DOCUMENT_PREFIX + content_hash, self.ttl)
+    
+    def exists(self, session_id: str) -> bool:
+        """Check whether a session exists"""
+        return bool(session_id) and bool(self.backend.exists(self.SESSION_PREFIX + session_id))
+    
+    def delete(self, session_id: str):
+        """Remove a session record (documents expire on their own)"""
+        self.backend.delete(self.SESSION_PREFIX + session_id)
+    
+    def load_documents(self, state: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Load the documents referenced by a session state
+        
+        Args:
+            state: Session state as returned by get()
+        
+        Returns:
+            Tuple of (balance_sheet_text, company_profile_text)
+        """
+        documents = state.get('documents', {})
+        balance_sheet = self.load_document(documents.get('balance_sheet'))
+        if balance_sheet is None:
+            raise ValueError("Session documents have expired. Please upload files again.")
+        return balance_sheet, self.load_document(documents.get('company_profile'))
+
+
+class PipelineCache:
+    """Bounded LRU of live per-session objects (pipelines, processors) rebuilt on demand"""
+    
+    def __init__(self, max_size: int = None):
+        """
+        Initialize pipeline cache
+        
+        Args:
+            max_size: Maximum number of live objects (defaults to Config.PIPELINE_CACHE_SIZE)
+        """
+        self.max_size = max(1, max_size or Config.PIPELINE_CACHE_SIZE)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-session build locks, kept while any caller still holds a reference
+        self._build_locks = weakref.WeakValueDictionary()
+    
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._items
+    
+    def get(self, session_id: str):
+        """Return the live object for a session (marking it recently used), or None"""
+        with self._lock:
+            if session_id not in self._items:
+                return None
+            self._items.move_to_end(session_id)
+            return self._items[session_id]
+    
+    def put(self, session_id: str, item):
+        """Add or replace a live object, evicting the least recently used ones"""
+        with self._lock:
+            self._items[session_id] = item
+            self._items.move_to_end(session_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+    
+    def discard(self, session_id: str):
+        """Drop the live object for a session"""
+        with self._lock:
+            self._items.pop(session_id, None)
+    
+    def get_or_build(self, session_id: str, builder: Callable[[], Any]):
+        """
+        Return the live object for a session, building it once if it is missing
+        
+        Args:
+            session_id: Session identifier
+            builder: Callable returning a new object; concurrent callers for the
+                same session wait for a single build
+        
+        Returns:
+            Live object
+        """
+        item = self.get(session_id)
+        if item is not None:
+            return item
+        
+        with self._lock:
+            build_lock = self._build_locks.get(session_id)
+            if build_lock is None:
+                build_lock = self._build_locks[session_id] = threading.Lock()
+        
+        with build_lock:
+            # Another request may have finished the build while we waited
+            item = self.get(session_id)
+            if item is None:
+                item = builder()
+                self.put(session_id, item)
+        return item
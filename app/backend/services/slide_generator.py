@@ -1,7 +1,7 @@
 from typing import Dict, List
 from .llm_service import LLMService
 from .pptx_builder import PPTXBuilder
-from utils.financial_parser import FinancialDataParser
+from utils.document_parser import DocumentParser
 from config import Config
 import uuid
 import os
@@ -11,7 +11,6 @@ class SlideGenerator:
     
     def __init__(self):
         self.llm_service = LLMService()
-        self.parser = FinancialDataParser()
     
     def generate_presentation(self, balance_sheet_text: str, company_profile_text: str,
                             selected_slides: List[str], template: str, theme: str) -> Dict:
@@ -28,17 +27,17 @@ class SlideGenerator:
         Returns:
             Dictionary with presentation data and file path
         """
-        # Parse input data
-        balance_data = self.parser.parse_balance_sheet(balance_sheet_text)
-        # Use LLM service for enhanced company profile parsing
-        company_data = self.parser.parse_company_profile(company_profile_text, llm_service=self.llm_service)
-        metrics = self.parser.extract_financial_metrics(balance_data)
+        # Parse input data (LLM service for enhanced company profile parsing)
+        document = DocumentParser.parse(balance_sheet_text, company_profile_text, llm_service=self.llm_service)
+        balance_data = document.balance_data
+        company_data = document.company_data
+        metrics = document.metrics
         
         # Generate slides
         slides = []
         for slide_type in selected_slides:
             content = self.llm_service.generate_slide_content(
-                slide_type, balance_data, company_data, metrics
+                slide_type, balance_data, company_data, metrics, ratios=document.ratios
             )
             
             slides.append({
@@ -0,0 +1,151 @@
+"""Memory-compact in-memory vector store"""
+from typing import Dict, List, Any, Optional, Iterable
+import numpy as np
+
+
+class CompactVectorStore:
+    """
+    Struct-of-arrays store of chunks, used when ChromaDB is not installed
+    
+    Chunk texts live in one string buffer addressed by offsets, metadata dicts
+    are interned (chunks of a section share one dict referenced by id) and
+    embeddings form a single float32 matrix of unit-normalized rows, so search
+    is one matrix-vector product. Compared with a list of per-chunk dicts holding
+    Python float lists, this takes roughly an order of magnitude less memory.
+    """
+    
+    def __init__(self):
+        self._ids = []
+        self._rows = {}  # id -> row
+        self._text = ''
+        self._offsets = np.zeros(1, dtype=np.int64)  # Row i is _text[_offsets[i]:_offsets[i + 1]]
+        self._metadata = []  # Interned metadata dicts
+        self._metadata_keys = {}  # Frozen metadata -> index in _metadata
+        self._metadata_ids = np.zeros(0, dtype=np.int32)
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def ids(self) -> List[str]:
+        """Return all chunk IDs in insertion order"""
+        return list(self._ids)
+    
+    def text(self, row: int) -> str:
+        """Return the text of one row"""
+        return self._text[self._offsets[row]:self._offsets[row + 1]]
+    
+    def upsert(self, ids: List[str], texts: List[str], embeddings: List[List[float]],
+               metadatas: List[Dict[str, Any]]):
+        """
+        Add chunks, replacing any with the same ID
+        
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts
+            embeddings: Embedding vectors (all of the same dimension)
+            metadatas: Metadata dictionaries (equal dicts are stored once)
+        """
+        if not ids:
+            return
+        self.delete(ids)
+        
+        matrix = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        if len(self._ids) and matrix.shape[1] != self._embeddings.shape[1]:
+            raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match store dimension {self._embeddings.shape[1]}")
+        
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        self._offsets = np.concatenate([self._offsets, self._offsets[-1] + np.cumsum(lengths)])
+        self._text = ''.join([self._text, *texts])
+        self._metadata_ids = np.concatenate([
+            self._metadata_ids,
+            np.fromiter((self._intern(metadata) for metadata in metadatas), dtype=np.int32, count=len(metadatas))
+        ])
+        self._embeddings = matrix if not len(self._ids) else np.vstack([self._embeddings, matrix])
+        
+        for chunk_id in ids:
+            self._rows[chunk_id] = len(self._ids)
+            self._ids.append(chunk_id)
+    
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        Delete chunks by ID (unknown IDs are ignored)
+        
+        Returns:
+            Number of chunks deleted
+        """
+        rows = [self._rows[chunk_id] for chunk_id in set(ids) if chunk_id in self._rows]
+        if not rows:
+            return 0
+        
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[rows] = False
+        kept_rows = np.flatnonzero(keep)
+        
+        self._text = ''.join(self.text(row) for row in kept_rows)
+        lengths = np.diff(self._offsets)[keep]
+        self._offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._metadata_ids = self._metadata_ids[keep]
+        self._embeddings = self._embeddings[keep]
+        self._ids = [self._ids[row] for row in kept_rows]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        return len(rows)
+    
+    def search(self, query_embedding: List[float], k: int = 4,
+               filter_metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Return the k most cosine-similar chunks
+        
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            filter_metadata: Optional {key: value} metadata equality filter
+        
+        Returns:
+            List of dictionaries with 'text', 'metadata' and 'score', best first
+        """
+        if not self._ids or k <= 0:
+            return []
+        
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+        scores = self._embeddings @ query
+        
+        candidates = np.arange(len(self._ids))
+        if filter_metadata:
+            allowed = [
+                i for i, metadata in enumerate(self._metadata)
+                if all(metadata.get(key) == value for key, value in filter_metadata.items())
+            ]
+            candidates = np.flatnonzero(np.isin(self._metadata_ids, allowed))
+        
+        if len(candidates) > k:
+            top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        else:
+            top = candidates
+        top = top[np.argsort(-scores[top], kind='stable')]
+        
+        return [
+            {
+                'text': self.text(row),
+                'metadata': dict(self._metadata[self._metadata_ids[row]]),
+                'score': float(scores[row])
+            }
+            for row in top
+        ]
+    
+    def _intern(self, metadata: Dict[str, Any]) -> int:
+        """Return the index of an equal stored metadata dict, storing it if new"""
+        metadata = metadata or {}
+        key = tuple(sorted((name, repr(value)) for name, value in metadata.items()))
+        index = self._metadata_keys.get(key)
+        if index is None:
+            index = len(self._metadata)
+            self._metadata.append(dict(metadata))
+            self._metadata_keys[key] = index
+        return index
+    
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """Scale rows to unit length (zero rows stay zero, scoring 0 like EmbeddingService.cosine_similarity)"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
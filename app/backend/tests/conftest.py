@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Tests import backend modules the way app.py does (from config import Config)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config is read at import time: keep test runs off the real API and data directory
+os.environ.setdefault('OPENAI_API_KEY', 'sk-test')
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='finq-tests-'))
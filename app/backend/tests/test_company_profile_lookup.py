@@ -0,0 +1,42 @@
+import pytest
+from agents.tools import CompanyProfileLookupTool
+
+
+COMPANY_DATA = {
+    'company_name': 'Acme Industries',
+    'clients': ['Globex', 'Initech'],
+    'leadership': ['Jane Doe - CEO', 'John Roe - CFO'],
+    'locations': ['Pune', 'Rotterdam'],
+    'markets': ['Automotive', 'Energy'],
+    'products_services': ['Valves', 'Pumps'],
+    'ceo_message': 'We build for the long term.',
+    'history': 'Started as a family workshop.'
+}
+
+
+@pytest.fixture
+def tool():
+    return CompanyProfileLookupTool(COMPANY_DATA)
+
+
+@pytest.mark.parametrize('query, intent', [
+    ('Who are the clients?', 'clients'),
+    ('List the products', 'products_services'),
+    ('Who are the directors of Acme Industries?', 'leadership'),
+    ('Where is the company headquartered?', 'locations'),
+    ("What is the CEO's message?", 'ceo_message')
+])
+def test_entity_list_questions_use_fast_path(tool, query, intent):
+    result = tool.lookup(query)
+    assert result is not None
+    assert result['intent'] == intent
+
+
+@pytest.mark.parametrize('query', [
+    'What services do you offer to clients?',
+    'What is the strategy for new markets?',
+    'How will it expand its presence in Europe?',
+    "What is the CEO's background?"
+])
+def test_questions_beyond_an_entity_list_fall_through(tool, query):
+    assert tool.lookup(query) is None
@@ -0,0 +1,56 @@
+import json
+from agents.ppt_pipeline import PPTAgenticPipeline
+from utils.document_parser import DocumentParser
+
+BALANCE_SHEET = """Balance Sheet
+Particulars 2023 2022
+Total Assets 1000 900
+Total Liabilities 600 500
+Equity 400 400
+"""
+
+BROCHURE = """About Us
+Northwind Fabrication builds pressure vessels.
+
+Products
+Heat exchangers and storage tanks.
+"""
+
+EXTRACTED = {
+    'company_name': 'Northwind Fabrication',
+    'products_services': ['Heat exchangers', 'Storage tanks'],
+    'markets': ['Oil & Gas'],
+    'leadership': ['Jane Doe - CEO'],
+    'vision': 'Safe vessels everywhere'
+}
+
+
+class CountingCompletions:
+    def __init__(self):
+        self.prompts = []
+    
+    def create(self, **kwargs):
+        self.prompts.append(kwargs['messages'][-1]['content'])
+        message = type('Message', (), {'content': json.dumps(EXTRACTED)})()
+        return type('Response', (), {'choices': [type('Choice', (), {'message': message})()]})()
+
+
+def test_company_slides_reuse_the_parsed_brochure_extraction():
+    pipeline = PPTAgenticPipeline()
+    completions = CountingCompletions()
+    pipeline.llm_service.client = type('Client', (), {'chat': type('Chat', (), {'completions': completions})()})()
+    
+    document = DocumentParser.parse(BALANCE_SHEET, BROCHURE, llm_service=pipeline.llm_service)
+    parse_calls = len(completions.prompts)
+    assert parse_calls == 1
+    
+    slide_types = ['products_services', 'markets_locations', 'leadership', 'major_projects', 'vision_mission']
+    slides, _ = pipeline._build_slides(
+        BALANCE_SHEET, BROCHURE, slide_types, 'corporate', False, parsed_document=document
+    )
+    
+    # Sparse fields are filled from the cached parse, never by a second extraction
+    assert len(completions.prompts) == parse_calls
+    assert set(slides['products_services']['content']['products']) >= {'Heat exchangers', 'Storage tanks'}
+    assert 'Jane Doe - CEO' in slides['leadership']['content']['leadership']
+    assert slides['vision_mission']['content']['vision'] == 'Safe vessels everywhere'
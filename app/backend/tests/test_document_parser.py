@@ -0,0 +1,84 @@
+import pytest
+from utils.document_parser import DocumentParser
+
+
+FREE_TEXT_BALANCE_SHEET = """Balance Sheet
+Particulars 2024 2023
+Assets
+Current Assets
+Cash 800 700
+Other current assets 200 150
+Total Current Assets 1,000 850
+Non-current Assets
+Property and equipment 3,500 3,150
+Total Assets 4,500 4,000
+Liabilities
+Current Liabilities
+Accounts payable 500 450
+Total Current Liabilities 500 450
+Deferred income tax 120 100
+Long-term debt 1,380 1,250
+Total Liabilities 2,000 1,800
+Equity
+Share capital 2,500 2,200
+Total Equity 2,500 2,200
+"""
+
+
+def test_free_text_total_rows_are_values_not_headers():
+    document = DocumentParser.parse(FREE_TEXT_BALANCE_SHEET)
+    line_items = set(document.table.frame['line_item'])
+    
+    assert {'Total Assets', 'Total Current Assets', 'Other current assets', 'Deferred income tax'} <= line_items
+    # Headers without values stay out of the table
+    assert not {'Assets', 'Current Assets', 'Current Liabilities'} & line_items
+
+
+def test_free_text_totals_drive_metrics_and_ratios():
+    document = DocumentParser.parse(FREE_TEXT_BALANCE_SHEET)
+    
+    assert document.metrics['total_assets'] == 4500
+    assert document.metrics['current_assets'] == 1000
+    assert document.metrics['total_liabilities'] == 2000
+    assert document.metrics['total_equity'] == 2500
+    assert document.metrics['current_ratio'] == pytest.approx(2.0)
+    assert document.metrics['equity_multiplier'] == pytest.approx(1.8)
+    assert document.ratios['values']['total_assets'] == [4000, 4500]
+
+
+CAPITAL_WORK_BALANCE_SHEET = """Balance Sheet
+Particulars 2024 2023
+Assets
+Non-current Assets
+Property, plant and equipment 3,000 2,800
+Capital work in progress 400 250
+Capital advances 100 50
+Current Assets
+Cash 1,000 900
+Total Assets 4,500 4,000
+Liabilities
+Non-current Liabilities
+Long-term debt 1,200 1,100
+Deferred tax assets 100 80
+Current Liabilities
+Accounts payable 800 700
+Total Liabilities 2,000 1,800
+Shareholders' Equity
+Share capital 1,500 1,400
+Retained earnings 1,000 800
+Total Equity 2,500 2,200
+"""
+
+
+def test_capital_line_items_stay_in_their_section():
+    document = DocumentParser.parse(CAPITAL_WORK_BALANCE_SHEET)
+    sections = dict(zip(document.table.frame['line_item'], document.table.frame['section']))
+    
+    assert sections['Capital work in progress'] == 'assets'
+    assert sections['Capital advances'] == 'assets'
+    assert sections['Cash'] == 'assets'
+    assert sections['Deferred tax assets'] == 'liabilities'
+    assert sections['Accounts payable'] == 'liabilities'
+    assert sections['Share capital'] == 'equity'
+    assert document.metrics['total_equity'] == 2500
+    assert document.metrics['total_liabilities'] == 2000
@@ -0,0 +1,41 @@
+from agents.tools import EmbedderTool
+
+
+class CountingEmbeddingService:
+    def __init__(self):
+        self.calls = 0
+    
+    def create_embedding(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0, 0.5]
+
+
+def test_embed_batch_reuses_persisted_embeddings():
+    first = EmbedderTool()
+    first.embedding_service = CountingEmbeddingService()
+    assert first.embed_batch(['alpha chunk', 'beta chunk']) == [[11.0, 1.0, 0.5], [10.0, 1.0, 0.5]]
+    
+    # A rebuilt pipeline (new tool instance) embeds only the chunk it has not seen
+    second = EmbedderTool()
+    second.embedding_service = CountingEmbeddingService()
+    assert second.embed_batch(['alpha chunk', 'gamma']) == [[11.0, 1.0, 0.5], [5.0, 1.0, 0.5]]
+    assert second.embedding_service.calls == 1
+
+
+def test_embed_batch_reads_and_writes_the_cache_in_one_batch(monkeypatch):
+    import agents.tools
+    from services.extraction_cache import get_backend
+    backend = get_backend()
+    calls = []
+    monkeypatch.setattr(backend, 'get', lambda *args, **kwargs: calls.append('get'))
+    original_mget, original_set_many = backend.mget, backend.set_many
+    monkeypatch.setattr(backend, 'mget', lambda keys: calls.append('mget') or original_mget(keys))
+    monkeypatch.setattr(backend, 'set_many', lambda mapping, ex=None: calls.append(('set_many', len(mapping), ex))
+                        or original_set_many(mapping, ex=ex))
+    
+    tool = EmbedderTool()
+    tool.embedding_service = CountingEmbeddingService()
+    tool.embed_batch(['one', 'two', 'one', 'three'])
+    
+    assert tool.embedding_service.calls == 3
+    assert calls == ['mget', ('set_many', 3, agents.tools.Config.EXTRACTION_CACHE_TTL)]
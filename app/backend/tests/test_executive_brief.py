@@ -0,0 +1,34 @@
+import pytest
+from agents.ppt_pipeline import PPTAgenticPipeline
+
+
+class FakeCompletions:
+    def __init__(self, content=None, error=None):
+        self.content = content
+        self.error = error
+    
+    def create(self, **kwargs):
+        if self.error:
+            raise self.error
+        message = type('Message', (), {'content': self.content})()
+        return type('Response', (), {'choices': [type('Choice', (), {'message': message})()]})()
+
+
+@pytest.fixture
+def pipeline():
+    return PPTAgenticPipeline()
+
+
+def use_completions(pipeline, completions):
+    pipeline.llm_service.client = type('Client', (), {'chat': type('Chat', (), {'completions': completions})()})()
+
+
+def test_polish_reports_success(pipeline):
+    use_completions(pipeline, FakeCompletions(content=' Polished brief. '))
+    assert pipeline.polish_executive_brief('Template brief.', []) == ('Polished brief.', True)
+
+
+@pytest.mark.parametrize('completions', [FakeCompletions(error=RuntimeError('rate limited')), FakeCompletions(content='')])
+def test_failed_polish_keeps_template_brief_and_reports_failure(pipeline, completions):
+    use_completions(pipeline, completions)
+    assert pipeline.polish_executive_brief('Template brief.', []) == ('Template brief.', False)
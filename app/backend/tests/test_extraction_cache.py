@@ -0,0 +1,27 @@
+import threading
+import time
+from services.extraction_cache import ExtractionCache
+
+
+def test_concurrent_misses_compute_once_and_release_their_lock():
+    cache = ExtractionCache('test_key_locks')
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'value': 42}
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute('brochure text', compute)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 4
+    assert cache._key('brochure text') not in ExtractionCache._key_locks
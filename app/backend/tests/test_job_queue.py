@@ -0,0 +1,75 @@
+import threading
+import time
+import pytest
+from services.job_queue import JobQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.sqlite3')
+
+
+def wait_for(queue, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not reach {status}: {queue.get(job_id)}")
+
+
+def test_resume_leaves_jobs_of_live_processes_alone(db_path):
+    release = threading.Event()
+    runs = []
+    
+    def handler(payload, progress):
+        runs.append(payload)
+        release.wait(5)
+        return {'ok': True}
+    
+    live = JobQueue(db_path=db_path, max_workers=1, heartbeat_seconds=0.05, stale_seconds=1)
+    live.register('work', handler)
+    job_id = live.submit('work', {'n': 1}, ['step'])
+    wait_for(live, job_id, JobQueue.RUNNING)
+    
+    other = JobQueue(db_path=db_path, max_workers=1, heartbeat_seconds=0.05, stale_seconds=1)
+    other.register('work', handler)
+    assert other.resume_pending() == 0
+    
+    release.set()
+    assert wait_for(live, job_id, JobQueue.COMPLETED)['result'] == {'ok': True}
+    assert len(runs) == 1
+    live.close()
+    other.close()
+
+
+def test_resume_takes_over_jobs_with_stale_heartbeat(db_path):
+    queue = JobQueue(db_path=db_path, max_workers=1, heartbeat_seconds=0.05, stale_seconds=1)
+    queue.register('work', lambda payload, progress: {'n': payload['n']})
+    
+    # A job left running by a process that stopped heartbeating a minute ago
+    with queue._connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, stages, payload, created_at, updated_at, owner, heartbeat_at) "
+            "VALUES ('orphan', 'work', ?, '{\"step\": \"running\"}', '{\"n\": 7}', ?, ?, 'dead-host:1', ?)",
+            (JobQueue.RUNNING, time.time() - 60, time.time() - 60, time.time() - 60)
+        )
+    
+    assert queue.resume_pending() == 1
+    assert wait_for(queue, 'orphan', JobQueue.COMPLETED)['result'] == {'n': 7}
+    queue.close()
+
+
+def test_latest_for_session_filters_by_kinds(db_path):
+    queue = JobQueue(db_path=db_path, max_workers=1)
+    queue.register('ingest', lambda payload, progress: {})
+    queue.register('deck', lambda payload, progress: {})
+    ingest_id = queue.submit('ingest', {}, ['step'], session_id='s1')
+    wait_for(queue, ingest_id, JobQueue.COMPLETED)
+    deck_id = queue.submit('deck', {}, ['step'], session_id='s1')
+    
+    assert queue.latest_for_session('s1')['job_id'] == deck_id
+    assert queue.latest_for_session('s1', kind=('ingest', 'update'))['job_id'] == ingest_id
+    assert queue.latest_for_session('s1', kind='deck')['job_id'] == deck_id
+    queue.close()
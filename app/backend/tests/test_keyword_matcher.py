@@ -0,0 +1,78 @@
+import random
+import pytest
+from utils.enhanced_company_parser import EnhancedCompanyParser
+from utils.keyword_matcher import KeywordMatcher
+
+
+def substring_labels(keyword_groups, title):
+    """The any(kw in title ...) chains KeywordMatcher replaced"""
+    title = title.lower()
+    return {label for label, keywords in keyword_groups.items() if any(keyword in title for keyword in keywords)}
+
+
+def substring_counts(keyword_groups, text):
+    """The per-industry keyword count KeywordMatcher replaced"""
+    text = text.lower()
+    counts = {}
+    for label, keywords in keyword_groups.items():
+        count = sum(1 for keyword in keywords if keyword in text)
+        if count:
+            counts[label] = count
+    return counts
+
+
+TITLES = [
+    '', 'ABOUT US', 'About the Company', "CEO's Message", 'Message from the Chairman', 'Our Mission & Vision',
+    'History and Heritage', 'Products and Services', 'What We Do', 'Markets We Serve', 'Industries & Sectors',
+    'Global Presence', 'Where We Are', 'Leadership Team', 'Our People', 'Major Projects', 'Case Studies',
+    'Our Clients', 'Who We Serve', 'Clientele & Partners', 'Portfolio of Work', 'Certifications',
+    'Aboutness', 'Missionary', 'Networking event', 'Saas platform for retail stores', 'Teamwork',
+    'Café Ownership Story', 'customer-centric solutions', 'Board of Directors', 'Overview\tand Profile',
+    'Consulting Services', 'Professional services and advisory'
+]
+
+
+def random_titles(keyword_groups, count=500, seed=7):
+    rng = random.Random(seed)
+    keywords = [keyword for group in keyword_groups.values() for keyword in group]
+    filler = ['our', 'the', 'and', '&', 'of', 'global', 'x', 'a', '2024', '-', 'ltd']
+    titles = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 5)):
+            choice = rng.random()
+            if choice < 0.4:
+                parts.append(rng.choice(keywords))
+            elif choice < 0.7:
+                # Keyword fragments probe partial matches
+                keyword = rng.choice(keywords)
+                start = rng.randint(0, len(keyword) - 1)
+                parts.append(keyword[start:rng.randint(start + 1, len(keyword))])
+            else:
+                parts.append(rng.choice(filler))
+        title = rng.choice([' ', '', '-']).join(parts)
+        titles.append(''.join(c.upper() if rng.random() < 0.3 else c for c in title))
+    return titles
+
+
+@pytest.mark.parametrize('title', TITLES + random_titles(EnhancedCompanyParser.SECTION_KEYWORDS))
+def test_section_labels_match_substring_logic(title):
+    groups = EnhancedCompanyParser.SECTION_KEYWORDS
+    assert EnhancedCompanyParser.SECTION_MATCHER.labels(title) == substring_labels(groups, title)
+
+
+@pytest.mark.parametrize('text', TITLES + random_titles(EnhancedCompanyParser.INDUSTRY_KEYWORDS, seed=11))
+def test_industry_matcher_matches_substring_logic(text):
+    groups = EnhancedCompanyParser.INDUSTRY_KEYWORDS
+    assert EnhancedCompanyParser.INDUSTRY_MATCHER.labels(text) == substring_labels(groups, text)
+    assert EnhancedCompanyParser.INDUSTRY_MATCHER.keyword_counts(text) == substring_counts(groups, text)
+
+
+def test_nested_and_duplicate_keywords():
+    matcher = KeywordMatcher({'clients': ['client', 'our clients', 'Client'], 'work': ['work', 'our work']})
+    
+    assert matcher.keyword_groups == {'clients': ['client', 'our clients'], 'work': ['work', 'our work']}
+    assert matcher.labels('OUR CLIENTS') == {'clients'}
+    assert matcher.labels('Teamwork with clients') == {'clients', 'work'}
+    assert matcher.keyword_counts('our clients and our work') == {'clients': 2, 'work': 2}
+    assert matcher.labels('') == set()
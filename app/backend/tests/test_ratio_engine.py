@@ -0,0 +1,36 @@
+import pytest
+from utils.document_parser import DocumentParser
+
+
+# Term subtotals but no "Total liabilities" row; the listed items do not add up to the subtotals
+SUBTOTALS_ONLY_BALANCE_SHEET = """Balance Sheet
+Particulars 2024 2023
+Assets
+Current Assets
+Cash 600 500
+Total current assets 1,500 1,200
+Non-current Assets
+Equipment 2,000 1,800
+Total non-current assets 2,000 1,800
+Liabilities
+Current Liabilities
+Accounts payable 400 350
+Total current liabilities 1,000 900
+Non-current Liabilities
+Total non-current liabilities 700 600
+Equity
+Share capital 1,800 1,500
+Total equity 1,800 1,500
+"""
+
+
+def test_section_total_falls_back_to_term_subtotals():
+    ratios = DocumentParser.parse(SUBTOTALS_ONLY_BALANCE_SHEET).ratios
+    
+    assert ratios['values']['total_liabilities'] == [1500, 1700]
+    assert ratios['values']['total_assets'] == [3000, 3500]
+    latest = ratios['latest']
+    assert latest['current_liabilities'] == 1000
+    assert latest['long_term_liabilities'] == 700
+    assert latest['debt_to_equity'] == pytest.approx(1700 / 1800)
+    assert latest['equity_multiplier'] == pytest.approx(3500 / 1800)
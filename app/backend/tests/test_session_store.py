@@ -0,0 +1,78 @@
+import threading
+import time
+from services.session_store import PipelineCache, SessionStore, SQLiteKeyValueStore
+
+
+def test_concurrent_updates_from_separate_stores_keep_every_field(tmp_path):
+    db_path = str(tmp_path / 'sessions.sqlite3')
+    SessionStore(SQLiteKeyValueStore(db_path)).save('s1', {'documents': {}})
+    
+    # Each thread has its own store and backend, like separate worker processes
+    def worker(n):
+        store = SessionStore(SQLiteKeyValueStore(db_path))
+        for i in range(10):
+            store.update('s1', **{f'field_{n}_{i}': i})
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    state = SessionStore(SQLiteKeyValueStore(db_path)).get('s1')
+    assert all(f'field_{n}_{i}' in state for n in range(4) for i in range(10))
+
+
+def test_touching_a_session_extends_its_documents(tmp_path):
+    backend = SQLiteKeyValueStore(str(tmp_path / 'sessions.sqlite3'))
+    store = SessionStore(backend, ttl=1)
+    store.save_document('abc', 'Balance sheet text')
+    store.save('s1', {'documents': {'balance_sheet': 'abc', 'company_profile': None}})
+    
+    store.ttl = 60
+    time.sleep(0.5)
+    store.update('s1', ingested=True)
+    time.sleep(0.7)
+    
+    assert store.load_documents(store.get('s1'))[0] == 'Balance sheet text'
+
+
+def test_pipeline_builds_for_a_session_never_overlap():
+    cache = PipelineCache(max_size=1)
+    active = []
+    overlaps = []
+    guard = threading.Lock()
+    
+    def builder():
+        with guard:
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(len(active))
+        time.sleep(0.005)
+        with guard:
+            active.pop()
+        return object()
+    
+    def worker():
+        for _ in range(20):
+            cache.get_or_build('s1', builder)
+            # Evict s1 so that later callers have to build it again
+            cache.put('other', object())
+    
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert not overlaps
+
+
+def test_batched_reads_and_writes(tmp_path):
+    backend = SQLiteKeyValueStore(str(tmp_path / 'cache.sqlite3'))
+    backend.set_many({'a': 'first', 'b': b'second'}, ex=60)
+    backend.set('expired', 'old', ex=1)
+    
+    assert backend.mget(['b', 'missing', 'a']) == [b'second', None, b'first']
+    time.sleep(1.1)
+    assert backend.mget(['expired']) == [None]
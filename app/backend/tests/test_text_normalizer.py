@@ -0,0 +1,25 @@
+from utils.text_normalizer import PageTextNormalizer
+
+
+def make_pages(count):
+    return [
+        f"Acme Industries Annual Report 2024\nOperations review\nSection {n} body text about operations\n"
+        f"Outlook\nPage {n + 1} of {count}"
+        for n in range(count)
+    ]
+
+
+def test_stream_matches_normalize_pages_when_document_fits_the_sample():
+    pages = make_pages(12)
+    assert list(PageTextNormalizer.normalize_stream(iter(pages), sample_pages=20)) == \
+        PageTextNormalizer.normalize_pages(pages)
+
+
+def test_stream_strips_boilerplate_detected_on_the_sample_from_later_pages():
+    pages = make_pages(60)
+    normalized = list(PageTextNormalizer.normalize_stream(iter(pages), sample_pages=10))
+    
+    assert len(normalized) == 60
+    assert normalized[0].startswith('Acme Industries Annual Report 2024')
+    assert normalized[45] == 'Section 45 body text about operations'
+    assert sum('Annual Report' in page for page in normalized) == 1
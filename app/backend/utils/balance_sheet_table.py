@@ -0,0 +1,176 @@
+"""Columnar multi-period balance sheet table"""
+import re
+from typing import Dict, List, Any, Optional
+import numpy as np
+import pandas as pd
+
+
+class BalanceSheetTable:
+    """Typed table of balance sheet line items x periods with section and term labels per row"""
+    
+    SECTIONS = ('assets', 'liabilities', 'equity')
+    TERMS = ('current', 'non_current')
+    LABEL_COLUMNS = ('line_item', 'section', 'term')
+    
+    # "1,234.5", "$1,234", "(1,234)", "-1234", "₹ 12,34,567"
+    NUMBER_PATTERN = re.compile(
+        r'\(\s*[$€£₹]?\s*\d[\d,]*(?:\.\d+)?\s*\)'
+        r'|(?:-?[$€£₹]\s?|-)?\d[\d,]*(?:\.\d+)?'
+    )
+    YEAR_PATTERN = re.compile(r'^(?:FY\s*)?((?:19|20)\d{2})(?:\s*[-/]\s*\d{2,4})?$', re.IGNORECASE)
+    EMPTY_CELLS = {'', '-', '--', '—', '–', 'n/a', 'na', 'nil'}
+    TOTAL_PATTERN = re.compile(r'^(?:sub[\s-]?)?total\b', re.IGNORECASE)
+    
+    def __init__(self, frame: pd.DataFrame = None):
+        """
+        Initialize table
+        
+        Args:
+            frame: DataFrame with 'line_item', 'section' and 'term' columns followed by one float64 column per period
+        """
+        if frame is None:
+            frame = pd.DataFrame({column: pd.Series(dtype=object) for column in self.LABEL_COLUMNS})
+        self.frame = frame
+    
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], periods: List[str] = None) -> 'BalanceSheetTable':
+        """
+        Build a table from parsed rows
+        
+        Args:
+            rows: Dictionaries with 'line_item', 'section', optional 'term' ('current' or
+                'non_current') and 'values' (one float per period, NaN if missing)
+            periods: Period labels in column order (generated if missing or too short)
+        
+        Returns:
+            BalanceSheetTable instance
+        """
+        width = max([len(row['values']) for row in rows] + [len(periods or [])])
+        periods = cls._unique_periods(list(periods or []), width)
+        
+        values = np.full((len(rows), width), np.nan, dtype=np.float64)
+        for i, row in enumerate(rows):
+            values[i, :len(row['values'])] = row['values']
+        
+        frame = pd.DataFrame(values, columns=periods)
+        frame.insert(0, 'term', pd.Series([row.get('term') for row in rows], dtype=object))
+        frame.insert(0, 'section', pd.Series([row.get('section') for row in rows], dtype=object))
+        frame.insert(0, 'line_item', pd.Series([row['line_item'] for row in rows], dtype=object))
+        return cls(frame)
+    
+    @staticmethod
+    def _unique_periods(periods: List[str], width: int) -> List[str]:
+        labels = []
+        for i in range(width):
+            label = (periods[i].strip() if i < len(periods) and periods[i] else '') or f'Period {i + 1}'
+            while label in labels or label in BalanceSheetTable.LABEL_COLUMNS:
+                label = f'{label} ({i + 1})'
+            labels.append(label)
+        return labels
+    
+    @staticmethod
+    def parse_number(text: str) -> float:
+        """
+        Parse a single cell into a float
+        
+        Handles currency symbols, thousands separators and parenthesized negatives;
+        returns NaN for empty or non-numeric cells.
+        """
+        text = (text or '').strip()
+        if text.lower() in BalanceSheetTable.EMPTY_CELLS:
+            return np.nan
+        match = BalanceSheetTable.NUMBER_PATTERN.fullmatch(text)
+        return BalanceSheetTable._to_float(match.group(0)) if match else np.nan
+    
+    @staticmethod
+    def find_numbers(text: str) -> List[float]:
+        """Return every number in free text, in order"""
+        return [BalanceSheetTable._to_float(match) for match in BalanceSheetTable.NUMBER_PATTERN.findall(text or '')]
+    
+    @staticmethod
+    def _to_float(token: str) -> float:
+        negative = token.startswith('(') or token.startswith('-')
+        digits = re.sub(r'[^\d.]', '', token)
+        try:
+            value = float(digits)
+        except ValueError:
+            return np.nan
+        return -value if negative else value
+    
+    @property
+    def periods(self) -> List[str]:
+        """Period labels in column order"""
+        return [column for column in self.frame.columns if column not in self.LABEL_COLUMNS]
+    
+    @property
+    def values(self) -> np.ndarray:
+        """float64 matrix of line items x periods"""
+        return self.frame[self.periods].to_numpy(dtype=np.float64)
+    
+    @property
+    def current_period(self) -> Optional[str]:
+        """Most recent period (latest year if the labels are years, else the first column)"""
+        periods = self.periods
+        if not periods:
+            return None
+        years = [self.YEAR_PATTERN.match(period) for period in periods]
+        if all(years):
+            return periods[int(np.argmax([int(match.group(1)) for match in years]))]
+        return periods[0]
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    def section_values(self, section: str, period: str = None) -> Dict[str, float]:
+        """
+        Return {line item: value} for one section and period (missing values skipped)
+        
+        Args:
+            section: 'assets', 'liabilities' or 'equity'
+            period: Period label (defaults to current_period)
+        """
+        period = period or self.current_period
+        if period is None:
+            return {}
+        rows = self.frame[(self.frame['section'] == section) & self.frame[period].notna()]
+        return dict(zip(rows['line_item'], rows[period].astype(float)))
+    
+    def to_balance_data(self, period: str = None) -> Dict[str, Any]:
+        """
+        Return section values for one period in the balance_data shape used by metrics and slides
+        
+        Args:
+            period: Period label (defaults to current_period)
+        """
+        period = period or self.current_period
+        data = {section: self.section_values(section, period) for section in self.SECTIONS}
+        data['period'] = period
+        data['periods'] = self.periods
+        return data
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for storage on the session (NaN becomes None)"""
+        values = self.values
+        return {
+            'periods': self.periods,
+            'rows': [
+                {
+                    'line_item': line_item,
+                    'section': section,
+                    'term': term,
+                    'values': [None if np.isnan(value) else float(value) for value in values[i]]
+                }
+                for i, (line_item, section, term) in enumerate(
+                    zip(self.frame['line_item'], self.frame['section'], self.frame['term'])
+                )
+            ]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BalanceSheetTable':
+        """Rebuild a table stored with to_dict()"""
+        rows = [
+            {**row, 'values': [np.nan if value is None else value for value in row['values']]}
+            for row in data.get('rows', [])
+        ]
+        return cls.from_rows(rows, data.get('periods'))
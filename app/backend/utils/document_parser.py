@@ -0,0 +1,474 @@
+"""Single-pass parser building the shared document model for an upload"""
+import csv
+import re
+from typing import Dict, List, Any, Optional, Callable, Tuple
+import numpy as np
+from utils.balance_sheet_table import BalanceSheetTable
+from utils.financial_parser import FinancialDataParser
+from utils.ratio_engine import RatioEngine
+
+
+class ParsedDocument:
+    """Everything parsed from one upload: line items, sections, numbers and company data"""
+    
+    def __init__(self, line_items: List[Dict[str, Any]] = None, balance_data: Dict = None,
+                 metrics: Dict = None, company_data: Dict = None,
+                 company_sections: List[Dict[str, Any]] = None,
+                 table: BalanceSheetTable = None, ratios: Dict[str, Any] = None):
+        """
+        Initialize parsed document
+        
+        Args:
+            line_items: Balance sheet entries with 'title', 'content' and 'section'
+            balance_data: Current-period values by section ('assets', 'liabilities', 'equity')
+                plus 'period', 'periods' and 'raw_sections'
+            metrics: Financial metrics derived from balance_data
+            company_data: Company profile fields extracted from the brochure
+            company_sections: Indexable company sections with 'title', 'content' and 'category'
+            table: Line items x periods numeric table
+            ratios: RatioEngine report over every period (computed from table if missing)
+        """
+        self.line_items = line_items or []
+        self.balance_data = balance_data or {'assets': {}, 'liabilities': {}, 'equity': {}, 'raw_sections': []}
+        self.metrics = metrics or {}
+        self.company_data = company_data or {}
+        self.company_sections = company_sections or []
+        self.table = table if table is not None else BalanceSheetTable()
+        self.ratios = ratios if ratios is not None else RatioEngine.compute(self.table)
+    
+    def legacy_entries(self) -> List[Dict[str, Any]]:
+        """Return line items and company sections in the legacy processor's entry format"""
+        entries = [{'title': item['title'], 'content': item['content']} for item in self.line_items]
+        entries.extend(
+            {'title': section['title'], 'content': [section['content']]}
+            for section in self.company_sections
+        )
+        return entries
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for storage on the session"""
+        return {
+            'line_items': self.line_items,
+            'balance_data': self.balance_data,
+            'metrics': self.metrics,
+            'company_data': self.company_data,
+            'company_sections': self.company_sections,
+            'table': self.table.to_dict(),
+            'ratios': self.ratios
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ParsedDocument':
+        """Rebuild a parsed document stored with to_dict()"""
+        data = dict(data)
+        data['table'] = BalanceSheetTable.from_dict(data.get('table') or {})
+        return cls(**data)
+
+
+class DocumentParser:
+    """Parse balance sheet and company profile text into a ParsedDocument"""
+    
+    # Section markers checked in order (first match wins). Capital only marks equity in
+    # share capital forms: "Capital work in progress" and "Working capital" are not equity
+    SECTION_MARKERS = [
+        ('assets', re.compile(r'asset', re.IGNORECASE)),
+        ('liabilities', re.compile(r'liabilit', re.IGNORECASE)),
+        ('equity', re.compile(
+            r"equity|^(?:total\s+)?(?:share|issued|paid[\s-]*up|subscribed|called[\s-]*up|owners'?|partners'?)\s+capital\b"
+            r"|^capital(?:\s+(?:and|&)\s+reserves|\s+stock)?\s*:?$",
+            re.IGNORECASE
+        ))
+    ]
+    # Rows with values that still open a section: totals and subtotals named after one ("Current liabilities 500")
+    SECTION_ROW_PATTERN = re.compile(
+        r"^(?:(?:sub[\s-]?)?total\b|(?:(?:non[\s-]?current|current|long[\s-]term|short[\s-]term)\s+)?"
+        r"(?:assets|liabilities)\s*$|(?:(?:shareholders|stockholders|owners)'?\s+)?equity\s*$)",
+        re.IGNORECASE
+    )
+    
+    # Short lines containing these words (and no values) are headers, not entries
+    # Current/non-current markers checked in order ("non-current" contains "current",
+    # "current portion of long-term debt" is current)
+    TERM_MARKERS = [
+        ('non_current', ('non-current', 'non current', 'noncurrent')),
+        ('current', ('current',)),
+        ('non_current', ('long-term', 'long term', 'fixed asset'))
+    ]
+    
+    HEADER_KEYWORDS = ['assets', 'liabilities', 'equity', 'current',
+                       'non-current', 'long-term', 'short-term',
+                       'revenue', 'expenses', 'income', 'total']
+    
+    VALUE_START = re.compile(r'[\s:\-–]+(?=[(\-]?[$€£₹]?\s?\d)')
+    YEAR_TOKEN = re.compile(r'\b(?:FY\s*)?(?:19|20)\d{2}\b', re.IGNORECASE)
+    ENTRY_PATTERN = re.compile(r'^([A-Za-z\s&\-\(\)]+?)[\:\-\s]+(.+)$')
+    THOUSANDS_GROUP = re.compile(r'\d{3}(\.\d+)?')
+    
+    @staticmethod
+    def parse(balance_sheet_text: str, company_profile_text: str = None, llm_service=None,
+              progress_callback: Optional[Callable[[str], None]] = None) -> ParsedDocument:
+        """
+        Parse an upload into a ParsedDocument
+        
+        Args:
+            balance_sheet_text: Raw balance sheet content
+            company_profile_text: Raw company profile content (optional)
+            llm_service: Optional LLM service for company profile extraction
+            progress_callback: Optional callable notified with 'parsing' and 'profile_extraction'
+        
+        Returns:
+            ParsedDocument instance
+        """
+        if progress_callback:
+            progress_callback('parsing')
+        line_items, balance_data, table = DocumentParser.parse_balance_sheet(balance_sheet_text or '')
+        ratios = RatioEngine.compute(table)
+        
+        company_data, company_sections = {}, []
+        if company_profile_text:
+            if progress_callback:
+                progress_callback('profile_extraction')
+            company_data, company_sections = DocumentParser.parse_company_profile(company_profile_text, llm_service)
+        
+        return ParsedDocument(
+            line_items=line_items,
+            balance_data=balance_data,
+            # Table-backed metrics use explicit totals and current/non-current terms
+            metrics=(RatioEngine.to_metrics(ratios) if len(table)
+                     else FinancialDataParser.extract_financial_metrics(balance_data)),
+            company_data=company_data,
+            company_sections=company_sections,
+            table=table,
+            ratios=ratios
+        )
+    
+    @staticmethod
+    def reparse(previous: ParsedDocument, balance_sheet_text: str = None, company_profile_text: str = None,
+                llm_service=None, progress_callback: Optional[Callable[[str], None]] = None) -> ParsedDocument:
+        """
+        Parse only the changed documents of an upload, keeping the rest of an earlier parse
+        
+        Args:
+            previous: ParsedDocument of the earlier version
+            balance_sheet_text: New balance sheet content (None if unchanged)
+            company_profile_text: New company profile content (None if unchanged)
+            llm_service: Optional LLM service for company profile extraction
+            progress_callback: Optional callable notified with 'parsing' and 'profile_extraction'
+        
+        Returns:
+            ParsedDocument instance
+        """
+        if progress_callback:
+            progress_callback('parsing')
+        if balance_sheet_text is None:
+            document = ParsedDocument(
+                line_items=previous.line_items, balance_data=previous.balance_data,
+                metrics=previous.metrics, table=previous.table, ratios=previous.ratios
+            )
+        else:
+            document = DocumentParser.parse(balance_sheet_text)
+        
+        if company_profile_text is None:
+            document.company_data = previous.company_data
+            document.company_sections = previous.company_sections
+        else:
+            # Unchanged brochure sections are answered from the extraction cache
+            if progress_callback:
+                progress_callback('profile_extraction')
+            document.company_data, document.company_sections = DocumentParser.parse_company_profile(
+                company_profile_text, llm_service
+            )
+        return document
+    
+    @staticmethod
+    def parse_balance_sheet(text: str) -> Tuple[List[Dict[str, Any]], Dict, BalanceSheetTable]:
+        """
+        Parse balance sheet text/CSV/TSV into line items, section values and the numeric table in one pass
+        
+        Args:
+            text: Raw balance sheet content
+        
+        Returns:
+            Tuple of (line_items, balance_data, table); balance_data holds the current period
+        """
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        delimiter = DocumentParser._detect_delimiter(lines)
+        
+        line_items = []
+        rows = []
+        raw_sections = []
+        periods = []
+        current_section = None
+        current_term = None
+        headers = None
+        
+        for line in lines:
+            item = None
+            period_header = False
+            if delimiter:
+                cells = next(csv.reader([line], delimiter=delimiter))
+                if headers is None:
+                    # First row contains dates/headers
+                    headers = cells
+                    periods = headers[1:]
+                    period_header = True
+                else:
+                    item = DocumentParser._parse_table_row(cells, headers)
+            else:
+                header_periods = DocumentParser._text_period_header(line)
+                if header_periods:
+                    periods = header_periods
+                    period_header = True
+                else:
+                    item = DocumentParser._parse_text_line(line)
+            
+            has_values = bool(item) and any(not np.isnan(value) for value in item['values'])
+            label = item['title'] if has_values else line
+            
+            # Track the balance sheet section this line belongs to: headers and totals switch it,
+            # other line items ("Deferred tax assets" under liabilities) only start the first one
+            section = DocumentParser._detect_section(label)
+            if section and has_values and current_section and not DocumentParser.SECTION_ROW_PATTERN.match(label):
+                section = None
+            if section:
+                if section != current_section:
+                    current_term = None
+                current_section = section
+                raw_sections.append({'type': section, 'title': line, 'content': []})
+            elif current_section and raw_sections:
+                raw_sections[-1]['content'].append(line)
+            
+            if period_header:
+                continue
+            
+            # "Current Assets" / "Non-current liabilities" headers set the term of the rows below
+            term = DocumentParser._detect_term(label.lower())
+            if not has_values and term:
+                current_term = term
+            
+            if not item:
+                continue
+            
+            values = item.pop('values')
+            item['section'] = current_section
+            line_items.append(item)
+            
+            # Rows without any number (labels, headers) stay out of the numeric table
+            if has_values:
+                # Totals only carry their own term ("Total assets" under "Non-current assets" is not non-current)
+                if not BalanceSheetTable.TOTAL_PATTERN.match(label):
+                    term = term or current_term
+                rows.append({'line_item': item['title'], 'section': current_section, 'term': term, 'values': values})
+        
+        # If no entries found, create one with all data
+        if not line_items:
+            line_items.append({
+                'title': 'Balance Sheet Data',
+                'content': lines,
+                'section': None
+            })
+        
+        table = BalanceSheetTable.from_rows(rows, periods)
+        balance_data = table.to_balance_data()
+        balance_data['raw_sections'] = raw_sections
+        return line_items, balance_data, table
+    
+    @staticmethod
+    def _detect_section(label: str) -> Optional[str]:
+        for section, pattern in DocumentParser.SECTION_MARKERS:
+            if pattern.search(label.strip()):
+                return section
+        return None
+    
+    @staticmethod
+    def _detect_term(label_lower: str) -> Optional[str]:
+        for term, markers in DocumentParser.TERM_MARKERS:
+            if any(marker in label_lower for marker in markers):
+                return term
+        return None
+    
+    @staticmethod
+    def _detect_delimiter(lines: List[str]) -> Optional[str]:
+        """Return ',' or '\\t' if the lines form a delimited table, None for free text"""
+        sample = lines[:50]
+        if len(sample) < 2:
+            return None
+        
+        for delimiter in ('\t', ','):
+            tabular = 0
+            for line in sample:
+                cells = next(csv.reader([line], delimiter=delimiter))
+                if len(cells) < 2:
+                    continue
+                # "Cash: $1,000" splits on its thousands separator - that is not a column
+                if delimiter == ',' and cells[0][-1:].isdigit() and DocumentParser.THOUSANDS_GROUP.fullmatch(cells[1].strip()):
+                    continue
+                tabular += 1
+            if tabular >= 0.6 * len(sample):
+                return delimiter
+        return None
+    
+    @staticmethod
+    def _text_period_header(line: str) -> List[str]:
+        """Return the period labels of a free-text header line such as 'Particulars 2024 2023'"""
+        years = DocumentParser.YEAR_TOKEN.findall(line)
+        if not years:
+            return []
+        rest = DocumentParser.YEAR_TOKEN.sub('', line)
+        if re.search(r'\d', rest) or ':' in rest or (len(years) < 2 and len(rest.strip()) > 30):
+            return []
+        return [year.strip() for year in years]
+    
+    @staticmethod
+    def _parse_table_row(cells: List[str], headers: List[str]) -> Optional[Dict[str, Any]]:
+        """Parse one row of a delimited table into a line item"""
+        entry_name = cells[0].strip() if cells else ''
+        if not entry_name:
+            return None
+        
+        # Format: "Entry Name: Header1=Value1, Header2=Value2, ..."
+        entry_data = []
+        for i, value in enumerate(cells[1:], start=1):
+            if i < len(headers):
+                entry_data.append(f"{headers[i].strip()}={value}")
+        
+        return {
+            'title': entry_name,
+            'content': [f"{entry_name}: {', '.join(entry_data)}"],
+            # One value per column so that periods stay aligned
+            'values': [BalanceSheetTable.parse_number(cell) for cell in cells[1:]]
+        }
+    
+    @staticmethod
+    def _parse_text_line(line: str) -> Optional[Dict[str, Any]]:
+        """Parse one free-text line into a line item (None for section headers)"""
+        line_lower = line.lower()
+        match = DocumentParser.ENTRY_PATTERN.match(line)
+        value_start = DocumentParser.VALUE_START.search(line)
+        
+        # "Current Assets" is a header, "Total Current Assets 2,500 2,100" is a value row
+        has_value = (bool(value_start) and bool(re.search(r'[A-Za-z]', line[:value_start.start()])) and
+                     bool(BalanceSheetTable.find_numbers(line[value_start.end():])))
+        is_section_header = (not has_value and len(line) < 50 and
+                             any(keyword in line_lower for keyword in DocumentParser.HEADER_KEYWORDS) and
+                             ':' not in line and '-' not in line[1:])
+        
+        if is_section_header:
+            return None
+        
+        if ':' in line and line.split(':', 1)[0].strip():
+            # "Accounts payable: $700" - the label is everything before the colon
+            entry_name, entry_values = line.split(':', 1)
+            entry_name = entry_name.strip()
+            entry_values = entry_values.strip()
+        elif value_start and re.search(r'[A-Za-z]', line[:value_start.start()]):
+            # "Accounts payable - 700" / "Cash 1,000 900" - the label ends where the numbers start
+            entry_name = line[:value_start.start()].strip()
+            entry_values = line[value_start.end():].strip()
+        elif match:
+            entry_name = match.group(1).strip()
+            entry_values = match.group(2).strip()
+        else:
+            parts = re.split(r'[\:\-\t]+', line, 1)
+            if len(parts) == 2:
+                entry_name = parts[0].strip()
+                entry_values = parts[1].strip()
+            else:
+                # Last resort: use the line as both title and content
+                return {
+                    'title': line[:50],
+                    'content': [line],
+                    'values': BalanceSheetTable.find_numbers(line)
+                }
+        
+        return {
+            'title': entry_name,
+            'content': [f"{entry_name}: {entry_values}"],
+            'values': BalanceSheetTable.find_numbers(entry_values)
+        }
+    
+    @staticmethod
+    def parse_company_profile(text: str, llm_service=None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Extract company data and indexable sections from a company profile/brochure
+        
+        Args:
+            text: Raw company profile content
+            llm_service: Optional LLM service for intelligent extraction
+        
+        Returns:
+            Tuple of (company_data, sections)
+        """
+        from utils.enhanced_company_parser import EnhancedCompanyParser
+        
+        company_data = EnhancedCompanyParser.parse_brochure(text, llm_service)
+        return company_data, DocumentParser.build_company_sections(company_data)
+    
+    @staticmethod
+    def build_company_sections(company_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Create indexable sections for RAG from parsed company data
+        
+        Args:
+            company_data: Company data from EnhancedCompanyParser
+        
+        Returns:
+            List of sections with 'title', 'content' and 'category'
+        """
+        sections = []
+        
+        # (field, title, category, is_list) in index order
+        fields = [
+            ('about_us', 'About Us', 'overview', False),
+            ('ceo_message', "CEO's Message", 'leadership', False),
+            ('history', 'Company History', 'background', False),
+            ('mission', 'Mission Statement', 'values', False),
+            ('vision', 'Vision Statement', 'values', False),
+            ('values', 'Core Values', 'values', True),
+            ('products_services', 'Products & Services', 'offerings', True),
+            ('product_categories', 'Product Categories', 'offerings', True),
+            ('markets', 'Markets & Industries', 'markets', True),
+            ('locations', 'Locations & Presence', 'operations', True),
+            ('manufacturing', 'Manufacturing Capabilities', 'operations', False),
+            ('certifications', 'Certifications & Standards', 'credentials', True),
+            ('major_projects', 'Major Projects', 'achievements', True)
+        ]
+        for field, title, category, is_list in fields:
+            value = company_data.get(field)
+            if value:
+                sections.append({
+                    'title': title,
+                    'content': '\n'.join(value) if is_list else value,
+                    'category': category
+                })
+        
+        # Clients & Partners - combine list and text
+        clients_content = []
+        if company_data.get('clients_text'):
+            clients_content.append(company_data['clients_text'])
+        if company_data.get('clients'):
+            clients_content.append('\n'.join([f"• {client}" for client in company_data['clients']]))
+        
+        if clients_content:
+            sections.append({
+                'title': 'Clients & Partners',
+                'content': '\n\n'.join(clients_content),
+                'category': 'relationships'
+            })
+        
+        # Competitive Advantages
+        if company_data.get('usps'):
+            sections.append({
+                'title': 'Unique Selling Points',
+                'content': '\n'.join(company_data['usps']),
+                'category': 'advantages'
+            })
+        
+        if company_data.get('leadership'):
+            sections.append({
+                'title': 'Leadership Team',
+                'content': '\n'.join(company_data['leadership']),
+                'category': 'leadership'
+            })
+        
+        return sections
@@ -1,11 +1,47 @@
 """Enhanced Company Profile Parser to extract all sections from brochure"""
 import re
 from typing import Dict, List, Any
+from utils.keyword_matcher import KeywordMatcher
 
 
 class EnhancedCompanyParser:
     """Parse comprehensive company profile/brochure with all sections"""
     
+    # Section title keywords per company data field - be flexible with matching
+    SECTION_KEYWORDS = {
+        'about_us': ['about', 'overview', 'introduction', 'profile', 'who we are'],
+        'ceo_message': ['message', 'ceo', 'chairman', 'president', 'director', 'founder'],
+        'mission': ['mission'],
+        'vision': ['vision'],
+        'history': ['history', 'heritage', 'background', 'story', 'journey'],
+        'products_services': ['product', 'service', 'offering', 'solution', 'what we do', 'our work'],
+        'markets': ['market', 'industry', 'sector', 'serve'],
+        'locations': ['location', 'office', 'presence', 'branch', 'where we are'],
+        'leadership': ['team', 'leadership', 'management', 'people', 'executive'],
+        'major_projects': ['project', 'work', 'portfolio', 'experience', 'case'],
+        'clients': ['client', 'customer', 'partner', 'who we serve', 'our clients', 'clientele']
+    }
+    SECTION_MATCHER = KeywordMatcher(SECTION_KEYWORDS)
+    
+    # Industry keyword mapping
+    INDUSTRY_KEYWORDS = {
+        'Technology': ['software', 'tech', 'ai', 'digital', 'cloud', 'saas', 'platform'],
+        'Manufacturing': ['manufacturing', 'production', 'factory', 'assembly', 'industrial'],
+        'Healthcare': ['healthcare', 'medical', 'hospital', 'pharma', 'clinic', 'health'],
+        'Finance': ['financial', 'banking', 'investment', 'insurance', 'fintech'],
+        'Retail': ['retail', 'store', 'shop', 'ecommerce', 'merchandise'],
+        'Construction': ['construction', 'building', 'infrastructure', 'contractor'],
+        'Energy': ['energy', 'power', 'oil', 'gas', 'renewable', 'solar', 'utility'],
+        'Automotive': ['automotive', 'vehicle', 'car', 'automobile', 'motor'],
+        'Telecommunications': ['telecom', 'network', 'connectivity', 'wireless'],
+        'Education': ['education', 'learning', 'training', 'school', 'university'],
+        'Consulting': ['consulting', 'advisory', 'consulting services', 'professional services']
+    }
+    INDUSTRY_MATCHER = KeywordMatcher(INDUSTRY_KEYWORDS)
+    
+    # Narrative fields that collect their distinct text from every part of the brochure
+    LLM_TEXT_FIELDS = ('about_us', 'ceo_message', 'history', 'manufacturing', 'clients_text', 'corporate_structure')
+    
     @staticmethod
     def parse_brochure(text: str, llm_service=None) -> Dict[str, Any]:
         """
@@ -50,6 +86,7 @@ class EnhancedCompanyParser:
         # Use LLM for intelligent extraction if available (PRIMARY METHOD)
         if llm_service and text:
             try:
+                # Every section is read; results are cached by content hash
                 enhanced_data = EnhancedCompanyParser._extract_with_llm(text, llm_service)
                 # Use LLM-extracted data as primary source
                 for key, value in enhanced_data.items():
@@ -65,61 +102,27 @@ class EnhancedCompanyParser:
             data['raw_sections'] = sections
             
             # Try to intelligently map sections
+            if not data['company_name']:
+                data['company_name'] = EnhancedCompanyParser._extract_company_name(text)
+            
             for section in sections:
-                title = section.get('title', '').lower()
                 content = section.get('content', '')
+                # One pass over the title finds every matching section kind
+                kinds = EnhancedCompanyParser.SECTION_MATCHER.labels(section.get('title', ''))
                 
-                # Be flexible with matching - use multiple keywords
-                if not data['company_name']:
-                    data['company_name'] = EnhancedCompanyParser._extract_company_name(text)
-                
-                if not data['about_us'] and any(kw in title for kw in ['about', 'overview', 'introduction', 'profile', 'who we are']):
-                    data['about_us'] = content
-                
-                if not data['ceo_message'] and any(kw in title for kw in ['message', 'ceo', 'chairman', 'president', 'director', 'founder']):
-                    data['ceo_message'] = content
-                
-                if not data['mission'] and 'mission' in title:
-                    data['mission'] = content
-                
-                if not data['vision'] and 'vision' in title:
-                    data['vision'] = content
-                
-                if not data['history'] and any(kw in title for kw in ['history', 'heritage', 'background', 'story', 'journey']):
-                    data['history'] = content
-                
-                if any(kw in title for kw in ['product', 'service', 'offering', 'solution', 'what we do', 'our work']):
-                    items = EnhancedCompanyParser._extract_list_items(content)
-                    if items:
-                        data['products_services'].extend(items)
-                
-                if any(kw in title for kw in ['market', 'industry', 'sector', 'serve']):
-                    items = EnhancedCompanyParser._extract_list_items(content)
-                    if items:
-                        data['markets'].extend(items)
+                for field in ('about_us', 'ceo_message', 'mission', 'vision', 'history'):
+                    if not data[field] and field in kinds:
+                        data[field] = content
                 
-                if any(kw in title for kw in ['location', 'office', 'presence', 'branch', 'where we are']):
-                    items = EnhancedCompanyParser._extract_list_items(content)
-                    if items:
-                        data['locations'].extend(items)
+                for field in ('products_services', 'markets', 'locations', 'leadership', 'major_projects', 'clients'):
+                    if field in kinds:
+                        items = EnhancedCompanyParser._extract_list_items(content)
+                        if items:
+                            data[field].extend(items)
                 
-                if any(kw in title for kw in ['team', 'leadership', 'management', 'people', 'executive']):
-                    items = EnhancedCompanyParser._extract_list_items(content)
-                    if items:
-                        data['leadership'].extend(items)
-                
-                if any(kw in title for kw in ['project', 'work', 'portfolio', 'experience', 'case']):
-                    items = EnhancedCompanyParser._extract_list_items(content)
-                    if items:
-                        data['major_projects'].extend(items)
-                
-                if any(kw in title for kw in ['client', 'customer', 'partner', 'who we serve', 'our clients', 'clientele']):
-                    items = EnhancedCompanyParser._extract_list_items(content)
-                    if items:
-                        data['clients'].extend(items)
-                    # Also store full text if it's substantial
-                    if len(content) > 50 and not data.get('clients_text'):
-                        data['clients_text'] = content
+                # Also store full client text if it's substantial
+                if 'clients' in kinds and len(content) > 50 and not data.get('clients_text'):
+                    data['clients_text'] = content
         
         # Extract founding year if not found
         if not data.get('founded'):
@@ -148,7 +151,8 @@ class EnhancedCompanyParser:
         Uses heuristics to detect headers without assuming specific keywords
         """
         sections = []
-        current_section = {'title': 'Introduction', 'content': ''}
+        current_title = 'Introduction'
+        current_lines = []
         
         lines = [line.strip() for line in text.split('\n') if line.strip()]
         
@@ -175,17 +179,18 @@ class EnhancedCompanyParser:
             
             if is_likely_header:
                 # Save previous section if it has content
-                if current_section['content'].strip():
-                    sections.append(current_section)
+                if current_lines:
+                    sections.append({'title': current_title, 'content': '\n'.join(current_lines) + '\n'})
                 # Start new section
-                current_section = {'title': line, 'content': ''}
+                current_title = line
+                current_lines = []
             else:
-                # Add to current section content
-                current_section['content'] += line + '\n'
+                # Collect content lines (joined once per section, not re-concatenated per line)
+                current_lines.append(line)
         
         # Add last section
-        if current_section['content'].strip():
-            sections.append(current_section)
+        if current_lines:
+            sections.append({'title': current_title, 'content': '\n'.join(current_lines) + '\n'})
         
         return sections
     
@@ -236,23 +241,34 @@ class EnhancedCompanyParser:
         """
         Use LLM to intelligently extract company information from ANY format
         This is the PRIMARY method - it understands context and structure dynamically
+        
+        The whole brochure is read: its sections are extracted concurrently and the
+        results merged in document order (see MapReduceExtractor).
         """
-        import json
+        from services.map_reduce_extractor import MapReduceExtractor
         
-        # Use first 8000 chars for better coverage (clients might be later in doc)
-        text_sample = text[:8000] if len(text) > 8000 else text
+        return MapReduceExtractor(
+            'company_profile_sections',
+            lambda chunk: EnhancedCompanyParser._extract_chunk_with_llm(chunk, llm_service),
+            text_fields=EnhancedCompanyParser.LLM_TEXT_FIELDS
+        ).extract(text)
+    
+    @staticmethod
+    def _extract_chunk_with_llm(chunk: str, llm_service) -> Dict:
+        """Extract the company information present in one part of a brochure ({} on failure)"""
+        import json
         
-        prompt = f"""You are an intelligent document analyzer. Extract ALL relevant company information from this document.
+        prompt = f"""You are an intelligent document analyzer. Extract ALL relevant company information from this part of a document.
 
 IMPORTANT: 
-- Extract WHATEVER information is actually present in the document
+- Extract WHATEVER information is actually present in this part
 - Don't assume specific sections exist
 - Be flexible with what you find
-- If a field is not present, use empty string or empty array
+- Omit fields that are not present in this part (other parts are extracted separately)
 - Extract the ACTUAL content, don't make up information
 
-Document Text:
-{text_sample}
+Document Part:
+{chunk}
 
 Return a JSON object with these fields (only include what you actually find):
 {{
@@ -296,7 +312,7 @@ Remember: Extract what's ACTUALLY there, not what you think should be there."""
                     }
                 ],
                 temperature=0.1,  # Lower temperature for accuracy
-                max_tokens=2000  # More tokens for comprehensive extraction
+                max_tokens=Config.EXTRACTION_CHUNK_MAX_TOKENS  # One part at a time keeps outputs small
             )
             
             content = response.choices[0].message.content.strip()
@@ -311,29 +327,8 @@ Remember: Extract what's ACTUALLY there, not what you think should be there."""
     @staticmethod
     def _infer_industry(text: str) -> str:
         """Infer industry from text content using keywords"""
-        text_lower = text.lower()
-        
-        # Industry keyword mapping
-        industries = {
-            'Technology': ['software', 'tech', 'ai', 'digital', 'cloud', 'saas', 'platform'],
-            'Manufacturing': ['manufacturing', 'production', 'factory', 'assembly', 'industrial'],
-            'Healthcare': ['healthcare', 'medical', 'hospital', 'pharma', 'clinic', 'health'],
-            'Finance': ['financial', 'banking', 'investment', 'insurance', 'fintech'],
-            'Retail': ['retail', 'store', 'shop', 'ecommerce', 'merchandise'],
-            'Construction': ['construction', 'building', 'infrastructure', 'contractor'],
-            'Energy': ['energy', 'power', 'oil', 'gas', 'renewable', 'solar', 'utility'],
-            'Automotive': ['automotive', 'vehicle', 'car', 'automobile', 'motor'],
-            'Telecommunications': ['telecom', 'network', 'connectivity', 'wireless'],
-            'Education': ['education', 'learning', 'training', 'school', 'university'],
-            'Consulting': ['consulting', 'advisory', 'consulting services', 'professional services']
-        }
-        
-        # Count matches for each industry
-        matches = {}
-        for industry, keywords in industries.items():
-            count = sum(1 for kw in keywords if kw in text_lower)
-            if count > 0:
-                matches[industry] = count
+        # Count distinct keyword matches for each industry in one pass
+        matches = EnhancedCompanyParser.INDUSTRY_MATCHER.keyword_counts(text)
         
         # Return industry with most matches
         if matches:
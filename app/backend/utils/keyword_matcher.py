@@ -0,0 +1,56 @@
+"""Compiled keyword table shared by the company profile parsers"""
+from typing import Dict, List, Set
+
+
+class KeywordMatcher:
+    """
+    Classify text by groups of keywords with substring matching (as `keyword in text`)
+    
+    The keyword table is compiled once: keywords are lowercased and de-duplicated,
+    and a keyword that contains a shorter keyword of the same group is dropped for
+    group tests, since it can only match where the shorter one does. Each lookup
+    lowercases the text once and stops testing a group at its first hit.
+    
+    CPython's substring search outperforms a single alternation regex over the
+    whole keyword set at these table sizes (tens of keywords), so the scan is a
+    short loop of C-level searches rather than a regex automaton.
+    """
+    
+    def __init__(self, keyword_groups: Dict[str, List[str]]):
+        """
+        Initialize matcher
+        
+        Args:
+            keyword_groups: Mapping of group label to its keywords
+        """
+        self.keyword_groups = {
+            label: list(dict.fromkeys(keyword.lower() for keyword in keywords))
+            for label, keywords in keyword_groups.items()
+        }
+        # Shortest distinguishing keywords per group, shortest first
+        self._group_keywords = [
+            (label, sorted(
+                (keyword for keyword in keywords
+                 if not any(other != keyword and other in keyword for other in keywords)),
+                key=len
+            ))
+            for label, keywords in self.keyword_groups.items()
+        ]
+    
+    def labels(self, text: str) -> Set[str]:
+        """Return the labels of all groups with at least one keyword in text"""
+        text = text.lower()
+        return {
+            label for label, keywords in self._group_keywords
+            if any(keyword in text for keyword in keywords)
+        }
+    
+    def keyword_counts(self, text: str) -> Dict[str, int]:
+        """Return the number of distinct keywords found per group (groups without matches omitted)"""
+        text = text.lower()
+        counts = {}
+        for label, keywords in self.keyword_groups.items():
+            count = sum(1 for keyword in keywords if keyword in text)
+            if count:
+                counts[label] = count
+        return counts
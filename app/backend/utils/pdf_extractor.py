@@ -1,43 +1,138 @@
 import PyPDF2
 import io
-from typing import Optional
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Iterator, List
+from config import Config
+from utils.text_normalizer import PageTextNormalizer
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Return the process-wide PDF extraction pool (created on first use)
+    
+    Workers are started with forkserver (spawn where unavailable) rather than
+    fork, which is unsafe from a multi-threaded server process.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.PDF_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            )
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Drop a broken pool so that the next extraction starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """Extract text for pages [start, end) - runs in a worker process"""
+    reader = PyPDF2.PdfReader(pdf_path)
+    return [reader.pages[i].extract_text() or '' for i in range(start, end)]
+
 
 class PDFExtractor:
     """Extract text content from PDF files"""
     
     @staticmethod
-    def extract_text(pdf_file) -> str:
+    def extract_text(pdf_file, workers: Optional[int] = None) -> str:
         """
         Extract text from a PDF file
         
+        Large PDFs are extracted page-parallel (see iter_page_texts) and the pages
+        joined into one string: uploads are stored and parsed as whole documents.
+        Running headers, footers, page numbers and repeated disclaimers are removed,
+        words hyphenated across line breaks are joined and whitespace is collapsed
+        (see PageTextNormalizer).
+        
         Args:
             pdf_file: File-like object (Flask file upload or BytesIO)
-            
+            workers: Worker processes for large PDFs (defaults to Config.PDF_EXTRACTION_WORKERS)
+        
         Returns:
             Extracted text content as string
         """
+        # Pages are normalized as they are extracted (boilerplate is detected on the leading pages)
+        pages = PageTextNormalizer.normalize_stream(PDFExtractor.iter_page_texts(pdf_file, workers))
+        full_text = '\n\n'.join(text for text in pages if text)
+        
+        if not full_text.strip():
+            raise ValueError("No text content found in PDF. The PDF might be image-based or encrypted.")
+        
+        return full_text
+    
+    @staticmethod
+    def iter_page_texts(pdf_file, workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the text of each page in document order
+        
+        Large PDFs are split into contiguous page ranges that the shared worker
+        pool extracts in parallel; small ones are read sequentially in-process.
+        A page is yielded once its range and every earlier one are done.
+        
+        Args:
+            pdf_file: File-like object (Flask file upload or BytesIO)
+            workers: Worker processes; 1 forces in-process extraction (defaults to
+                Config.PDF_EXTRACTION_WORKERS, the size of the shared pool)
+        
+        Yields:
+            Page text ('' for pages without extractable text)
+        """
+        workers = workers or Config.PDF_EXTRACTION_WORKERS
+        
         try:
-            # Read the PDF file
             pdf_reader = PyPDF2.PdfReader(pdf_file)
+            page_count = len(pdf_reader.pages)
             
-            # Extract text from all pages
-            text_content = []
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text = page.extract_text()
-                if text:
-                    text_content.append(text)
+            if workers <= 1 or page_count < Config.PDF_PARALLEL_MIN_PAGES:
+                for page in pdf_reader.pages:
+                    yield page.extract_text() or ''
+                return
             
-            # Join all pages with newlines
-            full_text = '\n\n'.join(text_content)
+            # Workers re-open the document from disk rather than receiving its bytes per task
+            pdf_file.seek(0)
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+                tmp.write(pdf_file.read())
+                pdf_path = tmp.name
             
-            if not full_text.strip():
-                raise ValueError("No text content found in PDF. The PDF might be image-based or encrypted.")
-            
-            return full_text
+            step = Config.PDF_PAGES_PER_TASK
+            executor = get_executor()
+            futures = []
+            try:
+                for start in range(0, page_count, step):
+                    futures.append(executor.submit(_extract_page_range, pdf_path, start, min(start + step, page_count)))
+                # Page order is preserved while later ranges are still being extracted
+                for future in futures:
+                    yield from future.result()
+            finally:
+                # Ranges not yet started are dropped if the caller stops early or a range fails
+                for future in futures:
+                    future.cancel()
+                os.unlink(pdf_path)
         
         except PyPDF2.errors.PdfReadError as e:
             raise ValueError(f"Error reading PDF file: {str(e)}")
+        except BrokenProcessPool as e:
+            _discard_executor(executor)
+            raise ValueError(f"Error extracting text from PDF: {str(e)}")
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Error extracting text from PDF: {str(e)}")
     
@@ -45,4 +140,3 @@ class PDFExtractor:
     def is_pdf_file(filename: str) -> bool:
         """Check if file is a PDF based on extension"""
         return filename.lower().endswith('.pdf')
-
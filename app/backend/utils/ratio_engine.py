@@ -0,0 +1,244 @@
+"""Vectorized financial ratios over every period of a balance sheet table"""
+import re
+from typing import Dict, List, Any, Optional
+import numpy as np
+from utils.balance_sheet_table import BalanceSheetTable
+
+
+class RatioEngine:
+    """
+    Compute totals, liquidity/leverage ratios and growth for all periods at once
+    
+    Totals prefer explicit "Total ..." rows of the table. A section without one
+    adds up its current and non-current totals (each its subtotal row, else the
+    sum of its line items) and the line items without a term, so subtotals are
+    never counted twice. Debt is the balance sheet's total liabilities, as in
+    FinancialDataParser.
+    """
+    
+    CASH_PATTERN = re.compile(r'\bcash\b|\bbank', re.IGNORECASE)
+    INVENTORY_PATTERN = re.compile(r'inventor|stock[\s-]*in[\s-]*trade|^stocks?\b', re.IGNORECASE)
+    
+    # Series reported with YoY growth and CAGR
+    GROWTH_METRICS = ['total_assets', 'total_liabilities', 'total_equity',
+                      'current_assets', 'current_liabilities', 'working_capital', 'cash']
+    
+    # (key, name, benchmark) in slide order
+    RATIO_DEFINITIONS = [
+        ('current_ratio', 'Current Ratio', '> 1.5 (Good)'),
+        ('quick_ratio', 'Quick Ratio', '> 1.0 (Good)'),
+        ('debt_to_equity', 'Debt-to-Equity', '< 1.0 (Conservative)'),
+        ('debt_to_assets', 'Debt-to-Assets', '< 0.5 (Conservative)'),
+        ('cash_ratio', 'Cash Ratio', '> 0.5 (Comfortable)'),
+        ('equity_multiplier', 'Equity Multiplier', '< 2.0 (Low leverage)')
+    ]
+    
+    @staticmethod
+    def compute(table: BalanceSheetTable) -> Dict[str, Any]:
+        """
+        Compute the ratio report for a table
+        
+        Args:
+            table: Parsed balance sheet table
+        
+        Returns:
+            JSON-serializable dictionary with 'periods' (oldest first), 'current_period',
+            'values' ({metric: one value per period}), 'latest' ({metric: value for
+            current_period}), 'yoy_growth' ({metric: growth per period, None for the
+            first}) and 'cagr' ({metric: compound annual growth rate})
+        """
+        order = RatioEngine._chronological_order(table)
+        periods = [table.periods[i] for i in order]
+        if not len(table) or not periods:
+            return {'periods': periods, 'current_period': table.current_period,
+                    'values': {}, 'latest': {}, 'yoy_growth': {}, 'cagr': {}}
+        
+        values = table.values[:, order]
+        frame = table.frame
+        labels = frame['line_item'].astype(str).str.strip()
+        sections = frame['section'].to_numpy()
+        terms = frame['term'].to_numpy()
+        is_total = labels.str.match(BalanceSheetTable.TOTAL_PATTERN).to_numpy()
+        # "Total equity and liabilities" is the grand total, not a liabilities or equity total
+        is_grand_total = (labels.str.contains('liabilit', case=False) &
+                          labels.str.contains('equity', case=False)).to_numpy()
+        
+        no_term = np.array([t is None for t in terms], dtype=bool)
+        
+        def total(section: str, term: Optional[str] = None) -> np.ndarray:
+            in_section = sections == section
+            if term:
+                return RatioEngine._prefer_total(
+                    values[in_section & is_total & ~is_grand_total & (terms == term)],
+                    values[in_section & ~is_total & (terms == term)]
+                )
+            # Without a section total: the term totals plus the items that have no term
+            parts = np.vstack([total(section, name) for name in BalanceSheetTable.TERMS] +
+                              [values[in_section & ~is_total & no_term]])
+            return RatioEngine._prefer_total(values[in_section & is_total & ~is_grand_total & no_term], parts)
+        
+        def matching(section: str, pattern: re.Pattern) -> np.ndarray:
+            mask = (sections == section) & ~is_total & labels.str.contains(pattern).to_numpy()
+            return RatioEngine._prefer_total(values[:0], values[mask])
+        
+        total_assets = total('assets')
+        total_liabilities = total('liabilities')
+        total_equity = total('equity')
+        current_assets = total('assets', 'current')
+        current_liabilities = total('liabilities', 'current')
+        cash = matching('assets', RatioEngine.CASH_PATTERN)
+        inventory = matching('assets', RatioEngine.INVENTORY_PATTERN)
+        
+        series = {
+            'total_assets': total_assets,
+            'total_liabilities': total_liabilities,
+            'total_equity': total_equity,
+            'current_assets': current_assets,
+            'non_current_assets': total_assets - np.nan_to_num(current_assets),
+            'current_liabilities': current_liabilities,
+            'long_term_liabilities': total_liabilities - np.nan_to_num(current_liabilities),
+            'cash': cash,
+            'inventory': inventory,
+            'working_capital': current_assets - current_liabilities,
+            'current_ratio': RatioEngine._ratio(current_assets, current_liabilities),
+            'quick_ratio': RatioEngine._ratio(current_assets - np.nan_to_num(inventory), current_liabilities),
+            'cash_ratio': RatioEngine._ratio(cash, current_liabilities),
+            'debt_to_equity': RatioEngine._ratio(total_liabilities, total_equity),
+            'debt_to_assets': RatioEngine._ratio(total_liabilities, total_assets),
+            'equity_multiplier': RatioEngine._ratio(total_assets, total_equity)
+        }
+        
+        growth = np.vstack([series[metric] for metric in RatioEngine.GROWTH_METRICS])
+        yoy = np.full_like(growth, np.nan)
+        yoy[:, 1:] = RatioEngine._ratio(growth[:, 1:], growth[:, :-1]) - 1
+        cagr = RatioEngine._cagr(growth, RatioEngine._period_years(periods))
+        
+        latest = periods.index(table.current_period)
+        return {
+            'periods': periods,
+            'current_period': table.current_period,
+            'values': {metric: RatioEngine._to_list(row) for metric, row in series.items()},
+            'latest': {metric: RatioEngine._to_float(row[latest]) for metric, row in series.items()},
+            'yoy_growth': {metric: RatioEngine._to_list(yoy[i]) for i, metric in enumerate(RatioEngine.GROWTH_METRICS)},
+            'cagr': {metric: RatioEngine._to_float(cagr[i]) for i, metric in enumerate(RatioEngine.GROWTH_METRICS)}
+        }
+    
+    @staticmethod
+    def _chronological_order(table: BalanceSheetTable) -> List[int]:
+        """Column indices from oldest to newest period"""
+        periods = table.periods
+        years = RatioEngine._period_years(periods)
+        if years is not None:
+            return [int(i) for i in np.argsort(years, kind='stable')]
+        # Statements list the latest period first (see BalanceSheetTable.current_period)
+        return list(range(len(periods)))[::-1]
+    
+    @staticmethod
+    def _period_years(periods: List[str]) -> Optional[np.ndarray]:
+        matches = [BalanceSheetTable.YEAR_PATTERN.match(period) for period in periods]
+        if not periods or not all(matches):
+            return None
+        return np.array([int(match.group(1)) for match in matches], dtype=np.float64)
+    
+    @staticmethod
+    def _prefer_total(total_rows: np.ndarray, items: np.ndarray) -> np.ndarray:
+        """Per period: the first explicit total row, else the sum of items (NaN if neither exists)"""
+        width = total_rows.shape[1]
+        explicit = np.full(width, np.nan)
+        for row in total_rows[::-1]:
+            explicit = np.where(np.isnan(row), explicit, row)
+        summed = np.where(np.isnan(items).all(axis=0), np.nan, np.nansum(items, axis=0)) if len(items) else np.full(width, np.nan)
+        return np.where(np.isnan(explicit), summed, explicit)
+    
+    @staticmethod
+    def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """Element-wise division that is NaN wherever the denominator is missing or not positive"""
+        numerator = np.asarray(numerator, dtype=np.float64)
+        denominator = np.asarray(denominator, dtype=np.float64)
+        result = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+        np.divide(numerator, denominator, out=result, where=np.nan_to_num(denominator) > 0)
+        return result
+    
+    @staticmethod
+    def _cagr(growth: np.ndarray, years: Optional[np.ndarray]) -> np.ndarray:
+        """CAGR between the first and last positive value of each row"""
+        positive = np.nan_to_num(growth) > 0
+        has_two = positive.sum(axis=1) >= 2
+        first = np.argmax(positive, axis=1)
+        last = growth.shape[1] - 1 - np.argmax(positive[:, ::-1], axis=1)
+        rows = np.arange(len(growth))
+        spans = (years[last] - years[first]) if years is not None else (last - first).astype(np.float64)
+        
+        cagr = np.full(len(growth), np.nan)
+        valid = has_two & (spans > 0)
+        cagr[valid] = (growth[rows, last][valid] / growth[rows, first][valid]) ** (1 / spans[valid]) - 1
+        return cagr
+    
+    @staticmethod
+    def _to_float(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
+    
+    @staticmethod
+    def _to_list(row: np.ndarray) -> List[Optional[float]]:
+        return [RatioEngine._to_float(value) for value in row]
+    
+    @staticmethod
+    def to_metrics(report: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Return the current period of a report in the flat metrics format used by slides
+        
+        Missing values become 0, as in FinancialDataParser.extract_financial_metrics.
+        """
+        return {metric: value or 0 for metric, value in report.get('latest', {}).items()}
+    
+    @staticmethod
+    def ratio_rows(report: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Return the current period's ratios as name/value/benchmark rows (available ratios only)"""
+        latest = report.get('latest', {})
+        return [
+            {'key': key, 'name': name, 'value': f"{latest[key]:.2f}", 'benchmark': benchmark}
+            for key, name, benchmark in RatioEngine.RATIO_DEFINITIONS
+            if latest.get(key) is not None
+        ]
+    
+    @staticmethod
+    def growth_insights(report: Dict[str, Any]) -> List[str]:
+        """Describe the latest YoY change and the CAGR of each growth metric in plain sentences"""
+        periods = report.get('periods', [])
+        if len(periods) < 2:
+            return []
+        
+        insights = []
+        for metric in RatioEngine.GROWTH_METRICS:
+            label = metric.replace('_', ' ').capitalize()
+            yoy = report['yoy_growth'].get(metric, [])
+            if yoy and yoy[-1] is not None:
+                if abs(yoy[-1]) < 0.0005:
+                    insights.append(f"{label} was unchanged ({periods[-2]} to {periods[-1]})")
+                else:
+                    direction = 'grew' if yoy[-1] > 0 else 'declined'
+                    insights.append(f"{label} {direction} {abs(yoy[-1]) * 100:.1f}% ({periods[-2]} to {periods[-1]})")
+            cagr = report['cagr'].get(metric)
+            if cagr is not None and len(periods) > 2:
+                insights.append(f"{label} CAGR of {cagr * 100:.1f}% over {periods[0]}-{periods[-1]}")
+        return insights
+    
+    @staticmethod
+    def format_summary(report: Dict[str, Any]) -> str:
+        """Format the report as plain text for LLM context"""
+        periods = report.get('periods', [])
+        values = report.get('values', {})
+        if not periods or not values:
+            return ''
+        
+        lines = [f"Periods: {', '.join(periods)} (current: {report.get('current_period')})"]
+        for metric, row in values.items():
+            if all(value is None for value in row):
+                continue
+            cells = ', '.join(
+                f"{period}: {'N/A' if value is None else f'{value:,.2f}'}"
+                for period, value in zip(periods, row)
+            )
+            lines.append(f"{metric.replace('_', ' ').capitalize()} - {cells}")
+        lines.extend(RatioEngine.growth_insights(report))
+        return '\n'.join(lines)
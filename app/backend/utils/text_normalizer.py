@@ -0,0 +1,164 @@
+"""Normalization of extracted page text before parsing and chunking"""
+import itertools
+import re
+from collections import Counter, defaultdict, deque
+from typing import Dict, Iterable, Iterator, List
+from config import Config
+
+
+class PageTextNormalizer:
+    """
+    Strip repeated page furniture from extracted pages and tidy their text
+    
+    A line is treated as a running header or footer when it sits within the first
+    or last EDGE_LINES lines of a page and, with digits masked ("Page 3 of 40",
+    "Annual Report 2023 | 17"), recurs at the page edges of at least
+    Config.PDF_BOILERPLATE_MIN_SHARE of the pages with constant numbers apart
+    from a page number. Long lines repeated verbatim
+    anywhere on that many pages (disclaimers, confidentiality notices) are
+    removed as well. The first occurrence of each repeated line is kept, so a
+    title page keeps its title. Bare page numbers on a page's first or last line are removed
+    (a lone year there is kept: it is more likely a column header).
+    """
+    
+    EDGE_LINES = 2
+    MIN_PAGES = 3  # Fewer pages give no reliable repetition signal
+    MIN_REPEATED_LINE_CHARS = 40  # Shorter body lines (table labels) may legitimately repeat
+    
+    PAGE_NUMBER_PATTERN = re.compile(r'^(?:page\s*)?[-–]?\s*(?!(?:19|20)\d{2}\b)\d{1,4}\s*[-–]?(?:\s*(?:of|/)\s*\d{1,4})?$', re.IGNORECASE)
+    DIGITS_PATTERN = re.compile(r'\d+')
+    SPACES_PATTERN = re.compile(r'[ \u00a0\u2009\u202f]+')
+    HYPHENATED_BREAK_PATTERN = re.compile(r'(?<=[a-z])-\n(?=[a-z])')
+    BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+    
+    @staticmethod
+    def normalize_pages(pages: List[str]) -> List[str]:
+        """
+        Remove repeated headers, footers and boilerplate, then de-hyphenate and collapse whitespace
+        
+        Args:
+            pages: Text of each page in order
+        
+        Returns:
+            Normalized text of each page (same length as pages)
+        """
+        return list(PageTextNormalizer.normalize_stream(pages, sample_pages=max(1, len(pages))))
+    
+    @staticmethod
+    def normalize_stream(pages: Iterable[str], sample_pages: int = None) -> Iterator[str]:
+        """
+        Normalize pages one at a time as they arrive
+        
+        Boilerplate is detected on the first sample_pages pages and removed from
+        those and every later page, so memory is bounded by the sample rather than
+        the document. Documents no longer than the sample are normalized exactly as
+        by normalize_pages().
+        
+        Args:
+            pages: Iterable of page texts in order
+            sample_pages: Leading pages used for detection (defaults to
+                Config.PDF_BOILERPLATE_SAMPLE_PAGES)
+        
+        Yields:
+            Normalized text of each page
+        """
+        pages = iter(pages)
+        sample = deque(PageTextNormalizer._lines(page) for page in
+                       itertools.islice(pages, sample_pages or Config.PDF_BOILERPLATE_SAMPLE_PAGES))
+        boilerplate_edges, boilerplate_lines = PageTextNormalizer._repeated_lines(list(sample))
+        
+        seen = set()  # Boilerplate is kept once, where it first appears (e.g. the title page)
+        while sample:
+            yield PageTextNormalizer._normalize_lines(sample.popleft(), boilerplate_edges, boilerplate_lines, seen)
+        for page in pages:
+            yield PageTextNormalizer._normalize_lines(
+                PageTextNormalizer._lines(page), boilerplate_edges, boilerplate_lines, seen
+            )
+    
+    @staticmethod
+    def _normalize_lines(lines: List[str], boilerplate_edges: set, boilerplate_lines: set, seen: set) -> str:
+        """Normalize one page, dropping boilerplate already kept on an earlier page"""
+        content = [i for i, line in enumerate(lines) if line]
+        edges = set(PageTextNormalizer._edges(content))
+        outermost = {content[0], content[-1]} if content else set()
+        kept = []
+        for i, line in enumerate(lines):
+            if i in outermost and PageTextNormalizer.PAGE_NUMBER_PATTERN.match(line):
+                continue
+            if i in edges and PageTextNormalizer._edge_key(line) in boilerplate_edges:
+                key = PageTextNormalizer._edge_key(line)
+            elif line in boilerplate_lines:
+                key = line
+            else:
+                key = None
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+        return PageTextNormalizer.normalize_text('\n'.join(kept))
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Join words hyphenated across line breaks and collapse runs of spaces and blank lines"""
+        text = PageTextNormalizer.SPACES_PATTERN.sub(' ', text)
+        text = '\n'.join(line.strip() for line in text.split('\n'))
+        text = PageTextNormalizer.HYPHENATED_BREAK_PATTERN.sub('', text)
+        return PageTextNormalizer.BLANK_LINES_PATTERN.sub('\n\n', text).strip()
+    
+    @staticmethod
+    def _lines(page: str) -> List[str]:
+        """Split a page into stripped lines (blank lines kept as '' to preserve paragraphs)"""
+        return [PageTextNormalizer.SPACES_PATTERN.sub(' ', line).strip() for line in (page or '').split('\n')]
+    
+    @staticmethod
+    def _edges(items: List) -> List:
+        """First and last EDGE_LINES items"""
+        edge = PageTextNormalizer.EDGE_LINES
+        return items[:edge] + items[edge:][-edge:]
+    
+    @staticmethod
+    def _edge_key(line: str) -> str:
+        return PageTextNormalizer.DIGITS_PATTERN.sub('#', line.lower())
+    
+    @staticmethod
+    def _repeated_lines(page_lines: List[List[str]]):
+        """Return (edge keys, verbatim lines) that recur on enough pages to be boilerplate"""
+        if len(page_lines) < PageTextNormalizer.MIN_PAGES:
+            return set(), set()
+        min_pages = max(2, Config.PDF_BOILERPLATE_MIN_SHARE * len(page_lines))
+        
+        edge_numbers = defaultdict(dict)  # Edge key -> {page index: numbers in the line}
+        line_counts = Counter()
+        for page_index, lines in enumerate(page_lines):
+            content = [line for line in lines if line]
+            for line in PageTextNormalizer._edges(content):
+                edge_numbers[PageTextNormalizer._edge_key(line)].setdefault(
+                    page_index, tuple(int(number) for number in PageTextNormalizer.DIGITS_PATTERN.findall(line))
+                )
+            # Count each line once per page
+            line_counts.update({line for line in content if len(line) >= PageTextNormalizer.MIN_REPEATED_LINE_CHARS})
+        
+        return (
+            {key for key, numbers in edge_numbers.items()
+             if len(numbers) >= min_pages and PageTextNormalizer._is_running_text(key, numbers)},
+            {line for line, count in line_counts.items() if count >= min_pages}
+        )
+    
+    @staticmethod
+    def _is_running_text(key: str, numbers_by_page: Dict[int, tuple]) -> bool:
+        """
+        Whether an edge line's numbers behave like a running header or footer
+        
+        Its numbers must be the same on every page, except at most one position
+        that increases with the page (the page number). Table rows (a label
+        followed by two or more values) only qualify through a page number, so
+        statement rows repeated across pages are kept.
+        """
+        rows = [numbers_by_page[page] for page in sorted(numbers_by_page)]
+        if len({len(row) for row in rows}) > 1:
+            return False
+        varying = [column for column in zip(*rows) if len(set(column)) > 1]
+        if not varying:
+            return not (key.endswith('#') and key.count('#') >= 2)
+        return len(varying) == 1 and all(a < b for a, b in zip(varying[0], varying[0][1:]))
@@ -3,6 +3,31 @@ import axios from 'axios';
 // Unified API base (proxy handles routing to backend)
 const API_BASE = '';
 
+// ==================== Jobs API ====================
+const JOB_POLL_INTERVAL_MS = 1000;
+
+export const getJobStatus = async (jobId) => {
+  try {
+    const response = await axios.get(`${API_BASE}/api/jobs/${jobId}`);
+    return response.data;
+  } catch (error) {
+    throw new Error(error.response?.data?.error || error.message || 'Job status request failed');
+  }
+};
+
+// Poll a background job until it completes; onProgress receives each status update
+export const waitForJob = async (jobId, onProgress = null) => {
+  while (true) {
+    const job = await getJobStatus(jobId);
+    if (onProgress) onProgress(job);
+
+    if (job.status === 'completed') return job;
+    if (job.status === 'failed') throw new Error(job.error || 'Processing failed');
+
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
 // ==================== RAG API ====================
 export const uploadRAGFile = async (balanceSheet, companyProfile = null) => {
   const formData = new FormData();
@@ -18,6 +43,12 @@ export const uploadRAGFile = async (balanceSheet, companyProfile = null) => {
       }
     });
     
+    // Ingestion runs in the background - wait until the session is ready for chat
+    if (response.data.job_id) {
+      const job = await waitForJob(response.data.job_id);
+      return { ...response.data, ...job.result, ready_for_chat: true };
+    }
+    
     return response.data;
   } catch (error) {
     throw new Error(error.response?.data?.error || error.message || 'Upload failed');
@@ -51,6 +82,15 @@ export const uploadPPTFiles = async (balanceSheet, companyProfile) => {
       }
     });
     
+    // Enhanced-context ingestion is optional for PPT generation
+    if (response.data.job_id) {
+      try {
+        await waitForJob(response.data.job_id);
+      } catch (jobError) {
+        console.warn('Background ingestion failed:', jobError.message);
+      }
+    }
+    
     return response.data;
   } catch (error) {
     throw new Error(error.response?.data?.error || error.message || 'Upload failed');